@@ -1,16 +1,44 @@
-from flask import Flask, jsonify, request
+from flask import Flask, g, has_request_context, json, jsonify, request
 from elasticsearch import Elasticsearch
 import os
-import requests
 from models import (
     Prize, PrizeCreate, FlexibleSearchParams,
-    SearchResult, ErrorResponse, SortField, SortOrder
+    ErrorResponse, SortField, SortOrder, IngestSummary,
+    SEARCH_FIELD_BOOSTS, SearchCursor, BatchSearchRequest, BulkWriteParams,
+    BulkItemResult, BulkWriteResponse, SuggestParams, SuggestResponse, SearchMode,
+    FacetParams, FacetResult, MgetRequest
+)
+from cache import LRUCache
+import metrics
+from ingest import (
+    FORCE_MERGE, NOBEL_API_URL, SUSPEND_REFRESH, bulk_ingest, bulk_load_settings, bulk_payload, force_merge,
+    iter_bulk_batches, laureate_documents, prize_id, send_bulk_batch
+)
+from health import HealthState, StartupPipeline, backoff_delays
+from memory_search import MemorySearchIndex
+from resilience import (
+    REQUEST_DEADLINE, SHED_RETRY_AFTER, CircuitBreaker, CircuitOpenError, ConcurrencyLimiter, Deadline,
+    DeadlineExceeded, ServiceUnavailable, guarded_transport
+)
+from profiling import SlowQueryLog, is_admin, profile_requested, summarize_profile
+from snapshot import iter_prizes
+from serialization import encode_json, normalize_prize, project_prize, source_includes
+from suggest import (
+    SUGGEST_FIELDS, SUGGEST_MAPPING, build_suggest_query, normalize_prefix, parse_suggest_response,
+    with_suggest_inputs
 )
 import logging
+import math
+import re
+import threading
 import time
-from elasticsearch.exceptions import ConnectionError
+import zlib
+from elasticsearch.exceptions import ConflictError, ConnectionError, ConnectionTimeout, NotFoundError
 from pydantic import ValidationError
-from typing import Optional
+from contextlib import nullcontext
+from functools import lru_cache
+from itertools import chain
+from typing import Dict, Iterator, List, Optional, Tuple
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -18,131 +46,435 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
+# Searches and writes go through the alias; physical indices are versioned behind it
+INDEX_ALIAS = "nobel_prizes"
+# Flat, one-document-per-laureate copy of the prizes for person lookups without nested queries
+LAUREATE_ALIAS = "nobel_laureates"
+INDEX_GENERATIONS_TO_KEEP = int(os.getenv("INDEX_GENERATIONS_TO_KEEP", 1))
+# Share of documents allowed to fail before a load is abandoned instead of swapped in
+REINDEX_MAX_FAILED_RATIO = float(os.getenv("REINDEX_MAX_FAILED_RATIO", 0))
+# Primary shards and replicas of new index generations (Elasticsearch's defaults: 1 and 1)
+INDEX_SHARDS = int(os.getenv("INDEX_SHARDS", 1))
+INDEX_REPLICAS = int(os.getenv("INDEX_REPLICAS", 1))
+_reindex_lock = threading.Lock()
+
+SEARCH_FIELDS = tuple(SEARCH_FIELD_BOOSTS)
+
+# "elasticsearch" (default) or "memory" for the embedded in-process index
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "elasticsearch")
+memory_index = MemorySearchIndex()
+
+# How long a cursor's point-in-time stays open between pages
+PIT_KEEP_ALIVE = os.getenv("PIT_KEEP_ALIVE", "1m")
+# Prizes fetched per round trip by /export
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 500))
+
+# Serialized /search responses, cleared on every write and reload
+search_cache = LRUCache(
+    max_entries=int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", 1024)),
+    max_bytes=int(os.getenv("SEARCH_CACHE_MAX_BYTES", 32 * 1024 * 1024)),
+    ttl=float(os.getenv("SEARCH_CACHE_TTL", 60))
+)
+
+# Serialized prizes by id for point lookups; entries are dropped on every write to them
+document_cache = LRUCache(
+    max_entries=int(os.getenv("DOC_CACHE_MAX_ENTRIES", 4096)),
+    max_bytes=int(os.getenv("DOC_CACHE_MAX_BYTES", 16 * 1024 * 1024)),
+    ttl=float(os.getenv("DOC_CACHE_TTL", 300))
+)
+
+# Compiled query templates, one per search shape (fields, sort, projection)
+QUERY_TEMPLATE_CACHE_SIZE = int(os.getenv("QUERY_TEMPLATE_CACHE_SIZE", 1024))
+# Validated /search parameters, keyed on the raw query string arguments
+SEARCH_PARAMS_CACHE_SIZE = int(os.getenv("SEARCH_PARAMS_CACHE_SIZE", 4096))
+
+# Searches slower than SLOW_QUERY_THRESHOLD_MS, logged by shape
+slow_query_log = SlowQueryLog()
+
 # Initialize Elasticsearch client
 es: Optional[Elasticsearch] = None
+_es_lock = threading.Lock()
+# Pooled connections per Elasticsearch node, shared by the threads of a process
+ES_MAX_CONNECTIONS = int(os.getenv("ES_MAX_CONNECTIONS", 100))
+
+# Startup progress and the last Elasticsearch check, served by /livez and /readyz
+health_state = HealthState(require_elasticsearch=SEARCH_BACKEND != "memory")
+HEALTH_CHECK_TIMEOUT = float(os.getenv("HEALTH_CHECK_TIMEOUT", 2))
+
+# Fails Elasticsearch calls fast after repeated errors instead of letting them pile up
+es_breaker = CircuitBreaker()
+ES_TRANSPORT = guarded_transport(metrics.InstrumentedTransport, es_breaker)
+# Requests beyond this many in flight are shed with 503
+request_limiter = ConcurrencyLimiter()
+# Probes and scrapes must keep answering while the server sheds load
+UNLIMITED_PATHS = {"/livez", "/readyz", "/metrics"}
 
 def get_elasticsearch() -> Elasticsearch:
     global es
-    if es is None:
-        es = wait_for_elasticsearch()
-    return es
+    client = es
+    if client is None:
+        # Don't hold the request through connection retries while the cluster is known to be down
+        es_breaker.raise_if_open()
+        if has_request_context():
+            return _connect_for_request()
+        with _es_lock:
+            # Another thread may have connected while this one waited for the lock
+            if es is None:
+                es = wait_for_elasticsearch()
+            client = es
+    return client
 
-def wait_for_elasticsearch(max_retries=5, delay=1) -> Elasticsearch:
-    """Wait for Elasticsearch to be available"""
+def _connect_for_request() -> Elasticsearch:
+    """One connection attempt within the request's time budget; retrying is left to startup"""
+    global es
+    deadline = g.get("deadline")
+    # Probes and scrapes run without a deadline
+    remaining = deadline.check if deadline is not None else lambda: HEALTH_CHECK_TIMEOUT
+    lock = _es_lock
+    if not lock.acquire(timeout=remaining()):
+        raise DeadlineExceeded("Timed out waiting for the Elasticsearch connection")
+    try:
+        if es is None:
+            try:
+                es = connect_elasticsearch(request_timeout=remaining())
+            except (ServiceUnavailable, DeadlineExceeded, ConnectionTimeout):
+                raise
+            except Exception as e:
+                raise ServiceUnavailable(f"Could not connect to Elasticsearch: {e}", SHED_RETRY_AFTER)
+        return es
+    finally:
+        lock.release()
+
+def set_elasticsearch(client: Optional[Elasticsearch]) -> None:
+    global es
+    with _es_lock:
+        es = client
+
+def reset_elasticsearch() -> None:
+    """Drop the client inherited from a parent process; call right after fork.
+
+    Its pooled sockets are shared with the parent, so the child lazily
+    connects with a client of its own. The lock is recreated too, as it may
+    have been held by another thread at the moment of the fork.
+    """
+    global es, _es_lock
+    es = None
+    _es_lock = threading.Lock()
+
+def connect_elasticsearch(request_timeout: Optional[float] = None) -> Elasticsearch:
+    """Single connection attempt; raises if Elasticsearch does not answer"""
     url = os.getenv("ELASTICSEARCH_URL", "http://elasticsearch:9200")
+    client = Elasticsearch(url, transport_class=ES_TRANSPORT, maxsize=ES_MAX_CONNECTIONS)
+    client.info(**({} if request_timeout is None else {"request_timeout": request_timeout}))
+    logger.info("Successfully connected to Elasticsearch")
+    return client
+
+def wait_for_elasticsearch(max_retries=5, delay=1) -> Elasticsearch:
+    """Wait for Elasticsearch to be available, backing off exponentially from ``delay`` seconds"""
+    delays = backoff_delays(initial=delay)
     for i in range(max_retries):
         try:
-            es = Elasticsearch(url)
-            es.info()
-            logger.info("Successfully connected to Elasticsearch")
-            return es
+            return connect_elasticsearch()
+        except CircuitOpenError:
+            raise
         except Exception as e:
             if i < max_retries - 1:
-                logger.warning(f"Failed to connect to Elasticsearch (attempt {i + 1}/{max_retries}): {e}")
-                time.sleep(delay)
+                wait = next(delays)
+                logger.warning(f"Failed to connect to Elasticsearch (attempt {i + 1}/{max_retries}), "
+                               f"retrying in {wait:.1f}s: {e}")
+                time.sleep(wait)
             else:
                 logger.error(f"Could not connect to Elasticsearch after {max_retries} attempts")
                 raise Exception("Could not connect to Elasticsearch after maximum retries")
 
-def drop_index(es: Elasticsearch = None):
-    """Drop the Nobel Prize index if it exists"""
+# Mapping tuned for the queries flexible_search sends
+INDEX_BODY = {
+    "mappings": {
+        # Extra upstream fields (overallMotivation, share, ...) stay in _source without being indexed
+        "dynamic": False,
+        # Suggester inputs are derived from the prize on every write
+        "_source": {"excludes": list(SUGGEST_FIELDS)},
+        "properties": {
+            # Numeric, so years can be matched exactly, range-filtered and sorted cheaply
+            "year": {"type": "short"},
+            "category": {
+                "type": "text",
+                "analyzer": "standard",
+                # A handful of one- or two-word values: length normalization and positions buy nothing
+                "norms": False,
+                "index_options": "freqs",
+                # Sorting and aggregations use doc values instead of heap-hungry fielddata
+                "fields": {"keyword": {"type": "keyword"}}
+            },
+            "laureates": {
+                "type": "nested",
+                "properties": {
+                    "id": {"type": "keyword"},
+                    # Indexed prefixes make prefix queries on names term lookups
+                    "firstname": {
+                        "type": "text",
+                        "analyzer": "standard",
+                        "index_prefixes": {"min_chars": 1, "max_chars": 10}
+                    },
+                    "surname": {
+                        "type": "text",
+                        "analyzer": "standard",
+                        "index_prefixes": {"min_chars": 1, "max_chars": 10}
+                    },
+                    # Only matched term by term, never as phrases
+                    "motivation": {"type": "text", "analyzer": "standard", "index_options": "freqs"}
+                }
+            },
+            # In-memory FSTs behind /suggest
+            **SUGGEST_MAPPING
+        }
+    }
+}
+
+# Same fields and analysis as INDEX_BODY, with a single laureate per document as a plain object
+LAUREATE_INDEX_BODY = {
+    "mappings": {
+        "dynamic": False,
+        "properties": {
+            "prize_id": {"type": "keyword"},
+            "year": INDEX_BODY["mappings"]["properties"]["year"],
+            "category": INDEX_BODY["mappings"]["properties"]["category"],
+            "laureates": {
+                "type": "object",
+                "properties": INDEX_BODY["mappings"]["properties"]["laureates"]["properties"]
+            },
+            # The whole prize, only returned, never searched
+            "prize": {"type": "object", "enabled": False}
+        }
+    }
+}
+
+# Field each sort option sorts on
+SORT_FIELDS = {
+    SortField.YEAR: "year",
+    SortField.CATEGORY: "category.keyword"
+}
+
+def new_index_name(alias: str = INDEX_ALIAS) -> str:
+    """Name for a new physical index generation"""
+    return f"{alias}_v{time.time_ns() // 1_000_000}"
+
+def get_alias_indices(es: Elasticsearch = None, alias: str = INDEX_ALIAS) -> List[str]:
+    """Physical indices the alias currently points at"""
     if es is None:
         es = get_elasticsearch()
     
-    if es.indices.exists(index="nobel_prizes"):
-        logger.info("Dropping nobel_prizes index...")
-        es.indices.delete(index="nobel_prizes")
-        logger.info("Index dropped successfully")
-        return True
-    return False
+    if not es.indices.exists_alias(name=alias):
+        return []
+    return sorted(es.indices.get_alias(name=alias).keys())
 
 # Create index with mapping for fuzzy search
-def create_index(es: Elasticsearch = None):
-    """Create the Nobel Prize index with mapping"""
+def create_index(es: Elasticsearch = None, index: Optional[str] = None,
+                 alias: str = INDEX_ALIAS, body: dict = INDEX_BODY,
+                 shards: Optional[int] = None, replicas: Optional[int] = None) -> str:
+    """Create a new physical Nobel Prize index generation with mapping.
+
+    ``shards`` and ``replicas`` default to ``INDEX_SHARDS`` and ``INDEX_REPLICAS``.
+    """
     if es is None:
         es = get_elasticsearch()
+    if index is None:
+        index = new_index_name(alias)
+    settings = {
+        "number_of_shards": INDEX_SHARDS if shards is None else shards,
+        "number_of_replicas": INDEX_REPLICAS if replicas is None else replicas,
+        **body.get("settings", {})
+    }
     
     try:
-        # Drop the index if it exists
-        drop_index(es)
-        
-        logger.info("Creating nobel_prizes index...")
-        mapping = {
-            "mappings": {
-                "properties": {
-                    "year": {"type": "keyword"},
-                    "category": {"type": "text", "analyzer": "standard"},
-                    "laureates": {
-                        "type": "nested",
-                        "properties": {
-                            "id": {"type": "keyword"},
-                            "firstname": {"type": "text", "analyzer": "standard"},
-                            "surname": {"type": "text", "analyzer": "standard"},
-                            "motivation": {"type": "text", "analyzer": "standard"}
-                        }
-                    }
-                }
-            }
-        }
-        es.indices.create(index="nobel_prizes", body=mapping)
+        logger.info(f"Creating {index} index with {settings['number_of_shards']} shard(s)...")
+        es.indices.create(index=index, body={**body, "settings": settings})
         logger.info("Index created successfully")
-        return True
+        return index
     except Exception as e:
         logger.error(f"Error creating index: {str(e)}")
         raise
 
-def load_nobel_data(es: Elasticsearch = None):
-    """Load Nobel Prize data from JSON file"""
+def alias_actions(es: Elasticsearch, index: str, alias: str = INDEX_ALIAS) -> List[dict]:
+    """update_aliases actions moving ``alias`` onto ``index``"""
+    actions = [{"add": {"index": index, "alias": alias}}]
+    for old_index in get_alias_indices(es, alias):
+        if old_index != index:
+            actions.insert(0, {"remove": {"index": old_index, "alias": alias}})
+    
+    # Indices created before aliasing used the alias name itself; replace it in the same call
+    if not es.indices.exists_alias(name=alias) and es.indices.exists(index=alias):
+        actions.append({"remove_index": {"index": alias}})
+    return actions
+
+def swap_alias(es: Elasticsearch, index: str, laureate_index: Optional[str] = None):
+    """Atomically point the alias (and the laureate alias, if given) at the new generation"""
+    actions = alias_actions(es, index)
+    if laureate_index is not None:
+        actions.extend(alias_actions(es, laureate_index, LAUREATE_ALIAS))
+    
+    es.indices.update_aliases(body={"actions": actions})
+    logger.info(f"Alias {INDEX_ALIAS} now points at {index}")
+
+def cleanup_old_indices(es: Elasticsearch = None, keep: int = INDEX_GENERATIONS_TO_KEEP,
+                        alias: str = INDEX_ALIAS) -> List[str]:
+    """Delete old index generations, keeping the live one plus ``keep`` previous ones"""
+    if es is None:
+        es = get_elasticsearch()
+    
+    live = set(get_alias_indices(es, alias))
+    generations = sorted(
+        (name for name in es.indices.get(index=f"{alias}_v*").keys() if name not in live),
+        reverse=True
+    )
+    stale = generations[keep:]
+    for name in stale:
+        logger.info(f"Deleting old index generation {name}")
+        es.indices.delete(index=name)
+    return stale
+
+def reindex(es: Elasticsearch = None, source: Optional[str] = None, **bulk_options) -> str:
+    """Build a new index generation, load it, then swap the alias onto it"""
     if es is None:
         es = get_elasticsearch()
     
+    with _reindex_lock:
+        index = create_index(es)
+        laureate_index = None
+        try:
+            laureate_index = create_index(es, alias=LAUREATE_ALIAS, body=LAUREATE_INDEX_BODY)
+            summary = load_nobel_data(es, source=source, index=index, laureate_index=laureate_index, **bulk_options)
+            check_load(summary)
+            swap_alias(es, index, laureate_index)
+            search_cache.clear()
+            document_cache.clear()
+        except Exception:
+            logger.error(f"Reindex into {index} failed, keeping current alias")
+            if laureate_index is not None:
+                es.indices.delete(index=laureate_index, ignore=[404])
+            es.indices.delete(index=index, ignore=[404])
+            raise
+        cleanup_old_indices(es)
+        cleanup_old_indices(es, alias=LAUREATE_ALIAS)
+        return index
+
+def check_load(summary: IngestSummary, max_failed_ratio: Optional[float] = None) -> None:
+    """Raise if a load is too incomplete to replace the live generation"""
+    if max_failed_ratio is None:
+        max_failed_ratio = REINDEX_MAX_FAILED_RATIO
+    if summary.indexed == 0:
+        raise RuntimeError(f"No documents indexed out of {summary.total}")
+    if summary.failed > summary.total * max_failed_ratio:
+        raise RuntimeError(f"{summary.failed}/{summary.total} documents failed to index")
+
+def reindex_in_background(es: Elasticsearch = None, source: Optional[str] = None) -> threading.Thread:
+    """Run ``reindex`` on a daemon thread so searches keep hitting the current generation"""
+    def run():
+        try:
+            reindex(es, source=source)
+        except Exception as e:
+            logger.error(f"Background reindex failed: {str(e)}")
+    
+    thread = threading.Thread(target=run, name="reindex", daemon=True)
+    thread.start()
+    return thread
+
+def load_nobel_data(es: Elasticsearch = None, source: Optional[str] = None,
+                    index: str = INDEX_ALIAS, laureate_index: Optional[str] = None,
+                    suspend_refresh: bool = SUSPEND_REFRESH, merge: bool = FORCE_MERGE,
+                    **bulk_options) -> IngestSummary:
+    """Stream Nobel Prize data from the API, a local JSON file or a fresh local
+    snapshot of either into the index (and the flat laureate index, if given).
+
+    With ``suspend_refresh``, the indices are loaded without refreshes or
+    replicas and get their settings back afterwards, even if the load fails.
+    With ``merge``, they are then force-merged to a single segment.
+    """
+    if es is None:
+        es = get_elasticsearch()
+    if source is None:
+        source = os.getenv("NOBEL_DATA_SOURCE", NOBEL_API_URL)
+    indices = [index] if laureate_index is None else [index, laureate_index]
+    
     try:
-        logger.info("Fetching Nobel Prize data...")
-        response = requests.get("https://api.nobelprize.org/v1/prize.json")
-        response.raise_for_status()
-        data = response.json()
-        
-        logger.info(f"Found {len(data['prizes'])} prizes to index")
-        
-        # Prepare bulk operations
-        bulk_operations = []
-        for prize in data["prizes"]:
-            try:
-                # Create the document ID
-                doc_id = f"{prize['year']}_{prize['category']}"
-                
-                # Add the index operation
-                bulk_operations.append({
-                    "index": {
-                        "_index": "nobel_prizes",
-                        "_id": doc_id
-                    }
-                })
-                
-                # Add the document
-                bulk_operations.append(prize)
-                
-            except Exception as e:
-                logger.error(f"Error preparing prize {prize.get('year', 'unknown')} for bulk indexing: {str(e)}")
-        
-        # Execute bulk indexing in chunks to avoid memory issues
-        chunk_size = 100  # Process 100 documents at a time
-        for i in range(0, len(bulk_operations), chunk_size * 2):  # Multiply by 2 because each document has 2 entries
-            chunk = bulk_operations[i:i + chunk_size * 2]
-            try:
-                es.bulk(body=chunk, refresh=False)
-                logger.info(f"Bulk indexed {len(chunk)//2} documents")
-            except Exception as e:
-                logger.error(f"Error in bulk indexing chunk: {str(e)}")
+        logger.info(f"Streaming Nobel Prize data from {source} into {index}...")
+        prizes = iter_prizes(source)
+        with bulk_load_settings(es, indices) if suspend_refresh else nullcontext():
+            summary = bulk_ingest(es, prizes, index=index, laureate_index=laureate_index, **bulk_options)
+        metrics.record_ingest(summary)
         
         # Force refresh to make all documents available for search
-        es.indices.refresh(index="nobel_prizes")
-        logger.info("Data loading completed")
+        es.indices.refresh(index=",".join(indices))
+        if merge:
+            # Fewer, larger segments: faster searches on an index that is not written to again until the next load
+            force_merge(es, indices)
+        search_cache.clear()
+        document_cache.clear()
+        logger.info(
+            f"Data loading completed: {summary.indexed}/{summary.total} documents indexed "
+            f"in {summary.elapsed_seconds:.2f}s ({summary.docs_per_second:.0f} docs/s)"
+        )
+        if summary.failed:
+            logger.warning(f"{summary.failed} documents failed to index")
+        return summary
         
     except Exception as e:
         logger.error(f"Error loading Nobel data: {str(e)}")
         raise
 
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.before_request
+def _admit_request():
+    """Shed requests beyond the in-flight limit and give admitted ones their time budget"""
+    if request.path in UNLIMITED_PATHS:
+        return None
+    if not request_limiter.try_acquire():
+        metrics.REQUESTS_SHED.inc()
+        response = jsonify(ErrorResponse(
+            error="Server overloaded",
+            details=f"More than {request_limiter.limit} requests in flight"
+        ).dict())
+        response.status_code = 503
+        response.headers["Retry-After"] = str(SHED_RETRY_AFTER)
+        return response
+    g.admitted = True
+    g.deadline = Deadline(REQUEST_DEADLINE)
+
+@app.teardown_request
+def _release_request(exc=None):
+    if g.pop("admitted", False):
+        request_limiter.release()
+
+@app.after_request
+def _observe_request(response):
+    started = g.pop("request_started", None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        metrics.HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started, route=route, method=request.method, status=response.status_code
+        )
+    return response
+
+def _collect_cache_stats():
+    for stat, value in search_cache.stats().items():
+        metrics.SEARCH_CACHE.set(value, stat=stat)
+    for stat, value in document_cache.stats().items():
+        metrics.DOCUMENT_CACHE.set(value, stat=stat)
+    metrics.IN_FLIGHT_REQUESTS.set(request_limiter.in_flight)
+    metrics.ES_CIRCUIT_OPEN.set(0 if es_breaker.state == CircuitBreaker.CLOSED else 1)
+
+metrics.REGISTRY.add_collector(_collect_cache_stats)
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Prometheus text exposition of request, search stage, Elasticsearch and ingest metrics"""
+    if not metrics.ENABLED:
+        return jsonify(ErrorResponse(error="Metrics are disabled").dict()), 404
+    return app.response_class(metrics.REGISTRY.render(), mimetype=None, content_type=metrics.CONTENT_TYPE)
+
 @app.route('/')
 def index():
     return jsonify({"message": "Welcome to Nobel Prize Search API!"})
@@ -158,6 +490,50 @@ def health():
         logger.error(f"Health check failed: {e}")
         return jsonify({"error": "Service unhealthy", "detail": str(e)}), 500
 
+@app.route('/livez')
+def livez():
+    """Liveness probe: answers as soon as the port is bound, whatever the startup phase"""
+    return jsonify({"status": "alive", "phase": health_state.phase}), 200
+
+@app.route('/readyz')
+def readyz():
+    """Readiness probe from the cached startup and Elasticsearch state; never calls Elasticsearch"""
+    state = health_state.snapshot()
+    return jsonify(state), 200 if state["status"] == "ready" else 503
+
+def laureates_of_prizes_query(prizes: List[tuple]) -> dict:
+    return {"query": {"terms": {"prize_id": [doc_id for doc_id, _ in prizes]}}}
+
+def laureate_bulk_body(prizes: List[tuple]) -> bytes:
+    """Bulk request indexing the laureate documents of ``(prize_id, prize)`` pairs"""
+    return b"".join(
+        bulk_payload("index", LAUREATE_ALIAS, laureate_id, doc)
+        for doc_id, prize in prizes
+        for laureate_id, doc in laureate_documents(doc_id, prize)
+    )
+
+def sync_laureates(es: Elasticsearch, prizes: List[tuple], replace: bool = True, refresh=False):
+    """Mirror written prizes, as ``(prize_id, prize)`` pairs, into the laureate index.
+
+    With ``replace``, laureate documents left over from earlier versions of
+    the prizes are deleted first. ``refresh`` is passed on to the writes.
+    Failures are logged rather than raised: the prize itself has already
+    been written.
+    """
+    if not prizes:
+        return
+    try:
+        if replace:
+            es.delete_by_query(index=LAUREATE_ALIAS, conflicts="proceed", body=laureates_of_prizes_query(prizes),
+                               **({"refresh": True} if refresh else {}))
+        body = laureate_bulk_body(prizes)
+        if body:
+            response = es.bulk(body=body, **({"refresh": refresh} if refresh else {}))
+            if response.get("errors"):
+                logger.error(f"Some laureate documents failed to index for {len(prizes)} prizes")
+    except Exception as e:
+        logger.error(f"Error syncing laureate index: {e}")
+
 @app.route('/prize', methods=['POST'])
 def add_prize():
     """Add a new Nobel Prize record"""
@@ -165,11 +541,25 @@ def add_prize():
         es = get_elasticsearch()
         data = request.get_json()
         prize = PrizeCreate(**data)
+        doc = prize.dict()
+        doc_id = prize_id(doc)
         
-        result = es.index(index="nobel_prizes", body=prize.dict())
-        return jsonify({"message": "Prize added successfully", "id": result["_id"]}), 201
+        # Same id as loads and GET /prize use; create fails instead of overwriting an existing prize
+        es.index(index=INDEX_ALIAS, id=doc_id, op_type="create", body=with_suggest_inputs(doc))
+        sync_laureates(es, [(doc_id, doc)], replace=False)
+        if SEARCH_BACKEND == "memory":
+            memory_index.add(doc_id, doc)
+        search_cache.clear()
+        document_cache.invalidate(doc_id)
+        return jsonify({"message": "Prize added successfully", "id": doc_id}), 201
     
+    except ConflictError:
+        return jsonify(ErrorResponse(error="Prize already exists",
+                                     details=f"A prize with id {doc_id} already exists").dict()), 409
     except Exception as e:
+        unavailable = unavailable_response(e)
+        if unavailable is not None:
+            return unavailable
         logger.error(f"Error adding prize: {e}")
         return jsonify(ErrorResponse(error="Failed to add prize", detail=str(e)).dict()), 400
 
@@ -181,130 +571,709 @@ def update_prize(year, category):
         data = request.get_json()
         prize = PrizeCreate(**data)
         
-        # Check if prize exists
-        if not es.exists(index="nobel_prizes", id=f"{year}_{category}"):
+        # Check if prize exists; a cached document is known to, without asking Elasticsearch
+        if not prize_known(es, f"{year}_{category}"):
             return jsonify(ErrorResponse(error="Prize not found", detail=f"No prize with id {f'{year}_{category}'}").dict()), 404
         
-        result = es.index(index="nobel_prizes", id=f"{year}_{category}", body=prize.dict())
+        result = es.index(index=INDEX_ALIAS, id=f"{year}_{category}", body=with_suggest_inputs(prize.dict()))
+        sync_laureates(es, [(result["_id"], prize.dict())])
+        if SEARCH_BACKEND == "memory":
+            memory_index.add(result["_id"], prize.dict())
+        search_cache.clear()
+        document_cache.invalidate(f"{year}_{category}")
         return jsonify({"message": "Prize updated successfully", "id": result["_id"]}), 200
     
     except Exception as e:
+        unavailable = unavailable_response(e)
+        if unavailable is not None:
+            return unavailable
         logger.error(f"Error updating prize: {e}")
         return jsonify(ErrorResponse(error="Failed to update prize", detail=str(e)).dict()), 400
 
-@app.route('/search')
-def flexible_search():
+def prize_known(es: Elasticsearch, doc_id: str) -> bool:
+    return document_cache.get(doc_id) is not None or es.exists(index=INDEX_ALIAS, id=doc_id)
+
+def prize_document_body(source: dict) -> bytes:
+    """A stored prize serialized like a /search result"""
+    prize = normalize_prize(source)
+    return encode_json(prize if prize is not None else Prize(**source).dict())
+
+def fetch_prize_documents(ids: List[str], deadline: Optional[Deadline] = None) -> Dict[str, Optional[bytes]]:
+    """Serialized prizes by id in one ``get`` or ``mget``, stored in the document cache; None if missing"""
+    generation = document_cache.generation
+    es = get_elasticsearch()
+    if len(ids) == 1:
+        try:
+            docs = [es.get(index=INDEX_ALIAS, id=ids[0], **client_timeout(deadline))]
+        except NotFoundError:
+            docs = [{"_id": ids[0], "found": False}]
+    else:
+        docs = es.mget(index=INDEX_ALIAS, body={"ids": ids}, **client_timeout(deadline))["docs"]
+    
+    bodies = {}
+    for doc in docs:
+        if not doc.get("found"):
+            bodies[doc["_id"]] = None
+            continue
+        body = prize_document_body(doc["_source"])
+        # Skipped if the prize was written while it was being read
+        document_cache.put(doc["_id"], body, generation=generation)
+        bodies[doc["_id"]] = body
+    return bodies
+
+@app.route('/prize/<year>/<category>', methods=['GET'])
+def get_prize(year, category):
+    """A single prize by year and category, from the document cache when possible"""
+    doc_id = f"{year}_{category}"
+    body = document_cache.get(doc_id)
+    if body is not None:
+        return _json_response(body, cache_status="HIT")
+    
     try:
-        # Validate and parse search parameters
-        search_params = FlexibleSearchParams(
-            q=request.args.get('q'),
-            include=request.args.getlist('include'),
-            exclude=request.args.getlist('exclude'),
-            page=int(request.args.get('page', 1)),
-            size=int(request.args.get('size', 10)),
-            sort_by=request.args.get('sort_by', SortField.SCORE),
-            sort_order=request.args.get('sort_order', SortOrder.DESC)
+        body = fetch_prize_documents([doc_id], g.get("deadline"))[doc_id]
+    except Exception as e:
+        unavailable = unavailable_response(e)
+        if unavailable is not None:
+            return unavailable
+        logger.error(f"Error fetching prize {doc_id}: {e}")
+        return jsonify(ErrorResponse(error="Internal server error", details=str(e)).dict()), 500
+    if body is None:
+        return jsonify(ErrorResponse(error="Prize not found", details=f"No prize with id {doc_id}").dict()), 404
+    return _json_response(body, cache_status="MISS")
+
+@app.route('/prizes/_mget', methods=['POST'])
+def mget_prizes():
+    """Fetch many prizes by id; ids that are not cached are read in a single mget"""
+    try:
+        mget = MgetRequest.model_validate(request.get_json(silent=True) or {})
+    except ValidationError as e:
+        return jsonify(ErrorResponse(error="Invalid mget request", details=str(e)).dict()), 400
+    
+    bodies = {}
+    for doc_id in dict.fromkeys(mget.ids):
+        bodies[doc_id] = document_cache.get(doc_id)
+    missing = [doc_id for doc_id, body in bodies.items() if body is None]
+    if missing:
+        try:
+            bodies.update(fetch_prize_documents(missing, g.get("deadline")))
+        except Exception as e:
+            unavailable = unavailable_response(e)
+            if unavailable is not None:
+                return unavailable
+            logger.error(f"Error fetching prizes: {e}")
+            return jsonify(ErrorResponse(error="Internal server error", details=str(e)).dict()), 500
+    
+    # Cached prizes are spliced in as already serialized JSON
+    docs = [
+        b'{"found":true,"id":' + encode_json(doc_id) + b',"prize":' + bodies[doc_id] + b'}'
+        if bodies.get(doc_id) is not None else encode_json({"found": False, "id": doc_id})
+        for doc_id in mget.ids
+    ]
+    return _json_response(b'{"docs":[' + b",".join(docs) + b']}')
+
+@app.route('/prizes/_bulk', methods=['POST'])
+def bulk_prizes():
+    """Write a stream of NDJSON prize records with bulk requests"""
+    try:
+        params = BulkWriteParams(
+            op_type=request.args.get('op_type', 'index'),
+            refresh=request.args.get('refresh', 'false')
         )
+    except ValidationError as e:
+        return jsonify(ErrorResponse(error="Invalid bulk parameters", details=str(e)).dict()), 400
+    
+    try:
+        es = get_elasticsearch()
+        results: List[BulkItemResult] = []
+        # Validated documents waiting for their bulk response, by line number
+        pending_docs = {}
         
-        # Build the query
-        query = {
-            "query": {
-                "bool": {
-                    "should": []
-                }
-            },
-            "from": (search_params.page - 1) * search_params.size,
-            "size": search_params.size
-        }
+        def payloads():
+            for line_no, line in enumerate(iter(request.stream.readline, b""), start=1):
+                if not line.strip():
+                    continue
+                try:
+                    prize = PrizeCreate(**json.loads(line))
+                except (ValueError, TypeError) as e:
+                    results.append(BulkItemResult(line=line_no, status=400, error=str(e)))
+                    continue
+                doc = prize.dict()
+                doc_id = prize_id(doc)
+                pending_docs[line_no] = (doc_id, doc)
+                # op_type create/update makes Elasticsearch check for the document inside the write
+                yield line_no, bulk_payload(params.op_type, INDEX_ALIAS, doc_id, with_suggest_inputs(doc))
         
-        # If no specific fields are provided, search across all relevant fields
-        if not search_params.include:
-            search_params.include = [
-                "laureates.firstname",
-                "laureates.surname",
-                "laureates.motivation",
-                "category",
-                "year"
-            ]
+        # wait_for has to be set per request; true is done once after the last batch
+        refresh = "wait_for" if params.refresh == "wait_for" else False
+        for batch in iter_bulk_batches(payloads()):
+            outcomes, _ = send_bulk_batch(es, batch, refresh=refresh)
+            written = []
+            for line_no, status, result in outcomes:
+                doc_id, doc = pending_docs.pop(line_no)
+                error = result.get("error")
+                if status is not None and status < 300:
+                    written.append((doc_id, doc))
+                    if SEARCH_BACKEND == "memory":
+                        memory_index.add(doc_id, doc)
+                    results.append(BulkItemResult(line=line_no, id=doc_id, status=status, result=result.get("result")))
+                else:
+                    results.append(BulkItemResult(
+                        line=line_no, id=doc_id, status=status,
+                        error=error if isinstance(error, str) else json.dumps(error)
+                    ))
+            sync_laureates(es, written, refresh="true" if params.refresh == "true" else refresh)
         
-        # Remove excluded fields
-        include_fields = [field for field in search_params.include 
-                        if field not in (search_params.exclude or [])]
+        if params.refresh == "true":
+            es.indices.refresh(index=INDEX_ALIAS)
+        search_cache.clear()
+        document_cache.clear()
         
-        # Build the multi-match query with boosting
-        query["query"]["bool"]["should"].append({
-            "multi_match": {
-                "query": search_params.q,
-                "fields": [
-                    f"{field}^{boost}" for field, boost in [
-                        ("laureates.firstname", 3),
-                        ("laureates.surname", 3),
-                        ("laureates.motivation", 2),
-                        ("category", 1),
-                        ("year", 1)
-                    ] if field in include_fields
-                ],
-                "type": "best_fields",
-                "fuzziness": "AUTO",
-                "operator": "or"
-            }
-        })
+        results.sort(key=lambda item: item.line)
+        succeeded = sum(1 for item in results if item.error is None)
+        response = BulkWriteResponse(
+            total=len(results),
+            succeeded=succeeded,
+            failed=len(results) - succeeded,
+            results=results
+        )
+        return jsonify(response.dict()), 200
+    
+    except Exception as e:
+        # Batches sent before the failure may have been written
+        search_cache.clear()
+        document_cache.clear()
+        unavailable = unavailable_response(e)
+        if unavailable is not None:
+            return unavailable
+        logger.error(f"Error in bulk prize write: {e}")
+        return jsonify(ErrorResponse(error="Failed to write prizes", details=str(e)).dict()), 500
+
+def search_cache_key(params: FlexibleSearchParams) -> tuple:
+    """Normalize search parameters so equivalent searches share a cache entry"""
+    fields = tuple(sorted(set(search_fields(params))))
+    # The standard analyzer lowercases and splits on whitespace, so neither changes the results
+    q = " ".join(params.q.lower().split())
+    projection = tuple(sorted(params.fields)) if params.fields else None
+    return (q, fields, params.page, params.size, params.sort_by, params.sort_order, projection,
+            params.year_from, params.year_to, params.mode)
+
+def _json_response(body: bytes, status: int = 200, cache_status: Optional[str] = None):
+    response = app.response_class(body, status=status, mimetype="application/json")
+    if cache_status:
+        response.headers["X-Cache"] = cache_status
+    return response
+
+@app.route('/cache/stats')
+def cache_stats():
+    """Hit/miss counters for the search result cache"""
+    return jsonify(search_cache.stats())
+
+def suggest_params_from_args(args) -> SuggestParams:
+    return SuggestParams(prefix=args.get('prefix', ''), size=args.get('size', 5))
+
+def suggest_cache_key(params: SuggestParams) -> tuple:
+    return ("suggest", normalize_prefix(params.prefix), params.size)
+
+def suggest_result_body(params: SuggestParams, suggestions: dict) -> bytes:
+    return encode_json(SuggestResponse(prefix=params.prefix, **suggestions).dict())
+
+@app.route('/suggest')
+def suggest():
+    """Typeahead: laureate names and categories starting with a prefix"""
+    try:
+        params = suggest_params_from_args(request.args)
+    except ValidationError as e:
+        return jsonify(ErrorResponse(error="Invalid suggest parameters", details=str(e)).dict()), 400
+    
+    cache_key = suggest_cache_key(params)
+    cached = search_cache.get(cache_key)
+    if cached is not None:
+        return _json_response(cached, cache_status="HIT")
+    cache_generation = search_cache.generation
+    
+    try:
+        if SEARCH_BACKEND == "memory":
+            suggestions = memory_index.suggest(params.prefix, params.size)
+        else:
+            response = get_elasticsearch().search(index=INDEX_ALIAS, body=build_suggest_query(params.prefix, params.size),
+                                                  **client_timeout(g.get("deadline")))
+            suggestions = parse_suggest_response(response, params.size)
+    except Exception as e:
+        unavailable = unavailable_response(e)
+        if unavailable is not None:
+            return unavailable
+        logger.error(f"Suggest error: {str(e)}")
+        return jsonify(ErrorResponse(error="Internal server error", details=str(e)).dict()), 500
+    
+    body = suggest_result_body(params, suggestions)
+    search_cache.put(cache_key, body, generation=cache_generation)
+    return _json_response(body, cache_status="MISS")
+
+def search_fields(params: FlexibleSearchParams) -> List[str]:
+    """Fields to search: the included ones (all by default) minus the excluded ones"""
+    include = params.include or SEARCH_FIELDS
+    return [field for field in include if field not in (params.exclude or [])]
+
+class SearchQueryTemplate:
+    """The parts of a /search body that only depend on the search's shape, built once per shape.
+
+    ``bind`` allocates just the clauses holding the search terms, years and
+    paging; field lists, the sort and ``_source`` are shared by every body
+    built from the template, so they must never be mutated.
+    """
+    
+    def __init__(self, fields: Tuple[str, ...], sort_by: SortField, sort_order: SortOrder,
+                 projection: Optional[Tuple[str, ...]]):
+        # Fuzzy match on the prize-level text fields
+        prize_fields = [f for f in fields if not f.startswith('laureates.') and f != "year"]
+        self.prize_fields = [f"{field}^{SEARCH_FIELD_BOOSTS[field]}" for field in prize_fields]
+        # year is numeric: match the numbers in the query exactly
+        self.match_years = "year" in fields
+        # Laureate fields live in nested documents, so they are only reachable through a nested query
+        laureate_fields = [f for f in fields if f.startswith('laureates.')]
+        self.laureate_fields = [f"{field}^{SEARCH_FIELD_BOOSTS[field]}" for field in laureate_fields]
+        # Only fetch what the response needs
+        self.source = {"includes": source_includes(list(projection) if projection else None)}
         
-        # Add nested queries for laureate fields
-        laureate_fields = [f for f in include_fields if f.startswith('laureates.')]
-        if laureate_fields:
-            query["query"]["bool"]["should"].append({
+        if sort_by == SortField.SCORE:
+            # When sorting by score, just use score
+            self.sort = [{"_score": {"order": sort_order.value}}]
+        else:
+            # When sorting by other fields, use that field first, then score as a tiebreaker
+            self.sort = [
+                {SORT_FIELDS[sort_by]: {"order": sort_order.value}},
+                {"_score": {"order": "desc"}}  # Always use score as secondary sort
+            ]
+    
+    def bind(self, q: str, page: int, size: int, year_from: Optional[int] = None,
+             year_to: Optional[int] = None) -> dict:
+        should = []
+        # multi_match's defaults (best_fields, operator or) are left out to keep the body small
+        if self.prize_fields:
+            should.append({"multi_match": {"query": q, "fields": self.prize_fields, "fuzziness": "AUTO"}})
+        years = year_terms(q) if self.match_years else None
+        if years:
+            should.append({"terms": {"year": years, "boost": SEARCH_FIELD_BOOSTS["year"]}})
+        if self.laureate_fields:
+            should.append({
                 "nested": {
                     "path": "laureates",
-                    "query": {
-                        "multi_match": {
-                            "query": search_params.q,
-                            "fields": laureate_fields,
-                            "type": "best_fields",
-                            "fuzziness": "AUTO",
-                            "operator": "or"
-                        }
-                    },
+                    "query": {"multi_match": {"query": q, "fields": self.laureate_fields, "fuzziness": "AUTO"}},
                     "score_mode": "max"
                 }
             })
         
-        # Configure sorting
-        if search_params.sort_by == SortField.SCORE:
-            # When sorting by score, just use score
-            query["sort"] = [{"_score": {"order": search_params.sort_order}}]
-        else:
-            # When sorting by other fields, use that field first, then score as a tiebreaker
-            query["sort"] = [
-                {search_params.sort_by: {"order": search_params.sort_order}},
-                {"_score": {"order": "desc"}}  # Always use score as secondary sort
+        bool_query = {"should": should, "minimum_should_match": 1}
+        # Restrict to a range of years
+        year_filter = year_range_filter(year_from, year_to)
+        if year_filter is not None:
+            bool_query["filter"] = [year_filter]
+        return {
+            "query": {"bool": bool_query},
+            "from": (page - 1) * size,
+            "size": size,
+            "_source": self.source,
+            "sort": self.sort
+        }
+
+@lru_cache(maxsize=QUERY_TEMPLATE_CACHE_SIZE)
+def search_query_template(fields: Tuple[str, ...], sort_by: SortField, sort_order: SortOrder,
+                          projection: Optional[Tuple[str, ...]] = None) -> SearchQueryTemplate:
+    return SearchQueryTemplate(fields, sort_by, sort_order, projection)
+
+def build_search_query(params: FlexibleSearchParams) -> dict:
+    """Build the Elasticsearch request body for a flexible search from its shape's cached template"""
+    template = search_query_template(tuple(search_fields(params)), params.sort_by, params.sort_order,
+                                     tuple(params.fields) if params.fields else None)
+    return template.bind(params.q, params.page, params.size, params.year_from, params.year_to)
+
+def build_laureate_search_query(params: FlexibleSearchParams) -> dict:
+    """Build the request body for a laureate-mode search on the flat laureate index.
+
+    Same clauses as ``build_search_query`` with the nested query unwrapped,
+    since each document holds a single laureate. Hits are collapsed on the
+    prize so every prize appears once, ranked by its best laureate.
+    """
+    query = build_search_query(params)
+    query["query"]["bool"]["should"] = [
+        clause["nested"]["query"] if "nested" in clause else clause
+        for clause in query["query"]["bool"]["should"]
+    ]
+    query["_source"] = {"includes": [f"prize.{field}" for field in query["_source"]["includes"]]}
+    query["collapse"] = {"field": "prize_id"}
+    # Hit totals count laureates; the number of distinct prizes is the total to report
+    query["aggs"] = {"prizes": {"cardinality": {"field": "prize_id"}}}
+    return query
+
+def laureate_results_as_prizes(results: dict) -> dict:
+    """Turn a collapsed laureate-index response into a prize-shaped one"""
+    hits = results["hits"]
+    total = results.get("aggregations", {}).get("prizes", {}).get("value", hits["total"]["value"])
+    return {
+        **results,
+        "hits": {
+            **hits,
+            "total": {"value": total, "relation": "eq"},
+            "hits": [
+                {**hit, "_id": hit.get("fields", {}).get("prize_id", [hit["_id"]])[0],
+                 "_source": hit["_source"].get("prize", {})}
+                for hit in hits["hits"]
             ]
-        
-        # Execute search
-        results = get_elasticsearch().search(index="nobel_prizes", body=query)
-        
-        # Process and validate results
-        processed_results = []
-        for hit in results["hits"]["hits"]:
+        }
+    }
+
+def year_range_filter(year_from: Optional[int], year_to: Optional[int]) -> Optional[dict]:
+    if year_from is None and year_to is None:
+        return None
+    year_range = {}
+    if year_from is not None:
+        year_range["gte"] = year_from
+    if year_to is not None:
+        year_range["lte"] = year_to
+    return {"range": {"year": year_range}}
+
+def year_terms(q: str) -> List[int]:
+    """Four-digit numbers in the query, matched against the numeric year field"""
+    return sorted({int(token) for token in re.findall(r"\b\d{4}\b", q)})
+
+def client_timeout(deadline: Optional[Deadline]) -> dict:
+    """Client call kwargs bounding an Elasticsearch request by ``deadline``"""
+    return {} if deadline is None else {"request_timeout": deadline.check()}
+
+def apply_deadline(query: dict, deadline: Optional[Deadline]) -> dict:
+    """Set the search-level ``timeout`` in ``query`` and return the matching client kwargs.
+
+    Elasticsearch returns the hits it found so far (``timed_out: true``)
+    when the search-level timeout fires, before the client gives up.
+    """
+    if deadline is None:
+        return {}
+    query["timeout"] = deadline.es_timeout()
+    return client_timeout(deadline)
+
+def execute_search(params: FlexibleSearchParams, cursor: Optional[SearchCursor] = None,
+                   deadline: Optional[Deadline] = None, profile: bool = False) -> dict:
+    """Run a flexible search on the configured backend and return an Elasticsearch-shaped response.
+
+    With a cursor, pages with ``search_after`` instead of ``from`` and pins
+    Elasticsearch searches to a point-in-time. With a deadline, the search
+    is bounded by its remaining time. With ``profile``, Elasticsearch adds
+    per-clause timings under ``profile``.
+    """
+    search_after = cursor.search_after if cursor is not None else None
+    if SEARCH_BACKEND == "memory":
+        if deadline is not None:
+            deadline.check()
+        return memory_index.search(params, search_fields(params), search_after=search_after,
+                                   paged=cursor is None)
+    
+    es = get_elasticsearch()
+    if params.mode == SearchMode.LAUREATE:
+        with metrics.SEARCH_STAGE_SECONDS.time(stage="build_query"):
+            query = build_laureate_search_query(params)
+        if profile:
+            query["profile"] = True
+        timeout = apply_deadline(query, deadline)
+        return laureate_results_as_prizes(_timed_search(es, index=LAUREATE_ALIAS, body=query, **timeout))
+    
+    with metrics.SEARCH_STAGE_SECONDS.time(stage="build_query"):
+        query = build_search_query(params)
+    if profile:
+        query["profile"] = True
+    if cursor is None:
+        return _timed_search(es, index=INDEX_ALIAS, body=query, **apply_deadline(query, deadline))
+    
+    query.pop("from")
+    if search_after is not None:
+        query["search_after"] = search_after
+    pit_id = cursor.pit_id or es.open_point_in_time(
+        index=INDEX_ALIAS, keep_alive=PIT_KEEP_ALIVE, **client_timeout(deadline)
+    )["id"]
+    # The point-in-time adds an implicit _shard_doc tiebreaker to the sort
+    query["pit"] = {"id": pit_id, "keep_alive": PIT_KEEP_ALIVE}
+    results = _timed_search(es, body=query, **apply_deadline(query, deadline))
+    results.setdefault("pit_id", pit_id)
+    return results
+
+def _timed_search(es: Elasticsearch, **kwargs) -> dict:
+    started = time.perf_counter()
+    results = es.search(**kwargs)
+    metrics.record_search_timing(time.perf_counter() - started, results)
+    return results
+
+def search_cursor_after(params: FlexibleSearchParams, results: dict) -> Optional[str]:
+    """Cursor for the page after ``results``, or None on the last page"""
+    hits = results["hits"]["hits"]
+    if len(hits) < params.size:
+        return None
+    return SearchCursor(search_after=hits[-1]["sort"], pit_id=results.get("pit_id"),
+                        shape=params.shape_key()).encode()
+
+def next_search_cursor(params: FlexibleSearchParams, results: dict) -> Optional[str]:
+    """Like ``search_cursor_after``, closing the point-in-time after the last page"""
+    cursor = search_cursor_after(params, results)
+    pit_id = results.get("pit_id")
+    if cursor is None and pit_id:
+        try:
+            get_elasticsearch().close_point_in_time(body={"id": pit_id})
+        except Exception as e:
+            logger.warning(f"Failed to close point-in-time: {e}")
+    return cursor
+
+def load_memory_index(source: Optional[str] = None) -> MemorySearchIndex:
+    """Build the in-process search index from the data source and swap it in"""
+    global memory_index
+    if source is None:
+        source = os.getenv("NOBEL_DATA_SOURCE", NOBEL_API_URL)
+    
+    logger.info(f"Building in-memory search index from {source}...")
+    started = time.perf_counter()
+    prizes = iter_prizes(source)
+    index = MemorySearchIndex((prize_id(prize), prize) for prize in prizes)
+    memory_index = index
+    search_cache.clear()
+    logger.info(f"In-memory index built with {len(index)} prizes in {time.perf_counter() - started:.2f}s")
+    return index
+
+def search_params_from_args(args) -> FlexibleSearchParams:
+    """Parse /search query string arguments (a Werkzeug or aiohttp multidict).
+
+    Validated parameters are memoized on the raw arguments and shared, so
+    they must not be mutated. Cursor searches, whose arguments never
+    repeat, are validated every time.
+    """
+    getlist = args.getlist if hasattr(args, "getlist") else lambda key: args.getall(key, [])
+    raw = (
+        args.get('q'), tuple(getlist('include')), tuple(getlist('exclude')),
+        int(args.get('page', 1)), int(args.get('size', 10)),
+        args.get('sort_by', SortField.SCORE), args.get('sort_order', SortOrder.DESC),
+        args.get('cursor'), tuple(getlist('fields')),
+        args.get('year_from'), args.get('year_to'), args.get('mode', SearchMode.PRIZE)
+    )
+    if raw[7] is not None:
+        return _validate_search_params(*raw)
+    return _memoized_search_params(*raw)
+
+def _validate_search_params(q, include, exclude, page, size, sort_by, sort_order, cursor, fields,
+                            year_from, year_to, mode) -> FlexibleSearchParams:
+    return FlexibleSearchParams(
+        q=q,
+        include=list(include),
+        exclude=list(exclude),
+        page=page,
+        size=size,
+        sort_by=sort_by,
+        sort_order=sort_order,
+        cursor=cursor,
+        fields=list(fields),
+        year_from=year_from,
+        year_to=year_to,
+        mode=mode
+    )
+
+# Failed validations raise, so only valid parameters are ever cached
+_memoized_search_params = lru_cache(maxsize=SEARCH_PARAMS_CACHE_SIZE)(_validate_search_params)
+
+def prizes_of_hits(params: FlexibleSearchParams, hits: List[dict]) -> List[dict]:
+    """Response documents for search hits: projected, or normalized and validated"""
+    prizes = []
+    for hit in hits:
+        if params.fields:
+            prizes.append(project_prize(hit["_source"], params.fields))
+            continue
+        prize = normalize_prize(hit["_source"])
+        if prize is None:
             try:
-                prize = Prize(**hit["_source"])
-                processed_results.append({
-                    **prize.dict(),
-                    "score": hit["_score"]
-                })
+                prize = Prize(**hit["_source"]).dict()
             except ValidationError as e:
                 logger.error(f"Validation error for hit {hit['_id']}: {str(e)}")
                 continue
+        prizes.append(prize)
+    return prizes
+
+def search_result_body(params: FlexibleSearchParams, results: dict, next_cursor: Optional[str] = None,
+                       profile: Optional[dict] = None) -> bytes:
+    """Serialize the /search response straight from the search hits.
+
+    Well-formed documents are copied without pydantic; anything unusual is
+    validated with the Prize model (and skipped if invalid), so the output
+    matches ``SearchResult`` either way. A ``profile`` summary is added
+    as is.
+    """
+    processed_results = prizes_of_hits(params, results["hits"]["hits"])
+    body = {
+        "total": results["hits"]["total"]["value"],
+        "page": params.page,
+        "size": params.size,
+        "results": processed_results,
+        "score": None,
+        "next_cursor": next_cursor
+    }
+    if profile is not None:
+        body["profile"] = profile
+    return encode_json(body)
+
+def facet_params_from_args(args) -> FacetParams:
+    """Parse /facets query string arguments (a Werkzeug or aiohttp multidict)"""
+    getlist = args.getlist if hasattr(args, "getlist") else lambda key: args.getall(key, [])
+    return FacetParams(
+        q=args.get('q') or None,
+        include=getlist('include'),
+        exclude=getlist('exclude'),
+        year_from=args.get('year_from'),
+        year_to=args.get('year_to')
+    )
+
+def facet_cache_key(params: FacetParams) -> tuple:
+    q = " ".join(params.q.lower().split()) if params.q else None
+    fields = tuple(sorted(set(search_fields(params)))) if q else None
+    return ("facets", q, fields, params.year_from, params.year_to)
+
+def build_facet_query(params: FacetParams) -> dict:
+    """Aggregation-only request: prizes and laureates per category and per decade"""
+    search_params = params.search_params()
+    if search_params is not None:
+        query = build_search_query(search_params)["query"]
+    else:
+        year_filter = year_range_filter(params.year_from, params.year_to)
+        query = {"bool": {"filter": [year_filter]}} if year_filter is not None else {"match_all": {}}
+    laureates = {"nested": {"path": "laureates"}}
+    return {
+        "size": 0,
+        "track_total_hits": True,
+        "query": query,
+        "aggs": {
+            "categories": {"terms": {"field": "category.keyword", "size": 50},
+                           "aggs": {"laureates": laureates}},
+            "decades": {"histogram": {"field": "year", "interval": 10, "min_doc_count": 1},
+                        "aggs": {"laureates": laureates}},
+            "laureates": laureates
+        }
+    }
+
+def facet_result_body(results: dict) -> bytes:
+    aggs = results["aggregations"]
+    return encode_json(FacetResult(
+        total=results["hits"]["total"]["value"],
+        laureates=aggs["laureates"]["doc_count"],
+        categories=[
+            {"category": b["key"], "prizes": b["doc_count"], "laureates": b["laureates"]["doc_count"]}
+            for b in aggs["categories"]["buckets"]
+        ],
+        decades=[
+            {"decade": int(b["key"]), "prizes": b["doc_count"], "laureates": b["laureates"]["doc_count"]}
+            for b in aggs["decades"]["buckets"]
+        ]
+    ).dict())
+
+@app.route('/facets')
+def facets():
+    """Prize and laureate counts per category and decade, optionally for a search"""
+    try:
+        params = facet_params_from_args(request.args)
+    except ValidationError as e:
+        return jsonify(ErrorResponse(error="Invalid facet parameters", details=str(e)).dict()), 400
+    
+    cache_key = facet_cache_key(params)
+    cached = search_cache.get(cache_key)
+    if cached is not None:
+        return _json_response(cached, cache_status="HIT")
+    cache_generation = search_cache.generation
+    
+    try:
+        if SEARCH_BACKEND == "memory":
+            results = memory_index.facets(params, search_fields(params))
+        else:
+            # size=0 requests are served from the shard request cache until the next refresh
+            results = get_elasticsearch().search(index=INDEX_ALIAS, body=build_facet_query(params),
+                                                 request_cache=True, **client_timeout(g.get("deadline")))
+        body = facet_result_body(results)
+    except Exception as e:
+        unavailable = unavailable_response(e)
+        if unavailable is not None:
+            return unavailable
+        logger.error(f"Facets error: {str(e)}")
+        return jsonify(ErrorResponse(error="Internal server error", details=str(e)).dict()), 500
+    
+    search_cache.put(cache_key, body, generation=cache_generation)
+    return _json_response(body, cache_status="MISS")
+
+def execute_search_batch(batch: List[FlexibleSearchParams], deadline: Optional[Deadline] = None) -> List[dict]:
+    """Run several searches in one round trip; failed searches come back as ``{"error": ..., "status": ...}``"""
+    if not batch:
+        return []
+    if SEARCH_BACKEND == "memory":
+        return [execute_search(params, deadline=deadline) for params in batch]
+    
+    body = []
+    timeout = {}
+    for params in batch:
+        if params.mode == SearchMode.LAUREATE:
+            body.append({"index": LAUREATE_ALIAS})
+            body.append(build_laureate_search_query(params))
+        else:
+            body.append({"index": INDEX_ALIAS})
+            body.append(build_search_query(params))
+        timeout = apply_deadline(body[-1], deadline)
+    responses = get_elasticsearch().msearch(body=body, **timeout)["responses"]
+    return [
+        laureate_results_as_prizes(response)
+        if params.mode == SearchMode.LAUREATE and "error" not in response else response
+        for params, response in zip(batch, responses)
+    ]
+
+def profile_error(admin_token: Optional[str]) -> Optional[tuple]:
+    """``(ErrorResponse, status)`` when a profiled search is not allowed, else None"""
+    if not is_admin(admin_token):
+        return ErrorResponse(error="Profiling requires admin access",
+                             details="Send a valid X-Admin-Token header"), 403
+    if SEARCH_BACKEND == "memory":
+        return ErrorResponse(error="Profiling is only available on the Elasticsearch backend"), 400
+    return None
+
+@app.route('/search')
+def flexible_search():
+    started = time.perf_counter()
+    try:
+        # Validate and parse search parameters
+        with metrics.SEARCH_STAGE_SECONDS.time(stage="validate"):
+            search_params = search_params_from_args(request.args)
         
-        # Create and validate response
-        response = SearchResult(
-            total=results["hits"]["total"]["value"],
-            page=search_params.page,
-            size=search_params.size,
-            results=processed_results
-        )
+        profile = profile_requested(request.args)
+        if profile:
+            denied = profile_error(request.headers.get("X-Admin-Token"))
+            if denied is not None:
+                return jsonify(denied[0].dict()), denied[1]
+        
+        cursor = search_params.search_cursor()
+        # Profiled searches always reach Elasticsearch and their timings are never cached
+        cacheable = cursor is None and not profile
+        if cacheable:
+            with metrics.SEARCH_STAGE_SECONDS.time(stage="cache"):
+                cache_key = search_cache_key(search_params)
+                cached = search_cache.get(cache_key)
+            if cached is not None:
+                return _json_response(cached, cache_status="HIT")
+            cache_generation = search_cache.generation
+        
+        results = execute_search(search_params, cursor, deadline=g.get("deadline"), profile=profile)
         
-        return jsonify(response.dict())
+        next_cursor = next_search_cursor(search_params, results) if cursor is not None else None
+        with metrics.SEARCH_STAGE_SECONDS.time(stage="serialize"):
+            body = search_result_body(search_params, results, next_cursor,
+                                      profile=summarize_profile(results.get("profile", {})) if profile else None)
+        slow_query_log.observe(search_params, results, (time.perf_counter() - started) * 1000)
+        
+        if results.get("timed_out"):
+            # Partial hits from shards that ran out of time: served, flagged and never cached
+            metrics.REQUEST_TIMEOUTS.inc(outcome="partial")
+            response = _json_response(body)
+            response.headers["X-Partial-Results"] = "true"
+            return response
+        if not cacheable:
+            return _json_response(body)
+        search_cache.put(cache_key, body, generation=cache_generation)
+        return _json_response(body, cache_status="MISS")
         
     except ValidationError as e:
         logger.error(f"Validation error: {str(e)}")
@@ -313,20 +1282,265 @@ def flexible_search():
             details=str(e)
         ).dict()), 400
         
+    except NotFoundError as e:
+        logger.error(f"Search target not found: {str(e)}")
+        if request.args.get('cursor'):
+            # The point-in-time behind the cursor has expired
+            return jsonify(ErrorResponse(
+                error="Search cursor expired",
+                details=str(e)
+            ).dict()), 400
+        return jsonify(ErrorResponse(
+            error="Internal server error",
+            details=str(e)
+        ).dict()), 500
+        
     except Exception as e:
+        unavailable = unavailable_response(e)
+        if unavailable is not None:
+            return unavailable
         logger.error(f"Search error: {str(e)}")
         return jsonify(ErrorResponse(
             error="Internal server error",
             details=str(e)
         ).dict()), 500
 
+def export_pages(params: FlexibleSearchParams) -> Iterator[List[dict]]:
+    """Hits of every prize matching ``params``, ``params.size`` at a time.
+
+    Elasticsearch pages with ``search_after`` over a point-in-time, which
+    is closed when the generator finishes or is closed early.
+    """
+    fields = search_fields(params)
+    if SEARCH_BACKEND == "memory":
+        search_after = None
+        while True:
+            hits = memory_index.search(params, fields, search_after=search_after, paged=False)["hits"]["hits"]
+            if hits:
+                yield hits
+            if len(hits) < params.size:
+                return
+            search_after = hits[-1]["sort"]
+    
+    es = get_elasticsearch()
+    query = build_search_query(params)
+    query.pop("from")
+    query["track_total_hits"] = False
+    pit_id = es.open_point_in_time(index=INDEX_ALIAS, keep_alive=PIT_KEEP_ALIVE, **client_timeout(Deadline()))["id"]
+    try:
+        while True:
+            query["pit"] = {"id": pit_id, "keep_alive": PIT_KEEP_ALIVE}
+            # Each page gets a request budget of its own, not the whole export
+            results = es.search(body=query, **client_timeout(Deadline()))
+            pit_id = results.get("pit_id", pit_id)
+            hits = results["hits"]["hits"]
+            if hits:
+                yield hits
+            if len(hits) < params.size:
+                return
+            query["search_after"] = hits[-1]["sort"]
+    finally:
+        try:
+            es.close_point_in_time(body={"id": pit_id})
+        except Exception as e:
+            logger.warning(f"Failed to close export point-in-time: {e}")
+
+def export_body(params: FlexibleSearchParams, pages: Iterator[List[dict]], first: Optional[List[dict]] = None,
+                compress: bool = False) -> Iterator[bytes]:
+    """One NDJSON chunk per page, starting with an already fetched ``first`` page.
+
+    With ``compress``, a gzip stream flushed after every page.
+    """
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS) if compress else None
+    try:
+        for hits in chain([first] if first is not None else [], pages):
+            prizes = prizes_of_hits(params, hits)
+            chunk = b"".join(encode_json(prize) + b"\n" for prize in prizes)
+            metrics.EXPORTED_DOCUMENTS.inc(len(prizes))
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH) if compressor else chunk
+        if compressor:
+            yield compressor.flush()
+    except Exception as e:
+        # Headers are sent already: the client sees a truncated stream
+        logger.error(f"Export aborted: {str(e)}")
+        raise
+    finally:
+        # Runs on client disconnect too, releasing the point-in-time
+        pages.close()
+
+@app.route('/export')
+def export():
+    """Stream every prize matching a search as NDJSON, gzip-compressed if the client accepts it"""
+    try:
+        params = search_params_from_args(request.args)
+    except ValidationError as e:
+        return jsonify(ErrorResponse(error="Invalid search parameters", details=str(e)).dict()), 400
+    if params.mode == SearchMode.LAUREATE:
+        return jsonify(ErrorResponse(error="Export is not supported in laureate mode").dict()), 400
+    # Pages are sized for throughput, beyond the per-request cap of /search
+    params = params.model_copy(update={"page": 1, "size": EXPORT_BATCH_SIZE, "cursor": None})
+    
+    pages = export_pages(params)
+    try:
+        # Fetched up front so a failing cluster still gets a proper status code
+        first = next(pages, None)
+    except Exception as e:
+        unavailable = unavailable_response(e)
+        if unavailable is not None:
+            return unavailable
+        logger.error(f"Export error: {str(e)}")
+        return jsonify(ErrorResponse(error="Internal server error", details=str(e)).dict()), 500
+    
+    compress = "gzip" in request.accept_encodings
+    response = app.response_class(export_body(params, pages, first, compress), mimetype="application/x-ndjson")
+    response.headers["Vary"] = "Accept-Encoding"
+    if compress:
+        response.headers["Content-Encoding"] = "gzip"
+    return response
+
+@app.route('/search/_batch', methods=['POST'])
+def batch_search():
+    """Run several searches in one request and one Elasticsearch msearch call"""
+    try:
+        batch = BatchSearchRequest.model_validate(request.get_json() or {})
+    except ValidationError as e:
+        logger.error(f"Validation error: {str(e)}")
+        return jsonify(ErrorResponse(
+            error="Invalid batch request",
+            details=str(e)
+        ).dict()), 400
+    
+    try:
+        # Serialized response per query, filled from the cache, validation errors and msearch
+        responses: List[Optional[bytes]] = [None] * len(batch.queries)
+        pending = []
+        cache_generation = search_cache.generation
+        for position, query in enumerate(batch.queries):
+            try:
+                params = FlexibleSearchParams(**query)
+            except ValidationError as e:
+                responses[position] = _batch_error("Invalid search parameters", str(e), 400)
+                continue
+            if params.cursor is not None:
+                responses[position] = _batch_error(
+                    "Invalid search parameters", "Cursor paging is not supported in batch searches", 400
+                )
+                continue
+            
+            cache_key = search_cache_key(params)
+            cached = search_cache.get(cache_key)
+            if cached is not None:
+                responses[position] = cached
+            else:
+                pending.append((position, params, cache_key))
+        
+        results = execute_search_batch([params for _, params, _ in pending], deadline=g.get("deadline"))
+        partial = False
+        for (position, params, cache_key), result in zip(pending, results):
+            if "error" in result:
+                responses[position] = _batch_error(
+                    "Search failed", json.dumps(result["error"]), result.get("status", 500)
+                )
+                continue
+            body = search_result_body(params, result)
+            if result.get("timed_out"):
+                partial = True
+            else:
+                search_cache.put(cache_key, body, generation=cache_generation)
+            responses[position] = body
+        
+        response = _json_response(b'{"responses":[' + b",".join(responses) + b"]}")
+        if partial:
+            metrics.REQUEST_TIMEOUTS.inc(outcome="partial")
+            response.headers["X-Partial-Results"] = "true"
+        return response
+    
+    except Exception as e:
+        unavailable = unavailable_response(e)
+        if unavailable is not None:
+            return unavailable
+        logger.error(f"Batch search error: {str(e)}")
+        return jsonify(ErrorResponse(
+            error="Internal server error",
+            details=str(e)
+        ).dict()), 500
+
+def unavailable_response(e: Exception):
+    """503 while the circuit is open, 504 when the time budget ran out; None for any other error"""
+    if isinstance(e, ServiceUnavailable):
+        logger.warning(f"Failing fast: {str(e)}")
+        response = jsonify(ErrorResponse(error="Search temporarily unavailable", details=str(e)).dict())
+        response.status_code = 503
+        response.headers["Retry-After"] = str(max(1, math.ceil(e.retry_after)))
+        return response
+    if isinstance(e, (DeadlineExceeded, ConnectionTimeout)):
+        logger.warning(f"Request timed out: {str(e)}")
+        metrics.REQUEST_TIMEOUTS.inc(outcome="failed")
+        response = jsonify(ErrorResponse(error="Request timed out", details=str(e)).dict())
+        response.status_code = 504
+        return response
+    return None
+
+def _batch_error(error: str, details: str, status: int) -> bytes:
+    return json.dumps({**ErrorResponse(error=error, details=details).dict(), "status": status}).encode("utf-8")
+
+def load_initial_data(background: bool = True):
+    """Startup data load; returns once searches can be served.
+
+    With ``background``, a reload over an existing index runs on a thread
+    and the current generation keeps serving; otherwise it runs to completion.
+    """
+    if SEARCH_BACKEND == "memory":
+        # Searches are served in-process; Elasticsearch is only needed for writes
+        load_memory_index()
+        return
+    es = get_elasticsearch()
+    exists = bool(get_alias_indices(es))
+    if os.getenv("DATA_SYNC", "full") == "incremental":
+        # Only changed prizes are written; the state file remembers what is indexed
+        import sync
+        if exists and background:
+            sync.sync_in_background(es)
+        else:
+            sync.sync(es)
+    elif exists and background:
+        # Keep serving the current generation while the new one is built
+        reindex_in_background(es)
+    else:
+        reindex(es)
+
+def wait_for_index():
+    """Startup step for processes that serve an index loaded elsewhere; raises until it exists"""
+    if not get_alias_indices(get_elasticsearch()):
+        raise RuntimeError(f"{INDEX_ALIAS} has not been loaded yet")
+
+def start_background_startup(load=load_initial_data) -> StartupPipeline:
+    """Connect and ``load`` on a background thread so the server can bind its port right away"""
+    if SEARCH_BACKEND == "memory":
+        return StartupPipeline(health_state, load).start()
+    
+    def connect():
+        set_elasticsearch(connect_elasticsearch())
+    
+    def check():
+        get_elasticsearch().info(request_timeout=HEALTH_CHECK_TIMEOUT)
+    
+    return StartupPipeline(health_state, load, connect=connect, check=check).start()
+
 if __name__ == '__main__':
     try:
-        # Initialize Elasticsearch
-        es = get_elasticsearch()
-        create_index(es)
-        load_nobel_data(es)
-        app.run(host='0.0.0.0', port=5000)
+        server_mode = os.getenv("SERVER_MODE", "sync")
+        if server_mode == "prefork":
+            # Workers are forked from a master process that loads the data once
+            import prefork
+            prefork.run(host='0.0.0.0', port=5000)
+        else:
+            start_background_startup()
+            if server_mode == "async":
+                import async_app
+                async_app.run(host='0.0.0.0', port=5000)
+            else:
+                app.run(host='0.0.0.0', port=5000)
     except Exception as e:
         logger.error(f"Application failed to start: {str(e)}")
-        raise 
\ No newline at end of file
+        raise
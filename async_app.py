@@ -0,0 +1,446 @@
+from aiohttp import web
+from elasticsearch import AsyncElasticsearch
+from elasticsearch.exceptions import ConflictError, ConnectionTimeout, NotFoundError
+from pydantic import ValidationError
+from typing import Optional
+import logging
+import math
+import os
+import time
+
+import app as sync_app
+import metrics
+from app import (
+    INDEX_ALIAS, LAUREATE_ALIAS, PIT_KEEP_ALIVE, UNLIMITED_PATHS, apply_deadline, build_facet_query, build_laureate_search_query,
+    build_search_query, document_cache, facet_cache_key, facet_params_from_args, facet_result_body, laureate_bulk_body,
+    client_timeout, laureate_results_as_prizes, prize_document_body, profile_error, laureates_of_prizes_query, search_cache, search_cache_key,
+    search_cursor_after, search_fields, search_params_from_args, search_result_body, slow_query_log,
+    suggest_cache_key, suggest_params_from_args, suggest_result_body
+)
+from ingest import prize_id
+from models import ErrorResponse, FlexibleSearchParams, PrizeCreate, SearchCursor, SearchMode
+from profiling import profile_requested, summarize_profile
+from resilience import (
+    REQUEST_DEADLINE, SHED_RETRY_AFTER, Deadline, DeadlineExceeded, ServiceUnavailable, guarded_async_transport
+)
+from suggest import build_suggest_query, parse_suggest_response, with_suggest_inputs
+
+logger = logging.getLogger(__name__)
+
+# Connections kept open to Elasticsearch, shared by every in-flight request
+ES_MAX_CONNECTIONS = sync_app.ES_MAX_CONNECTIONS
+
+routes = web.RouteTableDef()
+
+
+def get_elasticsearch(request: web.Request) -> AsyncElasticsearch:
+    return request.app["es"]
+
+
+def _json(data, status: int = 200) -> web.Response:
+    return web.json_response(data, status=status)
+
+
+def _json_bytes(body: bytes, status: int = 200, cache_status: Optional[str] = None) -> web.Response:
+    response = web.Response(body=body, status=status, content_type="application/json")
+    if cache_status:
+        response.headers["X-Cache"] = cache_status
+    return response
+
+
+async def execute_search(es: AsyncElasticsearch, params: FlexibleSearchParams,
+                         cursor: Optional[SearchCursor] = None, deadline: Optional[Deadline] = None,
+                         profile: bool = False) -> dict:
+    """Async counterpart of ``app.execute_search``"""
+    search_after = cursor.search_after if cursor is not None else None
+    if sync_app.SEARCH_BACKEND == "memory":
+        if deadline is not None:
+            deadline.check()
+        return sync_app.memory_index.search(params, search_fields(params), search_after=search_after,
+                                            paged=cursor is None)
+
+    if params.mode == SearchMode.LAUREATE:
+        with metrics.SEARCH_STAGE_SECONDS.time(stage="build_query"):
+            query = build_laureate_search_query(params)
+        if profile:
+            query["profile"] = True
+        timeout = apply_deadline(query, deadline)
+        return laureate_results_as_prizes(await _timed_search(es, index=LAUREATE_ALIAS, body=query, **timeout))
+
+    with metrics.SEARCH_STAGE_SECONDS.time(stage="build_query"):
+        query = build_search_query(params)
+    if profile:
+        query["profile"] = True
+    if cursor is None:
+        return await _timed_search(es, index=INDEX_ALIAS, body=query, **apply_deadline(query, deadline))
+
+    query.pop("from")
+    if search_after is not None:
+        query["search_after"] = search_after
+    pit_id = cursor.pit_id or (await es.open_point_in_time(
+        index=INDEX_ALIAS, keep_alive=PIT_KEEP_ALIVE, **client_timeout(deadline)
+    ))["id"]
+    query["pit"] = {"id": pit_id, "keep_alive": PIT_KEEP_ALIVE}
+    results = await _timed_search(es, body=query, **apply_deadline(query, deadline))
+    results.setdefault("pit_id", pit_id)
+    return results
+
+
+async def _timed_search(es: AsyncElasticsearch, **kwargs) -> dict:
+    started = time.perf_counter()
+    results = await es.search(**kwargs)
+    metrics.record_search_timing(time.perf_counter() - started, results)
+    return results
+
+
+async def sync_laureates(es: AsyncElasticsearch, prizes: list, replace: bool = True):
+    """Async counterpart of ``app.sync_laureates``"""
+    try:
+        if replace:
+            await es.delete_by_query(index=LAUREATE_ALIAS, conflicts="proceed", body=laureates_of_prizes_query(prizes))
+        body = laureate_bulk_body(prizes)
+        if body:
+            response = await es.bulk(body=body)
+            if response.get("errors"):
+                logger.error(f"Some laureate documents failed to index for {len(prizes)} prizes")
+    except Exception as e:
+        logger.error(f"Error syncing laureate index: {e}")
+
+
+def _unavailable(e: Exception) -> Optional[web.Response]:
+    """Async counterpart of ``app.unavailable_response``"""
+    if isinstance(e, ServiceUnavailable):
+        logger.warning(f"Failing fast: {str(e)}")
+        response = _json(ErrorResponse(error="Search temporarily unavailable", details=str(e)).dict(), status=503)
+        response.headers["Retry-After"] = str(max(1, math.ceil(e.retry_after)))
+        return response
+    if isinstance(e, (DeadlineExceeded, ConnectionTimeout)):
+        logger.warning(f"Request timed out: {str(e)}")
+        metrics.REQUEST_TIMEOUTS.inc(outcome="failed")
+        return _json(ErrorResponse(error="Request timed out", details=str(e)).dict(), status=504)
+    return None
+
+
+@web.middleware
+async def admit_request(request, handler):
+    """Shed requests beyond the in-flight limit and give admitted ones their time budget"""
+    if request.path in UNLIMITED_PATHS:
+        return await handler(request)
+    if not sync_app.request_limiter.try_acquire():
+        metrics.REQUESTS_SHED.inc()
+        response = _json(ErrorResponse(
+            error="Server overloaded", details=f"More than {sync_app.request_limiter.limit} requests in flight"
+        ).dict(), status=503)
+        response.headers["Retry-After"] = str(SHED_RETRY_AFTER)
+        return response
+    request["deadline"] = Deadline(REQUEST_DEADLINE)
+    try:
+        return await handler(request)
+    finally:
+        sync_app.request_limiter.release()
+
+
+@web.middleware
+async def observe_request(request, handler):
+    """Record the per-route request duration histogram"""
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await handler(request)
+        status = response.status
+        return response
+    except web.HTTPException as e:
+        status = e.status
+        raise
+    finally:
+        resource = request.match_info.route.resource
+        route = resource.canonical if resource is not None else "unmatched"
+        metrics.HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started, route=route, method=request.method, status=status
+        )
+
+
+@routes.get('/')
+async def index(request):
+    return _json({"message": "Welcome to Nobel Prize Search API!"})
+
+
+@routes.get('/health')
+async def health(request):
+    """Health check endpoint"""
+    try:
+        await get_elasticsearch(request).info()
+        return web.Response(text="OK")
+    except Exception as e:
+        logger.error(f"Health check failed: {e}")
+        return _json({"error": "Service unhealthy", "detail": str(e)}, status=500)
+
+
+@routes.get('/livez')
+async def livez(request):
+    """Liveness probe: answers as soon as the port is bound, whatever the startup phase"""
+    return _json({"status": "alive", "phase": sync_app.health_state.phase})
+
+
+@routes.get('/readyz')
+async def readyz(request):
+    """Readiness probe from the cached startup and Elasticsearch state; never calls Elasticsearch"""
+    state = sync_app.health_state.snapshot()
+    return _json(state, status=200 if state["status"] == "ready" else 503)
+
+
+@routes.post('/prize')
+async def add_prize(request):
+    """Add a new Nobel Prize record"""
+    try:
+        es = get_elasticsearch(request)
+        prize = PrizeCreate(**await request.json())
+        doc = prize.dict()
+        doc_id = prize_id(doc)
+
+        await es.index(index=INDEX_ALIAS, id=doc_id, op_type="create", body=with_suggest_inputs(doc))
+        await sync_laureates(es, [(doc_id, doc)], replace=False)
+        if sync_app.SEARCH_BACKEND == "memory":
+            sync_app.memory_index.add(doc_id, doc)
+        search_cache.clear()
+        document_cache.invalidate(doc_id)
+        return _json({"message": "Prize added successfully", "id": doc_id}, status=201)
+
+    except ConflictError:
+        return _json(ErrorResponse(error="Prize already exists",
+                                   details=f"A prize with id {doc_id} already exists").dict(), status=409)
+    except Exception as e:
+        unavailable = _unavailable(e)
+        if unavailable is not None:
+            return unavailable
+        logger.error(f"Error adding prize: {e}")
+        return _json(ErrorResponse(error="Failed to add prize", details=str(e)).dict(), status=400)
+
+
+@routes.put('/prize/{year}/{category}')
+async def update_prize(request):
+    """Update an existing Nobel Prize record"""
+    year, category = request.match_info["year"], request.match_info["category"]
+    try:
+        es = get_elasticsearch(request)
+        prize = PrizeCreate(**await request.json())
+
+        # Check if prize exists; a cached document is known to, without asking Elasticsearch
+        if document_cache.get(f"{year}_{category}") is None and \
+                not await es.exists(index=INDEX_ALIAS, id=f"{year}_{category}"):
+            return _json(ErrorResponse(error="Prize not found", details=f"No prize with id {year}_{category}").dict(),
+                         status=404)
+
+        result = await es.index(index=INDEX_ALIAS, id=f"{year}_{category}", body=with_suggest_inputs(prize.dict()))
+        await sync_laureates(es, [(result["_id"], prize.dict())])
+        if sync_app.SEARCH_BACKEND == "memory":
+            sync_app.memory_index.add(result["_id"], prize.dict())
+        search_cache.clear()
+        document_cache.invalidate(f"{year}_{category}")
+        return _json({"message": "Prize updated successfully", "id": result["_id"]})
+
+    except Exception as e:
+        unavailable = _unavailable(e)
+        if unavailable is not None:
+            return unavailable
+        logger.error(f"Error updating prize: {e}")
+        return _json(ErrorResponse(error="Failed to update prize", details=str(e)).dict(), status=400)
+
+
+@routes.get('/prize/{year}/{category}')
+async def get_prize(request):
+    """Async counterpart of ``app.get_prize``"""
+    doc_id = f"{request.match_info['year']}_{request.match_info['category']}"
+    body = document_cache.get(doc_id)
+    if body is not None:
+        return _json_bytes(body, cache_status="HIT")
+
+    generation = document_cache.generation
+    try:
+        doc = await get_elasticsearch(request).get(index=INDEX_ALIAS, id=doc_id,
+                                                   **client_timeout(request.get("deadline")))
+        body = prize_document_body(doc["_source"])
+    except NotFoundError:
+        return _json(ErrorResponse(error="Prize not found", details=f"No prize with id {doc_id}").dict(), status=404)
+    except Exception as e:
+        unavailable = _unavailable(e)
+        if unavailable is not None:
+            return unavailable
+        logger.error(f"Error fetching prize {doc_id}: {e}")
+        return _json(ErrorResponse(error="Internal server error", details=str(e)).dict(), status=500)
+    document_cache.put(doc_id, body, generation=generation)
+    return _json_bytes(body, cache_status="MISS")
+
+
+@routes.get('/cache/stats')
+async def cache_stats(request):
+    """Hit/miss counters for the search result cache"""
+    return _json(search_cache.stats())
+
+
+@routes.get('/suggest')
+async def suggest(request):
+    """Typeahead: laureate names and categories starting with a prefix"""
+    try:
+        params = suggest_params_from_args(request.query)
+    except ValidationError as e:
+        return _json(ErrorResponse(error="Invalid suggest parameters", details=str(e)).dict(), status=400)
+
+    cache_key = suggest_cache_key(params)
+    cached = search_cache.get(cache_key)
+    if cached is not None:
+        return _json_bytes(cached, cache_status="HIT")
+    cache_generation = search_cache.generation
+
+    try:
+        if sync_app.SEARCH_BACKEND == "memory":
+            suggestions = sync_app.memory_index.suggest(params.prefix, params.size)
+        else:
+            response = await get_elasticsearch(request).search(
+                index=INDEX_ALIAS, body=build_suggest_query(params.prefix, params.size),
+                **client_timeout(request.get("deadline"))
+            )
+            suggestions = parse_suggest_response(response, params.size)
+    except Exception as e:
+        unavailable = _unavailable(e)
+        if unavailable is not None:
+            return unavailable
+        logger.error(f"Suggest error: {str(e)}")
+        return _json(ErrorResponse(error="Internal server error", details=str(e)).dict(), status=500)
+
+    body = suggest_result_body(params, suggestions)
+    search_cache.put(cache_key, body, generation=cache_generation)
+    return _json_bytes(body, cache_status="MISS")
+
+
+@routes.get('/facets')
+async def facets(request):
+    """Prize and laureate counts per category and decade, optionally for a search"""
+    try:
+        params = facet_params_from_args(request.query)
+    except ValidationError as e:
+        return _json(ErrorResponse(error="Invalid facet parameters", details=str(e)).dict(), status=400)
+
+    cache_key = facet_cache_key(params)
+    cached = search_cache.get(cache_key)
+    if cached is not None:
+        return _json_bytes(cached, cache_status="HIT")
+    cache_generation = search_cache.generation
+
+    try:
+        if sync_app.SEARCH_BACKEND == "memory":
+            results = sync_app.memory_index.facets(params, search_fields(params))
+        else:
+            results = await get_elasticsearch(request).search(
+                index=INDEX_ALIAS, body=build_facet_query(params), request_cache=True,
+                **client_timeout(request.get("deadline"))
+            )
+        body = facet_result_body(results)
+    except Exception as e:
+        unavailable = _unavailable(e)
+        if unavailable is not None:
+            return unavailable
+        logger.error(f"Facets error: {str(e)}")
+        return _json(ErrorResponse(error="Internal server error", details=str(e)).dict(), status=500)
+
+    search_cache.put(cache_key, body, generation=cache_generation)
+    return _json_bytes(body, cache_status="MISS")
+
+
+@routes.get('/metrics')
+async def prometheus_metrics(request):
+    """Prometheus text exposition of request, search stage, Elasticsearch and ingest metrics"""
+    if not metrics.ENABLED:
+        return _json(ErrorResponse(error="Metrics are disabled").dict(), status=404)
+    return web.Response(text=metrics.REGISTRY.render(), headers={"Content-Type": metrics.CONTENT_TYPE})
+
+
+@routes.get('/search')
+async def flexible_search(request):
+    started = time.perf_counter()
+    try:
+        with metrics.SEARCH_STAGE_SECONDS.time(stage="validate"):
+            search_params = search_params_from_args(request.query)
+
+        profile = profile_requested(request.query)
+        if profile:
+            denied = profile_error(request.headers.get("X-Admin-Token"))
+            if denied is not None:
+                return _json(denied[0].dict(), status=denied[1])
+
+        cursor = search_params.search_cursor()
+        cacheable = cursor is None and not profile
+        if cacheable:
+            with metrics.SEARCH_STAGE_SECONDS.time(stage="cache"):
+                cache_key = search_cache_key(search_params)
+                cached = search_cache.get(cache_key)
+            if cached is not None:
+                return _json_bytes(cached, cache_status="HIT")
+            cache_generation = search_cache.generation
+
+        es = get_elasticsearch(request)
+        results = await execute_search(es, search_params, cursor, deadline=request.get("deadline"), profile=profile)
+
+        next_cursor = None
+        if cursor is not None:
+            next_cursor = search_cursor_after(search_params, results)
+            if next_cursor is None and results.get("pit_id"):
+                try:
+                    await es.close_point_in_time(body={"id": results["pit_id"]})
+                except Exception as e:
+                    logger.warning(f"Failed to close point-in-time: {e}")
+        with metrics.SEARCH_STAGE_SECONDS.time(stage="serialize"):
+            body = search_result_body(search_params, results, next_cursor,
+                                      profile=summarize_profile(results.get("profile", {})) if profile else None)
+        slow_query_log.observe(search_params, results, (time.perf_counter() - started) * 1000)
+
+        if results.get("timed_out"):
+            metrics.REQUEST_TIMEOUTS.inc(outcome="partial")
+            response = _json_bytes(body)
+            response.headers["X-Partial-Results"] = "true"
+            return response
+        if not cacheable:
+            return _json_bytes(body)
+        search_cache.put(cache_key, body, generation=cache_generation)
+        return _json_bytes(body, cache_status="MISS")
+
+    except ValidationError as e:
+        logger.error(f"Validation error: {str(e)}")
+        return _json(ErrorResponse(error="Invalid search parameters", details=str(e)).dict(), status=400)
+
+    except NotFoundError as e:
+        logger.error(f"Search target not found: {str(e)}")
+        if request.query.get('cursor'):
+            return _json(ErrorResponse(error="Search cursor expired", details=str(e)).dict(), status=400)
+        return _json(ErrorResponse(error="Internal server error", details=str(e)).dict(), status=500)
+
+    except Exception as e:
+        unavailable = _unavailable(e)
+        if unavailable is not None:
+            return unavailable
+        logger.error(f"Search error: {str(e)}")
+        return _json(ErrorResponse(error="Internal server error", details=str(e)).dict(), status=500)
+
+
+async def _open_elasticsearch(app: web.Application):
+    url = os.getenv("ELASTICSEARCH_URL", "http://elasticsearch:9200")
+    app["es"] = AsyncElasticsearch(url, maxsize=ES_MAX_CONNECTIONS, transport_class=guarded_async_transport(
+        metrics.InstrumentedAsyncTransport, sync_app.es_breaker
+    ))
+    yield
+    await app["es"].close()
+
+
+def create_app(es: Optional[AsyncElasticsearch] = None) -> web.Application:
+    """Build the aiohttp application; pass ``es`` to use an existing client"""
+    application = web.Application(middlewares=[observe_request, admit_request])
+    application.add_routes(routes)
+    if es is None:
+        application.cleanup_ctx.append(_open_elasticsearch)
+    else:
+        application["es"] = es
+    return application
+
+
+def run(host: str = '0.0.0.0', port: int = 5000):
+    web.run_app(create_app(), host=host, port=port)
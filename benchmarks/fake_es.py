@@ -0,0 +1,231 @@
+"""Local stand-in for Elasticsearch that replays realistic responses.
+
+Answers the handful of APIs the app and the loader call (info, exists,
+search, msearch, bulk, index, point-in-time) from an in-memory prize corpus,
+sleeping a configurable latency per request. Nothing is actually indexed:
+the point is to measure our side of the wire without a cluster.
+
+    python benchmarks/fake_es.py --port 9200 --latency-ms 5 --jitter-ms 2
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ingest import iter_json_array, iter_source_chunks
+
+CATEGORIES = ("physics", "chemistry", "medicine", "literature", "peace", "economics")
+FIRSTNAMES = ("Albert", "Marie", "Niels", "Dorothy", "Richard", "Ada", "Werner", "Rosalind", "Enrico", "Lise")
+SURNAMES = ("Einstein", "Curie", "Bohr", "Hodgkin", "Feynman", "Yonath", "Heisenberg", "Franklin", "Fermi", "Meitner")
+MOTIVATION_WORDS = ("for", "his", "her", "their", "discovery", "of", "the", "law", "quantum", "theory",
+                    "radiation", "structure", "crystal", "nuclear", "services", "theoretical", "physics",
+                    "chemical", "peace", "work", "research", "electrons", "particles", "mechanics")
+
+
+def synthetic_prizes(count: int, seed: int = 0) -> List[dict]:
+    """Deterministic prize documents shaped like the Nobel API's"""
+    rng = random.Random(seed)
+    prizes = []
+    for i in range(count):
+        laureates = []
+        for j in range(rng.choice((1, 1, 1, 2, 3))):
+            laureates.append({
+                "id": str(i * 3 + j),
+                "firstname": rng.choice(FIRSTNAMES),
+                "surname": rng.choice(SURNAMES),
+                "motivation": '"' + " ".join(rng.choice(MOTIVATION_WORDS) for _ in range(rng.randint(6, 16))) + '"',
+                "share": str(rng.choice((1, 2, 3)))
+            })
+        prizes.append({
+            "year": str(1901 + (i // len(CATEGORIES)) % 125),
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            "laureates": laureates
+        })
+    return prizes
+
+
+def load_corpus(source: Optional[str], count: int, seed: int = 0) -> List[dict]:
+    """Prizes from a local prize.json, or a synthetic corpus of ``count`` documents"""
+    if source:
+        return [p for p in iter_json_array(iter_source_chunks(source)) if p.get("laureates")]
+    return synthetic_prizes(count, seed)
+
+
+def search_response(corpus: List[dict], body: dict, took_ms: int = 1) -> dict:
+    """A search response over ``corpus``, honouring size/from/search_after and sort"""
+    size = int(body.get("size", 10))
+    start = int(body.get("from", 0))
+    if body.get("search_after"):
+        start = int(body["search_after"][-1]) + 1
+    hits = []
+    for position in range(start, min(start + size, len(corpus))):
+        score = round(10.0 / (1 + position), 6)
+        hit = {"_index": "nobel_prizes", "_id": str(position), "_score": score, "_source": corpus[position]}
+        if "sort" in body:
+            hit["sort"] = [score, position]
+        hits.append(hit)
+    response = {
+        "took": took_ms,
+        "timed_out": False,
+        "_shards": {"total": 1, "successful": 1, "skipped": 0, "failed": 0},
+        "hits": {"total": {"value": len(corpus), "relation": "eq"},
+                 "max_score": hits[0]["_score"] if hits else None, "hits": hits}
+    }
+    if "pit" in body:
+        response["pit_id"] = body["pit"]["id"]
+    return response
+
+
+def bulk_response(lines: List[dict], took_ms: int = 1) -> dict:
+    """A bulk response acknowledging every action in the parsed NDJSON ``lines``"""
+    items = []
+    i = 0
+    while i < len(lines):
+        action, meta = next(iter(lines[i].items()))
+        i += 1 if action == "delete" else 2
+        status = 200 if action == "update" else 201
+        result = "updated" if action == "update" else "created"
+        items.append({action: {"_index": meta.get("_index"), "_id": meta.get("_id"),
+                               "status": status, "result": result}})
+    return {"took": took_ms, "errors": False, "items": items}
+
+
+class FakeElasticsearch:
+    """Threaded HTTP server speaking enough of the Elasticsearch 7.x REST API for benchmarks"""
+
+    def __init__(self, corpus: List[dict], host: str = "127.0.0.1", port: int = 0,
+                 latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: int = 0):
+        self.corpus = corpus
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.requests = 0
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeElasticsearch":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def delay(self) -> float:
+        """Seconds to wait before answering, also reported as ``took``"""
+        with self._rng_lock:
+            self.requests += 1
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, self.latency_ms + jitter) / 1000
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Send headers and body in one segment; split writes hit delayed-ACK stalls
+            wbufsize = 1 << 16
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _body(self) -> bytes:
+                length = int(self.headers.get("Content-Length") or 0)
+                return self.rfile.read(length) if length else b""
+
+            def _send(self, status: int, payload=None):
+                data = json.dumps(payload).encode("utf-8") if payload is not None else b""
+                self.send_response(status)
+                self.send_header("X-Elastic-Product", "Elasticsearch")
+                self.send_header("Content-Type", "application/json; charset=UTF-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(data)
+
+            def _handle(self):
+                raw = self._body()
+                delay = fake.delay()
+                time.sleep(delay)
+                took_ms = int(delay * 1000)
+                path = self.path.split("?", 1)[0].rstrip("/")
+                parts = [p for p in path.split("/") if p]
+
+                if not parts:
+                    return self._send(200, {"name": "fake-es", "cluster_name": "bench",
+                                            "version": {"number": "7.17.0", "build_flavor": "default"},
+                                            "tagline": "You Know, for Search"})
+                if self.command == "HEAD":
+                    return self._send(200)
+                api = next((p for p in reversed(parts) if p.startswith("_")), None)
+                if api == "_search":
+                    return self._send(200, search_response(fake.corpus, json.loads(raw or b"{}"), took_ms))
+                if api == "_msearch":
+                    lines = [json.loads(line) for line in raw.splitlines() if line.strip()]
+                    return self._send(200, {"took": took_ms, "responses": [
+                        search_response(fake.corpus, body, took_ms) for body in lines[1::2]
+                    ]})
+                if api == "_bulk":
+                    lines = [json.loads(line) for line in raw.splitlines() if line.strip()]
+                    return self._send(200, bulk_response(lines, took_ms))
+                if api == "_pit":
+                    if self.command == "DELETE":
+                        return self._send(200, {"succeeded": True, "num_freed": 1})
+                    return self._send(200, {"id": "fake-pit"})
+                if api == "_settings" and self.command == "GET":
+                    return self._send(200, {name: {"settings": {"index.number_of_replicas": "1"}}
+                                            for name in parts[0].split(",")})
+                if api in ("_doc", "_create", "_update"):
+                    doc_id = parts[-1] if parts[-1] != api else str(len(fake.corpus))
+                    return self._send(201, {"_index": parts[0], "_id": doc_id, "result": "created"})
+                return self._send(200, {"acknowledged": True})
+
+            do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = _handle
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9200)
+    parser.add_argument("--source", help="Local prize.json to replay (default: synthetic corpus)")
+    parser.add_argument("--docs", type=int, default=1000, help="Synthetic corpus size")
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    fake = FakeElasticsearch(load_corpus(args.source, args.docs), args.host, args.port,
+                             args.latency_ms, args.jitter_ms)
+    print(f"Fake Elasticsearch listening on {fake.url}")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""Drive /search, /prize and bulk loading at a fixed concurrency.
+
+Runs the Flask app in-process on a local port, pointed at the fake
+Elasticsearch from ``fake_es.py`` unless ``--es-url`` is given, and
+reports throughput and p50/p95/p99 latency per scenario.
+
+    python benchmarks/load_test.py --concurrency 16 --requests 2000
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Every request should reach the search path rather than the result cache
+os.environ.setdefault("SEARCH_CACHE_MAX_ENTRIES", "0")
+
+from elasticsearch import Elasticsearch
+from werkzeug.serving import make_server
+
+import app as flask_app
+from benchmarks.fake_es import FakeElasticsearch, load_corpus, synthetic_prizes
+from benchmarks.report import summarize
+from ingest import bulk_ingest
+
+SEARCH_QUERIES = [
+    "q=Einstein",
+    "q=Einstien",
+    "q=quantum%20theory&size=20",
+    "q=physics&sort_by=year&sort_order=desc",
+    "q=peace%201964",
+    "q=curie&include=laureates.firstname&include=laureates.surname",
+    "q=structure&fields=year&fields=laureates.surname",
+    "q=radiation&year_from=1950&year_to=2000",
+]
+
+BULK_DOCS_PER_REQUEST = 100
+
+Request = Tuple[str, str, Optional[bytes], Dict[str, str]]
+
+
+class AppServer:
+    """The Flask app on a background werkzeug server"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        for name in ("werkzeug", "elasticsearch", "app", "ingest"):
+            logging.getLogger(name).setLevel(logging.ERROR)
+        self.server = make_server(host, port, flask_app.app, threaded=True)
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.server.server_address[:2]
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        return False
+
+
+def search_requests() -> Callable[[int], Request]:
+    def build(i: int) -> Request:
+        return "GET", f"/search?{SEARCH_QUERIES[i % len(SEARCH_QUERIES)]}", None, {}
+    return build
+
+
+def prize_requests(prizes: List[dict]) -> Callable[[int], Request]:
+    def build(i: int) -> Request:
+        body = json.dumps(prizes[i % len(prizes)]).encode("utf-8")
+        return "POST", "/prize", body, {"Content-Type": "application/json"}
+    return build
+
+
+def bulk_requests(prizes: List[dict]) -> Callable[[int], Request]:
+    def build(i: int) -> Request:
+        start = i * BULK_DOCS_PER_REQUEST
+        body = b"".join(json.dumps(prizes[(start + k) % len(prizes)]).encode("utf-8") + b"\n"
+                        for k in range(BULK_DOCS_PER_REQUEST))
+        return "POST", "/prizes/_bulk", body, {"Content-Type": "application/x-ndjson"}
+    return build
+
+
+def run_load(address: Tuple[str, int], build: Callable[[int], Request], requests: int,
+             concurrency: int, warmup: int = 0) -> dict:
+    """Send ``requests`` requests from ``concurrency`` keep-alive connections"""
+    host, port = address
+    counter = count()
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def worker(total: int, record: bool):
+        connection = http.client.HTTPConnection(host, port, timeout=30)
+        local, failed = [], 0
+        while True:
+            i = next(counter)
+            if i >= total:
+                break
+            method, path, body, headers = build(i)
+            started = time.perf_counter()
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                ok = response.status < 400
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = http.client.HTTPConnection(host, port, timeout=30)
+                ok = False
+            if ok:
+                local.append(time.perf_counter() - started)
+            else:
+                failed += 1
+        connection.close()
+        if record:
+            with lock:
+                latencies.extend(local)
+                errors[0] += failed
+
+    for total, record in ((warmup, False), (requests, True)):
+        if not total:
+            continue
+        counter = count()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for future in [pool.submit(worker, total, record) for _ in range(concurrency)]:
+                future.result()
+        elapsed = time.perf_counter() - started
+
+    result = summarize(latencies, elapsed, errors[0])
+    result["concurrency"] = concurrency
+    return result
+
+
+def run_ingest(es_url: str, prizes: List[dict], workers: int) -> dict:
+    """Throughput of the data loader's bulk path"""
+    es = Elasticsearch(es_url)
+    summary = bulk_ingest(es, prizes, index=flask_app.INDEX_ALIAS, workers=workers)
+    return {
+        "docs": summary.indexed,
+        "errors": summary.failed,
+        "batches": summary.batches,
+        "elapsed_s": round(summary.elapsed_seconds, 4),
+        "docs_per_s": round(summary.docs_per_second, 2),
+        "concurrency": workers,
+    }
+
+
+def run_all(es_url: Optional[str] = None, concurrency: int = 8, requests: int = 1000,
+            warmup: int = 100, latency_ms: float = 2.0, jitter_ms: float = 0.0,
+            corpus_docs: int = 1000, source: Optional[str] = None,
+            scenarios=("search", "prize", "bulk", "ingest")) -> Dict[str, dict]:
+    """Run the load scenarios; starts a fake Elasticsearch when ``es_url`` is None"""
+    fake = None
+    if es_url is None:
+        fake = FakeElasticsearch(load_corpus(source, corpus_docs), latency_ms=latency_ms,
+                                 jitter_ms=jitter_ms).start()
+        es_url = fake.url
+    os.environ["ELASTICSEARCH_URL"] = es_url
+    flask_app.set_elasticsearch(None)
+    flask_app.get_elasticsearch()
+    prizes = synthetic_prizes(max(corpus_docs, BULK_DOCS_PER_REQUEST), seed=1)
+
+    results = {}
+    try:
+        with AppServer() as server:
+            builders = {
+                "search": search_requests(),
+                "prize": prize_requests(prizes),
+                "bulk": bulk_requests(prizes),
+            }
+            for name in scenarios:
+                if name == "ingest":
+                    results[name] = run_ingest(es_url, prizes * 10, concurrency)
+                elif name == "bulk":
+                    # Each request carries BULK_DOCS_PER_REQUEST documents
+                    results[name] = run_load(server.address, builders[name], max(1, requests // 10),
+                                             concurrency, max(1, warmup // 10))
+                    results[name]["docs_per_s"] = round(
+                        results[name]["throughput_per_s"] * BULK_DOCS_PER_REQUEST, 2)
+                else:
+                    results[name] = run_load(server.address, builders[name], requests, concurrency, warmup)
+    finally:
+        flask_app.set_elasticsearch(None)
+        if fake is not None:
+            fake.stop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--es-url", help="Benchmark against a real cluster instead of the fake")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="Fake Elasticsearch latency")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--source", help="Local prize.json for the fake Elasticsearch to replay")
+    args = parser.parse_args()
+
+    results = run_all(args.es_url, args.concurrency, args.requests, args.warmup,
+                      args.latency_ms, args.jitter_ms, source=args.source)
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
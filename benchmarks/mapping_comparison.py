@@ -0,0 +1,127 @@
+"""Compare index size and query latency of the legacy and current mappings.
+
+Loads the same prize data into two scratch indices, force-merges both so
+segment counts don't skew the numbers, then replays a fixed query mix
+against each. Needs a running Elasticsearch (ELASTICSEARCH_URL).
+
+    python benchmarks/mapping_comparison.py --source prize.json --repeat 200
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from elasticsearch import Elasticsearch
+
+import app as flask_app
+from ingest import NOBEL_API_URL, bulk_ingest, iter_json_array, iter_source_chunks
+from models import FlexibleSearchParams, SortField
+
+# Mapping as it was before category got a keyword subfield and year became numeric
+LEGACY_BODY = {
+    "mappings": {
+        "properties": {
+            "year": {"type": "keyword"},
+            "category": {"type": "text", "analyzer": "standard", "fielddata": True},
+            "laureates": {
+                "type": "nested",
+                "properties": {
+                    "id": {"type": "keyword"},
+                    "firstname": {"type": "text", "analyzer": "standard"},
+                    "surname": {"type": "text", "analyzer": "standard"},
+                    "motivation": {"type": "text", "analyzer": "standard"}
+                }
+            }
+        }
+    }
+}
+
+QUERIES = [
+    FlexibleSearchParams(q="Einstein"),
+    FlexibleSearchParams(q="Einstien"),
+    FlexibleSearchParams(q="physics", sort_by=SortField.YEAR),
+    FlexibleSearchParams(q="physics", sort_by=SortField.CATEGORY),
+    FlexibleSearchParams(q="peace 1964"),
+    FlexibleSearchParams(q="quantum mechanics", include=["laureates.motivation"]),
+]
+
+
+def legacy_query(params: FlexibleSearchParams) -> dict:
+    """The request body flexible_search built against the legacy mapping"""
+    fields = flask_app.search_fields(params)
+    should = [{
+        "multi_match": {
+            "query": params.q,
+            "fields": [f"{f}^{b}" for f, b in flask_app.SEARCH_FIELD_BOOSTS.items() if f in fields],
+            "type": "best_fields", "fuzziness": "AUTO", "operator": "or"
+        }
+    }]
+    laureate_fields = [f for f in fields if f.startswith("laureates.")]
+    if laureate_fields:
+        should.append({"nested": {"path": "laureates", "score_mode": "max", "query": {"multi_match": {
+            "query": params.q, "fields": laureate_fields,
+            "type": "best_fields", "fuzziness": "AUTO", "operator": "or"
+        }}}})
+    sort = [{"_score": {"order": params.sort_order.value}}]
+    if params.sort_by != SortField.SCORE:
+        sort = [{params.sort_by.value: {"order": params.sort_order.value}}, {"_score": {"order": "desc"}}]
+    return {"query": {"bool": {"should": should}}, "from": 0, "size": params.size, "sort": sort}
+
+
+def load(es: Elasticsearch, index: str, body: dict, source: str) -> None:
+    es.indices.delete(index=index, ignore=[404])
+    es.indices.create(index=index, body=body)
+    bulk_ingest(es, iter_json_array(iter_source_chunks(source)), index=index)
+    es.indices.refresh(index=index)
+    es.indices.forcemerge(index=index, max_num_segments=1)
+
+
+def measure(es: Elasticsearch, index: str, build, repeat: int) -> dict:
+    stats = es.indices.stats(index=index)["indices"][index]["primaries"]
+    result = {"store_bytes": stats["store"]["size_in_bytes"], "docs": stats["docs"]["count"], "queries": {}}
+    for params in QUERIES:
+        body = build(params)
+        latencies, took = [], []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            response = es.search(index=index, body=body, request_cache=False)
+            latencies.append((time.perf_counter() - started) * 1000)
+            took.append(response["took"])
+        latencies.sort()
+        result["queries"][f"{params.q}|{params.sort_by.value}"] = {
+            "p50_ms": statistics.median(latencies),
+            "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+            "took_p50_ms": statistics.median(took)
+        }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", default=os.getenv("NOBEL_DATA_SOURCE", NOBEL_API_URL))
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch indices")
+    args = parser.parse_args()
+
+    es = Elasticsearch(os.getenv("ELASTICSEARCH_URL", "http://localhost:9200"))
+    report = {}
+    for name, body, build in [
+        ("legacy", LEGACY_BODY, legacy_query),
+        ("current", flask_app.INDEX_BODY, flask_app.build_search_query),
+    ]:
+        index = f"bench_mapping_{name}"
+        load(es, index, body, args.source)
+        report[name] = measure(es, index, build, args.repeat)
+        if not args.keep:
+            es.indices.delete(index=index)
+
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Micro-benchmarks for /search query building and result serialization.
+
+Times ``build_search_query``, ``search_params_from_args`` and
+``search_result_body`` in-process, with no server and no network.
+
+    python benchmarks/micro.py --iterations 5000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.datastructures import MultiDict
+
+import app as flask_app
+from benchmarks.fake_es import search_response, synthetic_prizes
+from benchmarks.report import summarize
+from models import FlexibleSearchParams, SortField
+
+
+def time_calls(fn: Callable[[], object], iterations: int, warmup: int = 100) -> dict:
+    """Per-call latency of ``fn`` over ``iterations`` runs"""
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - call_started)
+    result = summarize(latencies, time.perf_counter() - started)
+    result["ops_per_s"] = result.pop("throughput_per_s")
+    del result["errors"]
+    return result
+
+
+def run_all(iterations: int = 2000) -> Dict[str, dict]:
+    params = FlexibleSearchParams(q="quantum theory", sort_by=SortField.YEAR, size=10)
+    projected = FlexibleSearchParams(q="quantum theory", fields=["year", "laureates.surname"], size=10)
+    args = MultiDict([("q", "quantum theory"), ("size", "10"), ("sort_by", "year"),
+                      ("include", "laureates.firstname"), ("include", "laureates.surname")])
+    # Response bodies exactly as the fake cluster would send them
+    corpus = synthetic_prizes(100)
+    page = search_response(corpus, {"size": 10, "sort": []})
+    large_page = search_response(corpus, {"size": 100, "sort": []})
+    large_params = FlexibleSearchParams(q="quantum theory", size=100)
+
+    benchmarks = {
+        "build_search_query": lambda: flask_app.build_search_query(params),
+        "search_params_from_args": lambda: flask_app.search_params_from_args(args),
+        "serialize_page_10": lambda: flask_app.search_result_body(params, page),
+        "serialize_page_100": lambda: flask_app.search_result_body(large_params, large_page),
+        "serialize_projected_10": lambda: flask_app.search_result_body(projected, page),
+    }
+    return {name: time_calls(fn, iterations) for name, fn in benchmarks.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    json.dump(run_all(args.iterations), sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Latency summaries and the JSON result files benchmarks write and compare."""
+import json
+import math
+import platform
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Sequence
+
+# Metrics compared across runs; max_ms and counts are too noisy or fixed by the config
+COMPARED_METRICS = ("p50_ms", "p95_ms", "p99_ms", "throughput_per_s", "docs_per_s", "ops_per_s")
+# Metrics where a bigger number is an improvement
+HIGHER_IS_BETTER = {"throughput_per_s", "docs_per_s", "ops_per_s"}
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted values"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int = 0) -> dict:
+    """Throughput and latency percentiles (ms) for latencies in seconds measured over ``elapsed`` seconds"""
+    ordered = sorted(latencies)
+    ms = [value * 1000 for value in ordered]
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 4),
+        "throughput_per_s": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(ms, 50), 4),
+        "p95_ms": round(percentile(ms, 95), 4),
+        "p99_ms": round(percentile(ms, 99), 4),
+        "max_ms": round(ms[-1], 4) if ms else 0.0,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> dict:
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+def write_results(results: dict, path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(base: dict, head: dict) -> List[Dict]:
+    """Relative change of every shared numeric metric; positive ``change`` means better"""
+    rows = []
+    for section in ("load", "micro"):
+        for name, head_stats in head.get(section, {}).items():
+            base_stats = base.get(section, {}).get(name)
+            if not base_stats:
+                continue
+            for metric in COMPARED_METRICS:
+                base_value, head_value = base_stats.get(metric), head_stats.get(metric)
+                if not base_value or head_value is None:
+                    continue
+                delta = (head_value - base_value) / base_value
+                rows.append({
+                    "benchmark": f"{section}.{name}", "metric": metric,
+                    "base": base_value, "head": head_value,
+                    "change": delta if metric in HIGHER_IS_BETTER else -delta,
+                })
+    return rows
+
+
+def print_comparison(rows: List[Dict], threshold: float, out=sys.stdout) -> int:
+    """Print a comparison table; returns the number of regressions beyond ``threshold``"""
+    regressions = 0
+    for row in rows:
+        flag = ""
+        if row["change"] < -threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        out.write(f"{row['benchmark']:<32} {row['metric']:<18} {row['base']:>12.4f} -> {row['head']:>12.4f}"
+                  f" {row['change'] * 100:+7.1f}%{flag}\n")
+    return regressions
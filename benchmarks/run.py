@@ -0,0 +1,69 @@
+"""Run the offline benchmark suite and write machine-readable results.
+
+Starts a fake Elasticsearch, runs the load scenarios and micro-benchmarks,
+and writes one JSON file per run (named after the current commit by
+default). Pass ``--compare`` to diff against an earlier result file; the
+exit status is non-zero when any metric regressed beyond ``--threshold``.
+
+    python benchmarks/run.py
+    python benchmarks/run.py --compare benchmarks/results/abc1234.json
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import load_test, micro
+from benchmarks.report import compare, environment, print_comparison, write_results
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", metavar="BASE", help="Earlier result file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative slowdown counted as a regression (default: 0.10)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="Fake Elasticsearch latency")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--source", help="Local prize.json for the fake Elasticsearch to replay")
+    parser.add_argument("--skip-load", action="store_true", help="Only run the micro-benchmarks")
+    args = parser.parse_args()
+
+    results = {
+        "environment": environment(),
+        "config": {
+            "concurrency": args.concurrency, "requests": args.requests, "iterations": args.iterations,
+            "latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms, "source": args.source,
+        },
+        "micro": micro.run_all(args.iterations),
+        "load": {} if args.skip_load else load_test.run_all(
+            concurrency=args.concurrency, requests=args.requests, latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms, source=args.source
+        ),
+    }
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{results['environment']['commit'] or 'local'}.json")
+    write_results(results, output)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            base = json.load(f)
+        if base.get("config") != results["config"]:
+            print("Warning: benchmark configuration differs from the base run")
+        regressions = print_comparison(compare(base, results), args.threshold)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Scale the Nobel dataset up (100-1000x) to measure ingest and search at realistic sizes.
+
+Every copy keeps the shape and vocabulary of the real prizes: laureate
+names and motivations are redrawn from the pools of the source dataset, and
+laureate ids are made unique. Prize ids are ``<year>_<category>``, so copies
+are shifted onto other years between 1000 and 9999. When those run out (past
+about 70 copies), categories get an era suffix (``physics_2``).
+
+    python benchmarks/scale_dataset.py --factor 100 --output prizes_100x.json
+    NOBEL_DATA_SOURCE=prizes_100x.json INGEST_FORCE_MERGE=true python app.py
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from typing import Iterator, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ingest import NOBEL_API_URL, iter_json_array, iter_source_chunks
+
+MIN_YEAR, MAX_YEAR = 1000, 9999
+
+
+def year_offsets(years: List[int]) -> List[int]:
+    """Shifts that move the whole year range onto distinct years in 1000-9999, starting with 0"""
+    first, last = min(years), max(years)
+    span = last - first + 1
+    after = range(1, (MAX_YEAR - last) // span + 1)
+    before = range(1, (first - MIN_YEAR) // span + 1)
+    return [0] + [i * span for i in after] + [-i * span for i in before]
+
+
+def scaled_prizes(base: List[dict], factor: int, seed: int = 0) -> Iterator[dict]:
+    """``factor`` copies of ``base``; the first is ``base`` itself"""
+    rng = random.Random(seed)
+    laureates = [laureate for prize in base for laureate in prize.get("laureates") or []]
+    firstnames = [l["firstname"] for l in laureates if l.get("firstname")]
+    surnames = [l["surname"] for l in laureates if l.get("surname")]
+    motivations = [l["motivation"] for l in laureates if l.get("motivation")]
+    offsets = year_offsets([int(prize["year"]) for prize in base])
+
+    for copy in range(factor):
+        era, slot = divmod(copy, len(offsets))
+        for prize in base:
+            if copy == 0:
+                yield prize
+                continue
+            yield {
+                **prize,
+                "year": str(int(prize["year"]) + offsets[slot]),
+                "category": prize["category"] if era == 0 else f"{prize['category']}_{era}",
+                "laureates": [
+                    {
+                        **laureate,
+                        "id": f"{laureate.get('id', i)}_{copy}",
+                        "firstname": rng.choice(firstnames) if firstnames else laureate.get("firstname"),
+                        "surname": rng.choice(surnames) if surnames else laureate.get("surname"),
+                        "motivation": rng.choice(motivations) if motivations else laureate.get("motivation"),
+                    }
+                    for i, laureate in enumerate(prize.get("laureates") or [])
+                ],
+            }
+
+
+def write_dataset(prizes: Iterator[dict], path: str) -> int:
+    """Write prizes as a Nobel API-shaped ``{"prizes": [...]}`` file, one at a time; returns the count"""
+    count = 0
+    with open(path, "w", encoding="utf-8") as out:
+        out.write('{"prizes": [\n')
+        for prize in prizes:
+            if count:
+                out.write(",\n")
+            out.write(json.dumps(prize, ensure_ascii=False))
+            count += 1
+        out.write("\n]}\n")
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", default=os.getenv("NOBEL_DATA_SOURCE", NOBEL_API_URL),
+                        help="Nobel API URL or local prize.json to scale")
+    parser.add_argument("--factor", type=int, default=100, help="Copies of the dataset")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+
+    base = list(iter_json_array(iter_source_chunks(args.source)))
+    count = write_dataset(scaled_prizes(base, args.factor, args.seed), args.output)
+    print(f"Wrote {count} prizes ({os.path.getsize(args.output) / 1e6:.1f} MB) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Search throughput of the pre-fork server as the worker count grows.
+
+Starts ``prefork.py`` with each worker count against the fake
+Elasticsearch, waits for ``/readyz`` and drives ``/search`` at a fixed
+concurrency. Scaling is reported relative to one worker; expect it to level
+off at the number of CPUs.
+
+    python benchmarks/worker_scaling.py --workers 1 2 4 --concurrency 32
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, Iterable
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.fake_es import FakeElasticsearch, synthetic_prizes
+from benchmarks.load_test import run_load, search_requests
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(port: int, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/readyz", timeout=1) as response:
+                if response.status == 200:
+                    return
+        except (OSError, urllib.error.URLError):
+            pass
+        time.sleep(0.2)
+    raise TimeoutError(f"Server on port {port} not ready after {timeout}s")
+
+
+def run_workers(workers: int, es_url: str, source: str, requests: int, concurrency: int,
+                warmup: int, threads: int) -> dict:
+    port = free_port()
+    env = dict(os.environ, ELASTICSEARCH_URL=es_url, NOBEL_DATA_SOURCE=source,
+               SEARCH_CACHE_MAX_ENTRIES="0", MAX_IN_FLIGHT_REQUESTS="0", STARTUP_BACKOFF_MAX="0.5")
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "prefork.py"), "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--threads", str(threads)],
+        env=env, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_ready(port)
+        result = run_load(("127.0.0.1", port), search_requests(), requests, concurrency, warmup)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    result["workers"] = workers
+    return result
+
+
+def run_all(worker_counts: Iterable[int] = (1, 2, 4), requests: int = 2000, concurrency: int = 32,
+            warmup: int = 200, threads: int = 4, latency_ms: float = 2.0) -> Dict[str, dict]:
+    results = {}
+    with FakeElasticsearch(synthetic_prizes(1000), latency_ms=latency_ms) as fake, \
+            tempfile.NamedTemporaryFile("w", suffix=".json") as source:
+        json.dump({"prizes": synthetic_prizes(200, seed=1)}, source)
+        source.flush()
+        for workers in worker_counts:
+            results[f"workers_{workers}"] = run_workers(workers, fake.url, source.name, requests,
+                                                        concurrency, warmup, threads)
+    base = next(iter(results.values()))["throughput_per_s"]
+    for result in results.values():
+        result["speedup"] = round(result["throughput_per_s"] / base, 2) if base else 0.0
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--threads", type=int, default=4, help="Threads per worker")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="Fake Elasticsearch latency")
+    args = parser.parse_args()
+
+    results = run_all(args.workers, args.requests, args.concurrency, args.warmup, args.threads, args.latency_ms)
+    json.dump(results, sys.stdout, indent=2)
+    print()
+    print(f"CPUs: {os.cpu_count()}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Startup pipeline and the cached health state behind /livez and /readyz.
+
+The server binds its port first. Connecting to Elasticsearch and loading
+the data run on a background thread with exponential backoff. Afterwards the
+same thread pings Elasticsearch every ``HEALTH_CHECK_INTERVAL`` seconds, so
+probes only read the cached state and never reach the cluster themselves.
+"""
+import logging
+import os
+import random
+import threading
+import time
+from typing import Callable, Iterator, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+HEALTH_CHECK_INTERVAL = float(os.getenv("HEALTH_CHECK_INTERVAL", 10))
+STARTUP_BACKOFF_INITIAL = float(os.getenv("STARTUP_BACKOFF_INITIAL", 0.5))
+STARTUP_BACKOFF_MAX = float(os.getenv("STARTUP_BACKOFF_MAX", 30))
+
+T = TypeVar("T")
+
+STARTING = "starting"
+CONNECTING = "connecting"
+LOADING = "loading"
+READY = "ready"
+STOPPED = "stopped"
+
+
+def backoff_delays(initial: float = STARTUP_BACKOFF_INITIAL, maximum: float = STARTUP_BACKOFF_MAX,
+                   factor: float = 2.0) -> Iterator[float]:
+    """Exponentially growing delays capped at ``maximum``, each with up to 10% jitter"""
+    delay = initial
+    while True:
+        yield min(delay, maximum) * random.uniform(0.9, 1.0)
+        delay *= factor
+
+
+class HealthState:
+    """Thread-safe startup phase and last Elasticsearch check, read by the probes"""
+
+    def __init__(self, require_elasticsearch: bool = True):
+        self.require_elasticsearch = require_elasticsearch
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._phase = STARTING
+        self._data_loaded = False
+        self._es_ok: Optional[bool] = None
+        self._checked_at: Optional[float] = None
+        self._last_error: Optional[str] = None
+
+    @property
+    def phase(self) -> str:
+        return self._phase
+
+    def set_phase(self, phase: str) -> None:
+        with self._lock:
+            self._phase = phase
+
+    def mark_loaded(self) -> None:
+        with self._lock:
+            self._data_loaded = True
+            self._phase = READY
+
+    def record_error(self, error: Exception) -> None:
+        with self._lock:
+            self._last_error = str(error)
+
+    def record_check(self, ok: bool, error: Optional[Exception] = None) -> None:
+        with self._lock:
+            self._es_ok = ok
+            self._checked_at = time.time()
+            if error is not None:
+                self._last_error = str(error)
+
+    @property
+    def ready(self) -> bool:
+        with self._lock:
+            return self._data_loaded and (self._es_ok is True or not self.require_elasticsearch)
+
+    def snapshot(self) -> dict:
+        ready = self.ready
+        with self._lock:
+            return {
+                "status": "ready" if ready else "not_ready",
+                "phase": self._phase,
+                "data_loaded": self._data_loaded,
+                "elasticsearch": {
+                    "ok": self._es_ok,
+                    "checked_at": self._checked_at,
+                },
+                "last_error": self._last_error,
+                "uptime_seconds": round(time.time() - self.started_at, 3),
+            }
+
+
+def retry_with_backoff(fn: Callable[[], T], description: str, state: HealthState,
+                       stop: threading.Event, delays: Optional[Iterator[float]] = None) -> Optional[T]:
+    """Call ``fn`` until it succeeds; returns None if ``stop`` is set while waiting"""
+    delays = delays if delays is not None else backoff_delays()
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            return fn()
+        except Exception as e:
+            state.record_error(e)
+            delay = next(delays)
+            logger.warning(f"{description} failed (attempt {attempt}), retrying in {delay:.1f}s: {e}")
+            if stop.wait(delay):
+                return None
+
+
+class StartupPipeline:
+    """Connect, load, then monitor Elasticsearch on a daemon thread"""
+
+    def __init__(self, state: HealthState, load: Callable[[], object],
+                 connect: Optional[Callable[[], object]] = None,
+                 check: Optional[Callable[[], object]] = None,
+                 interval: float = HEALTH_CHECK_INTERVAL,
+                 delays: Optional[Callable[[], Iterator[float]]] = None):
+        self.state = state
+        self.load = load
+        self.connect = connect
+        self.check = check
+        self.interval = interval
+        self.delays = delays or backoff_delays
+        self.stop_event = threading.Event()
+        self._thread = threading.Thread(target=self.run, name="startup", daemon=True)
+
+    def start(self) -> "StartupPipeline":
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self.stop_event.set()
+        self._thread.join(timeout)
+
+    def run(self) -> None:
+        started = time.perf_counter()
+        if self.connect is not None:
+            self.state.set_phase(CONNECTING)
+            if retry_with_backoff(self._connect, "Connecting to Elasticsearch", self.state,
+                                  self.stop_event, self.delays()) is None:
+                self.state.set_phase(STOPPED)
+                return
+
+        self.state.set_phase(LOADING)
+        if retry_with_backoff(self._load, "Loading data", self.state, self.stop_event, self.delays()) is None:
+            self.state.set_phase(STOPPED)
+            return
+        self.state.mark_loaded()
+        logger.info(f"Ready to serve after {time.perf_counter() - started:.2f}s")
+
+        if self.check is None:
+            return
+        while not self.stop_event.wait(self.interval):
+            self._check()
+
+    def _connect(self) -> bool:
+        self.connect()
+        self.state.record_check(True)
+        return True
+
+    def _load(self) -> bool:
+        self.load()
+        return True
+
+    def _check(self) -> None:
+        try:
+            self.check()
+            self.state.record_check(True)
+        except Exception as e:
+            if self.state.ready:
+                logger.warning(f"Elasticsearch health check failed: {e}")
+            self.state.record_check(False, e)
@@ -0,0 +1,380 @@
+import codecs
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+
+from models import IngestFailure, IngestSummary
+from resilience import CircuitOpenError, DeadlineExceeded
+from suggest import with_suggest_inputs
+
+logger = logging.getLogger(__name__)
+
+NOBEL_API_URL = "https://api.nobelprize.org/v1/prize.json"
+
+# Bulk tuning, overridable from the environment
+BULK_MAX_BYTES = int(os.getenv("INGEST_BULK_MAX_BYTES", 5 * 1024 * 1024))
+BULK_MAX_DOCS = int(os.getenv("INGEST_BULK_MAX_DOCS", 1000))
+BULK_WORKERS = int(os.getenv("INGEST_WORKERS", 4))
+BULK_MAX_RETRIES = int(os.getenv("INGEST_MAX_RETRIES", 3))
+READ_CHUNK_SIZE = 64 * 1024
+# Seconds to connect to the source, and to wait for each chunk of it
+FETCH_TIMEOUT = float(os.getenv("INGEST_FETCH_TIMEOUT", 30))
+# Suspend refreshes and replicas while a full load runs, then restore them
+SUSPEND_REFRESH = os.getenv("INGEST_SUSPEND_REFRESH", "true").lower() == "true"
+# Merge each loaded index down to a single segment afterwards
+FORCE_MERGE = os.getenv("INGEST_FORCE_MERGE", "false").lower() == "true"
+FORCE_MERGE_TIMEOUT = float(os.getenv("INGEST_FORCE_MERGE_TIMEOUT", 600))
+
+# Index settings while bulk loading: no periodic refreshes, no replica copies to write
+BULK_LOAD_SETTINGS = {"refresh_interval": "-1", "number_of_replicas": 0}
+
+# Item statuses that are worth sending again (throttling / transient node errors)
+RETRYABLE_STATUSES = {429, 502, 503, 504}
+
+_WHITESPACE = " \t\r\n"
+
+
+def prize_id(prize: dict) -> str:
+    """Build the document ID used for a prize"""
+    return f"{prize['year']}_{prize['category']}"
+
+
+def laureate_documents(doc_id: str, prize: dict) -> List[Tuple[str, dict]]:
+    """Flat ``(id, document)`` pairs for the laureate index, one per laureate of a prize.
+
+    Each carries the prize fields it is searched and sorted on, plus the whole
+    prize so results can be returned as prizes without a second lookup.
+    """
+    documents = []
+    for i, laureate in enumerate(prize.get("laureates") or []):
+        documents.append((f"{doc_id}_{laureate.get('id', i)}", {
+            "prize_id": doc_id,
+            "year": prize.get("year"),
+            "category": prize.get("category"),
+            "laureates": laureate,
+            "prize": prize
+        }))
+    return documents
+
+
+def iter_source_chunks(source: str, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[str]:
+    """Yield decoded text chunks from a URL or a local file without reading it all"""
+    if source.startswith(("http://", "https://")):
+        response = requests.get(source, stream=True, timeout=FETCH_TIMEOUT)
+        response.raise_for_status()
+        yield from iter_response_chunks(response, chunk_size)
+    else:
+        with open(source, "r", encoding="utf-8") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+
+def iter_response_chunks(response: requests.Response, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[str]:
+    """Yield decoded text chunks of a streamed response, closing it at the end"""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            yield decoder.decode(chunk)
+        yield decoder.decode(b"", final=True)
+    finally:
+        response.close()
+
+
+def iter_json_array(chunks: Iterable[str], key: str = "prizes") -> Iterator[dict]:
+    """Incrementally yield the elements of a JSON array.
+
+    The array is either the top-level value or the value of ``key`` in the
+    top-level object. Only one element is held in memory at a time.
+    """
+    decoder = json.JSONDecoder()
+    chunks = iter(chunks)
+    buffer = ""
+    exhausted = False
+
+    def fill() -> bool:
+        nonlocal buffer, exhausted
+        if exhausted:
+            return False
+        try:
+            buffer += next(chunks)
+            return True
+        except StopIteration:
+            exhausted = True
+            return False
+
+    # Locate the opening bracket of the array
+    key_pattern = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+    while True:
+        stripped = buffer.lstrip(_WHITESPACE)
+        if stripped.startswith("["):
+            pos = len(buffer) - len(stripped) + 1
+            break
+        match = key_pattern.search(buffer)
+        if match:
+            pos = match.end()
+            break
+        if not fill():
+            raise ValueError(f"No '{key}' array found in input")
+
+    while True:
+        # Skip separators between elements
+        while True:
+            while pos < len(buffer) and (buffer[pos] in _WHITESPACE or buffer[pos] == ","):
+                pos += 1
+            if pos < len(buffer) or not fill():
+                break
+        if pos >= len(buffer):
+            raise ValueError("Unexpected end of input inside array")
+        if buffer[pos] == "]":
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # Element is split across chunks; read more and try again
+            if not fill():
+                raise
+            continue
+
+        yield item
+        # Drop consumed input so memory stays bounded by one element
+        buffer = buffer[end:]
+        pos = 0
+
+
+def bulk_payload(op_type: str, index: str, doc_id: str, doc: Optional[dict] = None) -> bytes:
+    """Serialize one bulk action line and its source line (none for deletes)"""
+    action = {op_type: {"_index": index, "_id": doc_id}}
+    if op_type == "delete":
+        return (json.dumps(action) + "\n").encode("utf-8")
+    source = {"doc": doc} if op_type == "update" else doc
+    return (json.dumps(action) + "\n" + json.dumps(source) + "\n").encode("utf-8")
+
+
+def prize_payloads(
+    prizes: Iterable[dict],
+    index: str,
+    op_type: str = "index",
+    failures: Optional[List[IngestFailure]] = None,
+    laureate_index: Optional[str] = None,
+) -> Iterator[Tuple[str, bytes]]:
+    """Yield ``(doc_id, ndjson_bytes)`` for each prize, followed by its laureate documents
+    when ``laureate_index`` is given.
+
+    Prizes that cannot be prepared are appended to ``failures`` and skipped.
+    """
+    for prize in prizes:
+        try:
+            doc_id = prize_id(prize)
+            payloads = [(doc_id, bulk_payload(op_type, index, doc_id, with_suggest_inputs(prize)))]
+            if laureate_index is not None:
+                payloads.extend(
+                    (laureate_id, bulk_payload("index", laureate_index, laureate_id, doc))
+                    for laureate_id, doc in laureate_documents(doc_id, prize)
+                )
+        except Exception as e:
+            logger.error(f"Error preparing prize {prize.get('year', 'unknown')} for bulk indexing: {str(e)}")
+            if failures is not None:
+                failures.append(IngestFailure(id=None, status=None, error=str(e)))
+            continue
+        yield from payloads
+
+
+def iter_bulk_batches(
+    items: Iterable[Tuple[Any, bytes]],
+    max_bytes: int = BULK_MAX_BYTES,
+    max_docs: int = BULK_MAX_DOCS,
+) -> Iterator[List[Tuple[Any, bytes]]]:
+    """Group ``(key, ndjson_bytes)`` items into batches bounded by payload size and count"""
+    batch: List[Tuple[Any, bytes]] = []
+    batch_bytes = 0
+    for key, payload in items:
+        if batch and (batch_bytes + len(payload) > max_bytes or len(batch) >= max_docs):
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append((key, payload))
+        batch_bytes += len(payload)
+
+    if batch:
+        yield batch
+
+
+def send_bulk_batch(
+    es,
+    batch: List[Tuple[Any, bytes]],
+    max_retries: int = BULK_MAX_RETRIES,
+    backoff: float = 0.5,
+    refresh=False,
+) -> Tuple[List[Tuple[Any, Optional[int], dict]], int]:
+    """Send one batch, retrying throttled items.
+
+    Returns ``(outcomes, retries)`` where each outcome is
+    ``(key, status, item_result)`` and ``item_result`` is the bulk response
+    item (or ``{"error": ...}`` when the whole request failed).
+    """
+    pending = batch
+    retries = 0
+    outcomes: List[Tuple[Any, Optional[int], dict]] = []
+
+    for attempt in range(max_retries + 1):
+        body = b"".join(payload for _, payload in pending)
+        try:
+            response = es.bulk(body=body, refresh=refresh)
+        except (CircuitOpenError, DeadlineExceeded):
+            # Retrying cannot succeed before the breaker or the deadline allows it
+            raise
+        except Exception as e:
+            status = getattr(e, "status_code", None)
+            status = status if isinstance(status, int) else None
+            if (status is None or status in RETRYABLE_STATUSES) and attempt < max_retries:
+                retries += 1
+                time.sleep(backoff * (2 ** attempt))
+                continue
+            outcomes.extend((key, status, {"error": str(e)}) for key, _ in pending)
+            return outcomes, retries
+
+        retry_items = []
+        for (key, payload), item in zip(pending, response.get("items", [])):
+            result = next(iter(item.values()))
+            status = result.get("status", 500)
+            if status in RETRYABLE_STATUSES and attempt < max_retries:
+                retry_items.append((key, payload))
+            else:
+                outcomes.append((key, status, result))
+
+        if not retry_items:
+            return outcomes, retries
+        retries += 1
+        pending = retry_items
+        time.sleep(backoff * (2 ** attempt))
+
+    return outcomes, retries
+
+
+def _send_batch(es, batch, max_retries: int, backoff: float):
+    """Send one ingest batch. Returns (indexed, retries, failures)."""
+    outcomes, retries = send_bulk_batch(es, batch, max_retries, backoff)
+    failures = [
+        IngestFailure(id=doc_id, status=status,
+                      error=result["error"] if isinstance(result.get("error"), str) else json.dumps(result.get("error")))
+        for doc_id, status, result in outcomes
+        if status is None or status >= 300
+    ]
+    return len(outcomes) - len(failures), retries, failures
+
+
+def bulk_ingest(
+    es,
+    prizes: Iterable[dict],
+    index: str,
+    max_bytes: int = BULK_MAX_BYTES,
+    max_docs: int = BULK_MAX_DOCS,
+    workers: int = BULK_WORKERS,
+    max_retries: int = BULK_MAX_RETRIES,
+    backoff: float = 0.5,
+    laureate_index: Optional[str] = None,
+) -> IngestSummary:
+    """Index prizes with concurrent bulk requests.
+
+    At most ``workers * 2`` batches are in flight at once, so a slow cluster
+    throttles reading from the source instead of buffering it in memory.
+    With ``laureate_index``, the flat laureate documents are written in the
+    same requests and counted in the summary.
+    """
+    started = time.perf_counter()
+    summary = IngestSummary()
+    prepare_failures: List[IngestFailure] = []
+    max_in_flight = max(1, workers * 2)
+
+    def collect(future):
+        batch_size, (indexed, retries, failures) = future.result()
+        summary.total += batch_size
+        summary.indexed += indexed
+        summary.retries += retries
+        summary.failures.extend(failures)
+        logger.info(f"Bulk indexed {indexed}/{batch_size} documents")
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        in_flight = set()
+        payloads = prize_payloads(prizes, index, failures=prepare_failures, laureate_index=laureate_index)
+        for batch in iter_bulk_batches(payloads, max_bytes, max_docs):
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(future)
+            summary.batches += 1
+            in_flight.add(executor.submit(
+                lambda b: (len(b), _send_batch(es, b, max_retries, backoff)), batch
+            ))
+        for future in in_flight:
+            collect(future)
+
+    summary.total += len(prepare_failures)
+    summary.failures = prepare_failures + summary.failures
+    summary.failed = len(summary.failures)
+    summary.elapsed_seconds = time.perf_counter() - started
+    if summary.elapsed_seconds > 0:
+        summary.docs_per_second = summary.indexed / summary.elapsed_seconds
+    return summary
+
+
+def _restore_settings(es, original: dict) -> Optional[Exception]:
+    """Put back each index's settings; returns the first failure, after trying them all"""
+    error = None
+    for index, settings in original.items():
+        try:
+            es.indices.put_settings(index=index, body={"index": settings})
+            logger.info(f"Restored settings of {index}: {settings}")
+        except Exception as e:
+            logger.error(f"Failed to restore settings of {index}: {e}")
+            error = error or e
+    return error
+
+
+@contextmanager
+def bulk_load_settings(es, indices: List[str]) -> Iterator[None]:
+    """Apply ``BULK_LOAD_SETTINGS`` to ``indices`` (or aliases) for the duration of a bulk load.
+
+    The original refresh interval and replica count are restored whether or
+    not the load succeeds; a failed restore is raised only when the load
+    itself succeeded, so it never hides the load's own error.
+    """
+    original = {}
+    response = es.indices.get_settings(index=",".join(indices), flat_settings=True)
+    for index, body in response.items():
+        settings = body["settings"]
+        original[index] = {
+            # Unset means the default; null resets it
+            "refresh_interval": settings.get("index.refresh_interval"),
+            "number_of_replicas": settings.get("index.number_of_replicas"),
+        }
+    try:
+        es.indices.put_settings(index=",".join(original), body={"index": BULK_LOAD_SETTINGS})
+        logger.info(f"Suspended refreshes and replicas on {', '.join(original)}")
+        yield
+    except BaseException:
+        _restore_settings(es, original)
+        raise
+    error = _restore_settings(es, original)
+    if error is not None:
+        raise error
+
+
+def force_merge(es, indices: List[str], max_num_segments: int = 1) -> float:
+    """Merge ``indices`` down to ``max_num_segments`` segments; returns the seconds it took"""
+    started = time.perf_counter()
+    es.indices.forcemerge(index=",".join(indices), max_num_segments=max_num_segments,
+                          request_timeout=FORCE_MERGE_TIMEOUT)
+    elapsed = time.perf_counter() - started
+    logger.info(f"Force-merged {', '.join(indices)} to {max_num_segments} segment(s) in {elapsed:.2f}s")
+    return elapsed
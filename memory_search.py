@@ -0,0 +1,398 @@
+import math
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from models import FacetParams, FlexibleSearchParams, SEARCH_FIELD_BOOSTS, SortField, SortOrder
+from suggest import SuggestIndex
+
+# Lucene BM25 defaults
+K1 = 1.2
+B = 0.75
+MAX_EXPANSIONS = 50
+
+# Numeric fields: matched exactly against the numbers in the query, with a constant score
+NUMERIC_FIELDS = {"year"}
+LAUREATE_PREFIX = "laureates."
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Approximate the standard analyzer: lowercase word tokens"""
+    return _TOKEN.findall(text.lower())
+
+
+def analyze(field: str, value: Optional[str]) -> List[str]:
+    if not value:
+        return []
+    if field in NUMERIC_FIELDS:
+        return [token for token in tokenize(value) if token.isdigit() and len(token) == 4]
+    return tokenize(value)
+
+
+def auto_fuzziness(term: str) -> int:
+    """Edit distance allowed by ``fuzziness: AUTO``"""
+    if len(term) <= 2:
+        return 0
+    if len(term) <= 5:
+        return 1
+    return 2
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Damerau-Levenshtein distance (transpositions count as one edit).
+
+    Unlike the restricted variant this is a metric, which the BK-tree needs.
+    """
+    if a == b:
+        return 0
+    inf = len(a) + len(b)
+    last_row: Dict[str, int] = {}
+    d = [[inf] * (len(b) + 2)]
+    d += [[inf] + list(range(len(b) + 1))]
+    for i in range(1, len(a) + 1):
+        d.append([inf, i] + [0] * len(b))
+        last_match_col = 0
+        for j in range(1, len(b) + 1):
+            k = last_row.get(b[j - 1], 0)
+            l = last_match_col
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            if cost == 0:
+                last_match_col = j
+            d[i + 1][j + 1] = min(
+                d[i][j] + cost,
+                d[i + 1][j] + 1,
+                d[i][j + 1] + 1,
+                d[k][l] + (i - k - 1) + 1 + (j - l - 1),
+            )
+        last_row[a[i - 1]] = i
+    return d[len(a) + 1][len(b) + 1]
+
+
+def _is_after(values: list, search_after: list, directions: List[bool]) -> bool:
+    """Whether sort ``values`` come strictly after ``search_after``"""
+    for value, after, descending in zip(values, search_after, directions):
+        if value != after:
+            return value < after if descending else value > after
+    return False
+
+
+def _in_year_range(year: Optional[str], year_from: Optional[int], year_to: Optional[int]) -> bool:
+    if not year or not year.isdigit():
+        return False
+    return (year_from is None or int(year) >= year_from) and (year_to is None or int(year) <= year_to)
+
+
+class BKTree:
+    """Burkhard-Keller tree for finding terms within an edit distance"""
+
+    def __init__(self):
+        self.root: Optional[Tuple[str, dict]] = None
+
+    def add(self, term: str) -> None:
+        if self.root is None:
+            self.root = (term, {})
+            return
+        node_term, children = self.root
+        while True:
+            distance = edit_distance(term, node_term)
+            if distance == 0:
+                return
+            child = children.get(distance)
+            if child is None:
+                children[distance] = (term, {})
+                return
+            node_term, children = child
+
+    def search(self, term: str, max_distance: int) -> List[Tuple[str, int]]:
+        if self.root is None:
+            return []
+        matches = []
+        stack = [self.root]
+        while stack:
+            node_term, children = stack.pop()
+            distance = edit_distance(term, node_term)
+            if distance <= max_distance:
+                matches.append((node_term, distance))
+            for edge, child in children.items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+        return matches
+
+
+class _FieldIndex:
+    """Postings and length statistics for one field"""
+
+    def __init__(self, numeric: bool = False):
+        self.numeric = numeric
+        self.postings: Dict[str, Dict[object, int]] = defaultdict(dict)
+        self.lengths: Dict[object, int] = {}
+        self.unit_terms: Dict[object, set] = {}
+        self.total_length = 0
+        self.terms = BKTree()
+        self.known = set()
+        self._expansions: Dict[str, List[Tuple[str, float]]] = {}
+
+    def add(self, unit, terms: List[str]) -> None:
+        if not terms:
+            return
+        self.lengths[unit] = len(terms)
+        self.unit_terms[unit] = set(terms)
+        self.total_length += len(terms)
+        for term in terms:
+            if term not in self.known:
+                self.terms.add(term)
+                self.known.add(term)
+                self._expansions.clear()
+            postings = self.postings[term]
+            postings[unit] = postings.get(unit, 0) + 1
+
+    def remove(self, unit) -> None:
+        length = self.lengths.pop(unit, None)
+        if length is None:
+            return
+        self.total_length -= length
+        for term in self.unit_terms.pop(unit):
+            self.postings[term].pop(unit, None)
+
+    def expand(self, term: str) -> List[Tuple[str, float]]:
+        """Index terms matching ``term`` with fuzziness AUTO, with a similarity weight"""
+        expansions = self._expansions.get(term)
+        if expansions is None:
+            max_distance = 0 if self.numeric else auto_fuzziness(term)
+            if max_distance == 0:
+                matches = [(term, 0)] if term in self.known else []
+            else:
+                matches = self.terms.search(term, max_distance)
+            matches = sorted(matches, key=lambda m: (m[1], m[0]))[:MAX_EXPANSIONS]
+            # Same shape as Lucene's fuzzy boost: exact terms score fully, edits less
+            expansions = [
+                (match, 1.0 - distance / min(len(term), len(match)))
+                for match, distance in matches
+            ]
+            self._expansions[term] = expansions
+        return expansions
+
+    def score(self, query_terms: List[str]) -> Dict[object, float]:
+        """BM25 score of every unit matching any of the query terms"""
+        doc_count = len(self.lengths)
+        if not doc_count:
+            return {}
+        avg_length = self.total_length / doc_count
+        scores: Dict[object, float] = defaultdict(float)
+        for query_term in query_terms:
+            best: Dict[object, float] = {}
+            for term, similarity in self.expand(query_term):
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                if self.numeric:
+                    # Like a terms query on a numeric field: constant score per match
+                    for unit in postings:
+                        best[unit] = 1.0
+                    continue
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for unit, tf in postings.items():
+                    norm = K1 * (1 - B + B * self.lengths[unit] / avg_length)
+                    term_score = similarity * idf * tf * (K1 + 1) / (tf + norm)
+                    if term_score > best.get(unit, 0.0):
+                        best[unit] = term_score
+            for unit, term_score in best.items():
+                scores[unit] += term_score
+        return scores
+
+
+class MemorySearchIndex:
+    """In-process inverted index over prize documents.
+
+    Mirrors the Elasticsearch query used by ``flexible_search``: a
+    best-fields fuzzy match over the prize fields plus a best-fields fuzzy
+    match over each laureate, taking the best laureate. Search results have
+    the same shape as an Elasticsearch search response.
+    """
+
+    def __init__(self, prizes: Iterable[Tuple[str, dict]] = ()):
+        self._docs: Dict[str, dict] = {}
+        self._order: Dict[str, int] = {}
+        self._fields: Dict[str, _FieldIndex] = {
+            field: _FieldIndex(numeric=field in NUMERIC_FIELDS) for field in SEARCH_FIELD_BOOSTS
+        }
+        self.suggestions = SuggestIndex()
+        self._lock = threading.RLock()
+        for doc_id, prize in prizes:
+            self.add(doc_id, prize)
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def exists(self, doc_id: str) -> bool:
+        return doc_id in self._docs
+
+    def add(self, doc_id: str, prize: dict) -> None:
+        """Index a prize, replacing any existing document with the same ID"""
+        with self._lock:
+            if doc_id in self._docs:
+                self._remove_postings(doc_id)
+            else:
+                self._order[doc_id] = len(self._order)
+            self._docs[doc_id] = prize
+            for field, index in self._fields.items():
+                if field.startswith(LAUREATE_PREFIX):
+                    name = field[len(LAUREATE_PREFIX):]
+                    for i, laureate in enumerate(prize.get("laureates") or []):
+                        index.add((doc_id, i), analyze(field, laureate.get(name)))
+                else:
+                    index.add(doc_id, analyze(field, prize.get(field)))
+            self.suggestions.add(doc_id, prize)
+
+    def remove(self, doc_id: str) -> None:
+        with self._lock:
+            if doc_id in self._docs:
+                self._remove_postings(doc_id)
+                del self._docs[doc_id]
+                self.suggestions.remove(doc_id)
+
+    def _remove_postings(self, doc_id: str) -> None:
+        for field, index in self._fields.items():
+            if field.startswith(LAUREATE_PREFIX):
+                for i in range(len(self._docs[doc_id].get("laureates") or [])):
+                    index.remove((doc_id, i))
+            else:
+                index.remove(doc_id)
+
+    def suggest(self, prefix: str, size: int) -> Dict[str, List[str]]:
+        """Names and categories starting with ``prefix``"""
+        return self.suggestions.suggest(prefix, size)
+
+    def search(self, params: FlexibleSearchParams, fields: List[str],
+               search_after: Optional[List] = None, paged: bool = True) -> dict:
+        """Run a search over ``fields`` and return an Elasticsearch-shaped response.
+
+        Pages with ``params.page`` when ``paged``, otherwise starts after the
+        ``search_after`` sort values of a previous hit (or at the top).
+        """
+        with self._lock:
+            scores = self._scores(params, fields)
+            ranked = self._sort(scores, params.sort_by, params.sort_order)
+            directions = self._sort_directions(params.sort_by, params.sort_order)
+            if paged:
+                start = (params.page - 1) * params.size
+            elif search_after is not None:
+                start = next(
+                    (i for i, doc_id in enumerate(ranked)
+                     if _is_after(self._sort_values(doc_id, scores, params.sort_by), search_after, directions)),
+                    len(ranked)
+                )
+            else:
+                start = 0
+            hits = [
+                {
+                    "_id": doc_id,
+                    "_score": scores[doc_id],
+                    "_source": self._docs[doc_id],
+                    "sort": self._sort_values(doc_id, scores, params.sort_by)
+                }
+                for doc_id in ranked[start:start + params.size]
+            ]
+            return {
+                "hits": {
+                    "total": {"value": len(scores), "relation": "eq"},
+                    "max_score": max(scores.values(), default=None),
+                    "hits": hits,
+                }
+            }
+
+    def facets(self, params: FacetParams, fields: List[str]) -> dict:
+        """Category and decade counts of the matching prizes, shaped like the /facets aggregations"""
+        search_params = params.search_params()
+        with self._lock:
+            if search_params is not None:
+                doc_ids = list(self._scores(search_params, fields))
+            else:
+                unbounded = params.year_from is None and params.year_to is None
+                doc_ids = [doc_id for doc_id, prize in self._docs.items()
+                           if unbounded or _in_year_range(prize.get("year"), params.year_from, params.year_to)]
+            categories: Dict[str, List[int]] = {}
+            decades: Dict[int, List[int]] = {}
+            total_laureates = 0
+            for doc_id in doc_ids:
+                prize = self._docs[doc_id]
+                laureates = len(prize.get("laureates") or [])
+                total_laureates += laureates
+                buckets = []
+                if prize.get("category"):
+                    buckets.append(categories.setdefault(prize["category"], [0, 0]))
+                year = str(prize.get("year") or "")
+                if year.isdigit():
+                    buckets.append(decades.setdefault(int(year) // 10 * 10, [0, 0]))
+                for bucket in buckets:
+                    bucket[0] += 1
+                    bucket[1] += laureates
+
+        def bucket(key, counts):
+            return {"key": key, "doc_count": counts[0], "laureates": {"doc_count": counts[1]}}
+
+        return {
+            "hits": {"total": {"value": len(doc_ids), "relation": "eq"}, "hits": []},
+            "aggregations": {
+                # terms buckets come most frequent first, histogram buckets in key order
+                "categories": {"buckets": [bucket(key, counts) for key, counts in
+                                           sorted(categories.items(), key=lambda item: (-item[1][0], item[0]))]},
+                "decades": {"buckets": [bucket(key, counts) for key, counts in sorted(decades.items())]},
+                "laureates": {"doc_count": total_laureates}
+            }
+        }
+
+    def _scores(self, params: FlexibleSearchParams, fields: List[str]) -> Dict[str, float]:
+        """Score of every prize matching the search"""
+        prize_scores: Dict[str, float] = {}
+        laureate_scores: Dict[str, float] = {}
+        for field in fields:
+            index = self._fields[field]
+            boost = SEARCH_FIELD_BOOSTS[field]
+            query_terms = analyze(field, params.q)
+            for unit, score in index.score(query_terms).items():
+                score *= boost
+                if field.startswith(LAUREATE_PREFIX):
+                    # best_fields within a laureate, score_mode max across laureates
+                    doc_id = unit[0]
+                    if score > laureate_scores.get(doc_id, 0.0):
+                        laureate_scores[doc_id] = score
+                elif score > prize_scores.get(unit, 0.0):
+                    prize_scores[unit] = score
+
+        scores = dict(prize_scores)
+        for doc_id, score in laureate_scores.items():
+            scores[doc_id] = scores.get(doc_id, 0.0) + score
+
+        if params.year_from is not None or params.year_to is not None:
+            scores = {
+                doc_id: score for doc_id, score in scores.items()
+                if _in_year_range(self._docs[doc_id].get("year"), params.year_from, params.year_to)
+            }
+        return scores
+
+    def _sort_values(self, doc_id: str, scores: Dict[str, float], sort_by: SortField) -> list:
+        """Sort key of a hit, ending in a unique tiebreaker so search_after is exact"""
+        if sort_by == SortField.SCORE:
+            return [scores[doc_id], self._order[doc_id]]
+        return [self._docs[doc_id].get(sort_by.value) or "", scores[doc_id], self._order[doc_id]]
+
+    @staticmethod
+    def _sort_directions(sort_by: SortField, sort_order: SortOrder) -> List[bool]:
+        """Per sort value, whether it is descending"""
+        descending = sort_order == SortOrder.DESC
+        if sort_by == SortField.SCORE:
+            return [descending, False]
+        return [descending, True, False]
+
+    def _sort(self, scores: Dict[str, float], sort_by: SortField, sort_order: SortOrder) -> List[str]:
+        descending = sort_order == SortOrder.DESC
+        if sort_by == SortField.SCORE:
+            # Ties fall back to index order, like Lucene's doc ID
+            return sorted(scores, key=lambda d: (-scores[d] if descending else scores[d], self._order[d]))
+        # Sort on the field, then always by score descending
+        by_score = sorted(scores, key=lambda d: (-scores[d], self._order[d]))
+        return sorted(by_score, key=lambda d: self._docs[d].get(sort_by.value) or "", reverse=descending)
@@ -0,0 +1,310 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from elasticsearch import AsyncTransport, Transport
+
+# Set METRICS_ENABLED=false to turn every metric into a no-op
+ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _label_key(labelnames: Sequence[str], labels: dict) -> Tuple[str, ...]:
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+
+def _format_labels(labelnames: Sequence[str], key: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, key)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+
+
+class Counter(_Metric):
+    """Monotonic counter"""
+    type = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        if not ENABLED:
+            return
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(self.labelnames, labels), 0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+    type = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        if not ENABLED:
+            return
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram: "Histogram", labels: dict):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+class Histogram(_Metric):
+    """Cumulative histogram of observations, in seconds by convention"""
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # Per label set: [bucket counts..., +Inf count], sum
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        if not ENABLED:
+            return
+        key = _label_key(self.labelnames, labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def time(self, **labels):
+        """Context manager observing the duration of its block"""
+        if not ENABLED:
+            return _NULL_TIMER
+        return _Timer(self, labels)
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(_label_key(self.labelnames, labels))
+        return sum(entry[0]) if entry else 0
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = 'le="+Inf"' if bound == float("inf") else 'le="%r"' % bound
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {repr(total)}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector) -> None:
+        """Register a callable run before every scrape, e.g. to refresh gauges"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, labelnames))
+
+
+def histogram(name: str, documentation: str, labelnames: Sequence[str] = (),
+              buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+HTTP_REQUEST_SECONDS = histogram(
+    "http_request_duration_seconds", "Time spent handling HTTP requests", ("route", "method", "status")
+)
+SEARCH_STAGE_SECONDS = histogram(
+    "search_stage_duration_seconds",
+    "Time spent in each stage of /search (validate, cache, build_query, elasticsearch, network, serialize)",
+    ("stage",)
+)
+SEARCH_ES_TOOK_SECONDS = histogram(
+    "search_elasticsearch_took_seconds", "Server-side search time reported by Elasticsearch"
+)
+ES_REQUESTS = counter(
+    "elasticsearch_requests_total", "Elasticsearch client requests", ("endpoint", "method")
+)
+ES_ERRORS = counter(
+    "elasticsearch_errors_total", "Elasticsearch client requests that raised", ("endpoint", "method", "error")
+)
+ES_REQUEST_SECONDS = histogram(
+    "elasticsearch_request_duration_seconds", "Elasticsearch client round-trip time", ("endpoint",)
+)
+INGEST_DOCUMENTS = counter(
+    "ingest_documents_total", "Documents processed by bulk loads", ("result",)
+)
+INGEST_DOCS_PER_SECOND = gauge(
+    "ingest_last_docs_per_second", "Throughput of the most recent bulk load"
+)
+INGEST_SECONDS = histogram(
+    "ingest_duration_seconds", "Duration of bulk loads", buckets=(1, 5, 10, 30, 60, 120, 300, 600, 1800)
+)
+REQUESTS_SHED = counter(
+    "http_requests_shed_total", "Requests rejected with 503 because too many were already in flight"
+)
+EXPORTED_DOCUMENTS = counter("export_documents_total", "Prizes streamed by /export")
+SLOW_QUERIES = counter(
+    "search_slow_queries_total", "Searches slower than the slow-query log threshold, logged or not"
+)
+REQUEST_TIMEOUTS = counter(
+    "http_request_timeouts_total", "Searches that ran out of their time budget", ("outcome",)
+)
+IN_FLIGHT_REQUESTS = gauge(
+    "http_requests_in_flight", "Requests currently being handled"
+)
+ES_CIRCUIT_OPEN = gauge(
+    "elasticsearch_circuit_open", "1 while Elasticsearch calls are failed fast by the circuit breaker"
+)
+SEARCH_CACHE = gauge(
+    "search_cache", "Search result cache counters (hits, misses, evictions, entries, bytes)", ("stat",)
+)
+DOCUMENT_CACHE = gauge(
+    "document_cache", "Prize document cache counters (hits, misses, evictions, entries, bytes)", ("stat",)
+)
+
+
+def record_ingest(summary) -> None:
+    """Export an IngestSummary"""
+    INGEST_DOCUMENTS.inc(summary.indexed, result="indexed")
+    INGEST_DOCUMENTS.inc(summary.failed, result="failed")
+    INGEST_DOCS_PER_SECOND.set(summary.docs_per_second)
+    INGEST_SECONDS.observe(summary.elapsed_seconds)
+
+
+def record_search_timing(elapsed: float, results: dict) -> None:
+    """Split a search round trip into Elasticsearch's ``took`` and everything else (network, transfer)"""
+    if not ENABLED:
+        return
+    SEARCH_STAGE_SECONDS.observe(elapsed, stage="elasticsearch")
+    took = results.get("took")
+    if isinstance(took, (int, float)):
+        SEARCH_ES_TOOK_SECONDS.observe(took / 1000)
+        SEARCH_STAGE_SECONDS.observe(max(0.0, elapsed - took / 1000), stage="network")
+
+
+def es_endpoint(url: str) -> str:
+    """Collapse a request path to its API name (``_search``, ``_bulk``, ``_doc``...)"""
+    for part in reversed(url.split("?", 1)[0].split("/")):
+        if part.startswith("_"):
+            return part
+    return "/" if url in ("", "/") else "index"
+
+
+@contextmanager
+def _track_es_request(method: str, url: str) -> Iterator[None]:
+    endpoint = es_endpoint(url)
+    ES_REQUESTS.inc(endpoint=endpoint, method=method)
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        ES_ERRORS.inc(endpoint=endpoint, method=method, error=type(e).__name__)
+        raise
+    finally:
+        ES_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint)
+
+
+class InstrumentedTransport(Transport):
+    """Transport counting and timing every Elasticsearch client call"""
+
+    def perform_request(self, method, url, headers=None, params=None, body=None):
+        if not ENABLED:
+            return super().perform_request(method, url, headers=headers, params=params, body=body)
+        with _track_es_request(method, url):
+            return super().perform_request(method, url, headers=headers, params=params, body=body)
+
+
+class InstrumentedAsyncTransport(AsyncTransport):
+    """Async counterpart of ``InstrumentedTransport``"""
+
+    async def perform_request(self, method, url, headers=None, params=None, body=None):
+        if not ENABLED:
+            return await super().perform_request(method, url, headers=headers, params=params, body=body)
+        with _track_es_request(method, url):
+            return await super().perform_request(method, url, headers=headers, params=params, body=body)
@@ -1,5 +1,10 @@
-from pydantic import BaseModel, Field, validator, field_validator
-from typing import List, Optional, Union
+from pydantic import BaseModel, Field, validator, field_validator, model_validator
+from typing import Any, Dict, List, Optional, Union
+import base64
+import hashlib
+import json
+
+from serialization import PROJECTION_FIELDS
 from datetime import datetime
 from enum import Enum
 
@@ -12,6 +17,19 @@ class SortField(str, Enum):
     YEAR = "year"
     CATEGORY = "category"
 
+class SearchMode(str, Enum):
+    PRIZE = "prize"
+    LAUREATE = "laureate"
+
+# Searchable fields and their relevance boosts
+SEARCH_FIELD_BOOSTS = {
+    "laureates.firstname": 3,
+    "laureates.surname": 3,
+    "laureates.motivation": 2,
+    "category": 1,
+    "year": 1
+}
+
 class Laureate(BaseModel):
     id: str
     firstname: str
@@ -35,38 +53,215 @@ class SearchResponse(BaseModel):
     laureates: List[Laureate]
     score: float
 
+def validate_search_fields(v: Optional[List[str]]) -> Optional[List[str]]:
+    if v is not None:
+        valid_fields = set(SEARCH_FIELD_BOOSTS)
+        for field in v:
+            if field not in valid_fields:
+                raise ValueError(f"Invalid field: {field}. Valid fields are: {valid_fields}")
+    return v
+
+class SearchCursor(BaseModel):
+    """Opaque position in a result set for search_after paging"""
+    search_after: Optional[List[Any]] = None
+    pit_id: Optional[str] = None
+    shape: Optional[str] = None
+
+    def encode(self) -> str:
+        raw = self.model_dump_json(exclude_none=True).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    @classmethod
+    def decode(cls, value: str) -> "SearchCursor":
+        # "*" starts a new cursor session at the first page
+        if value == "*":
+            return cls()
+        padded = value + "=" * (-len(value) % 4)
+        return cls.model_validate_json(base64.urlsafe_b64decode(padded.encode("ascii")))
+
 class FlexibleSearchParams(BaseModel):
     q: str = Field(..., min_length=1, description="Search term")
     include: Optional[List[str]] = Field(default=None, description="Fields to include in search")
     exclude: Optional[List[str]] = Field(default=None, description="Fields to exclude from search")
     page: int = Field(default=1, ge=1, description="Page number")
     size: int = Field(default=10, ge=1, le=100, description="Results per page")
-    sort_by: Optional[SortField] = Field(default=SortField.SCORE, description="Field to sort by")
-    sort_order: Optional[SortOrder] = Field(default=SortOrder.DESC, description="Sort order")
+    sort_by: SortField = Field(default=SortField.SCORE, description="Field to sort by")
+    sort_order: SortOrder = Field(default=SortOrder.DESC, description="Sort order")
+    cursor: Optional[str] = Field(default=None, description="Cursor from a previous response, or * to start cursor paging")
+    fields: Optional[List[str]] = Field(default=None, description="Prize fields to return (all by default)")
+    year_from: Optional[int] = Field(default=None, ge=1000, le=9999, description="Earliest year (inclusive)")
+    year_to: Optional[int] = Field(default=None, ge=1000, le=9999, description="Latest year (inclusive)")
+    mode: SearchMode = Field(default=SearchMode.PRIZE, description="Search the prize index or the flat laureate index")
 
     @field_validator('include', 'exclude')
     @classmethod
     def validate_fields(cls, v):
-        if v is not None:
-            valid_fields = {
-                "laureates.firstname",
-                "laureates.surname",
-                "laureates.motivation",
-                "category",
-                "year"
-            }
+        return validate_search_fields(v)
+
+    @field_validator('sort_by', 'sort_order', mode='before')
+    @classmethod
+    def default_sort(cls, v, info):
+        # An explicit null (from a JSON body) means the default, not "unsorted"
+        return cls.model_fields[info.field_name].default if v is None else v
+
+    @field_validator('fields')
+    @classmethod
+    def validate_projection(cls, v):
+        if v:
             for field in v:
-                if field not in valid_fields:
-                    raise ValueError(f"Invalid field: {field}. Valid fields are: {valid_fields}")
+                if field not in PROJECTION_FIELDS:
+                    raise ValueError(f"Invalid field: {field}. Valid fields are: {sorted(PROJECTION_FIELDS)}")
+        return v or None
+
+    @field_validator('cursor')
+    @classmethod
+    def validate_cursor(cls, v):
+        if v is not None:
+            try:
+                SearchCursor.decode(v)
+            except Exception:
+                raise ValueError("Invalid cursor")
+        return v
+
+    @model_validator(mode='after')
+    def validate_cursor_shape(self):
+        if self.cursor is not None and self.mode == SearchMode.LAUREATE:
+            raise ValueError("Cursor paging is not supported in laureate mode")
+        cursor = self.search_cursor()
+        if cursor is not None and cursor.shape is not None and cursor.shape != self.shape_key():
+            raise ValueError("Cursor does not belong to this search")
+        return self
+
+    def search_cursor(self) -> Optional[SearchCursor]:
+        return SearchCursor.decode(self.cursor) if self.cursor is not None else None
+
+    def shape_key(self) -> str:
+        """Fingerprint of everything that determines the result order"""
+        shape = [self.q, sorted(self.include or []), sorted(self.exclude or []),
+                 self.sort_by, self.sort_order, self.year_from, self.year_to]
+        return hashlib.sha1(json.dumps(shape).encode("utf-8")).hexdigest()[:16]
+
+class FacetParams(BaseModel):
+    q: Optional[str] = Field(default=None, min_length=1, description="Only count prizes matching this search")
+    include: Optional[List[str]] = Field(default=None, description="Fields to include in search")
+    exclude: Optional[List[str]] = Field(default=None, description="Fields to exclude from search")
+    year_from: Optional[int] = Field(default=None, ge=1000, le=9999, description="Earliest year (inclusive)")
+    year_to: Optional[int] = Field(default=None, ge=1000, le=9999, description="Latest year (inclusive)")
+
+    @field_validator('include', 'exclude')
+    @classmethod
+    def validate_fields(cls, v):
+        return validate_search_fields(v)
+
+    def search_params(self) -> Optional[FlexibleSearchParams]:
+        """The equivalent /search parameters, or None when every prize is counted"""
+        if self.q is None:
+            return None
+        return FlexibleSearchParams(q=self.q, include=self.include, exclude=self.exclude,
+                                    year_from=self.year_from, year_to=self.year_to)
+
+class CategoryFacet(BaseModel):
+    category: str
+    prizes: int
+    laureates: int
+
+class DecadeFacet(BaseModel):
+    decade: int
+    prizes: int
+    laureates: int
+
+class FacetResult(BaseModel):
+    total: int
+    laureates: int
+    categories: List[CategoryFacet]
+    decades: List[DecadeFacet]
+
+class SuggestParams(BaseModel):
+    prefix: str = Field(..., min_length=1, max_length=100, description="What the user has typed so far")
+    size: int = Field(default=5, ge=1, le=20, description="Suggestions per kind")
+
+    @field_validator('prefix')
+    @classmethod
+    def validate_prefix(cls, v):
+        if not v.strip():
+            raise ValueError("Prefix must not be blank")
         return v
 
+class SuggestResponse(BaseModel):
+    prefix: str
+    names: List[str]
+    categories: List[str]
+
+class BatchSearchRequest(BaseModel):
+    queries: List[Dict[str, Any]] = Field(..., min_length=1, max_length=50,
+                                          description="Searches with the same parameters as /search")
+
+class MgetRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=100,
+                           description="Prize ids (<year>_<category>) to fetch")
+
 class SearchResult(BaseModel):
     total: int
     page: int
     size: int
     results: List[Prize]
     score: Optional[float] = None
+    next_cursor: Optional[str] = None
 
 class ErrorResponse(BaseModel):
     error: str
-    details: Optional[str] = None 
\ No newline at end of file
+    details: Optional[str] = None
+
+class BulkWriteParams(BaseModel):
+    op_type: str = Field(default="index", pattern=r'^(index|create|update)$',
+                         description="index: create or replace, create: new prizes only, update: existing prizes only")
+    refresh: str = Field(default="false", pattern=r'^(true|false|wait_for)$', description="Refresh policy")
+
+class BulkItemResult(BaseModel):
+    line: int
+    id: Optional[str] = None
+    status: Optional[int] = None
+    result: Optional[str] = None
+    error: Optional[str] = None
+
+class BulkWriteResponse(BaseModel):
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    results: List[BulkItemResult] = []
+
+class IngestFailure(BaseModel):
+    id: Optional[str] = None
+    status: Optional[int] = None
+    error: str
+
+class IngestSummary(BaseModel):
+    total: int = 0
+    indexed: int = 0
+    failed: int = 0
+    retries: int = 0
+    batches: int = 0
+    elapsed_seconds: float = 0.0
+    docs_per_second: float = 0.0
+    failures: List[IngestFailure] = []
+
+class SyncSummary(BaseModel):
+    not_modified: bool = False
+    added: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    batches: int = 0
+    elapsed_seconds: float = 0.0
+    failures: List[IngestFailure] = []
+
+class SyncedDocument(BaseModel):
+    hash: str
+    laureates: List[str] = []
+
+class SyncState(BaseModel):
+    source: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    documents: Dict[str, SyncedDocument] = {}
@@ -0,0 +1,123 @@
+"""Pre-fork production server: gunicorn workers with one Elasticsearch client each.
+
+The master process binds the port, forks ``WEB_WORKERS`` workers (default:
+one per CPU) and runs the data load once, in a short-lived loader process.
+Each worker drops any client inherited through fork, connects on its own
+and turns ready once the index exists. ``SEARCH_BACKEND=memory`` is refused:
+each worker would hold its own index, and a write would only reach one.
+
+    SERVER_MODE=prefork python app.py
+    python prefork.py --workers 4 --threads 8
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+from typing import Optional
+
+from gunicorn.app.base import BaseApplication
+
+import app as flask_app
+from health import HealthState, StartupPipeline
+
+logger = logging.getLogger(__name__)
+
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", multiprocessing.cpu_count()))
+# Request threads per worker; Elasticsearch calls release the GIL while waiting
+WEB_THREADS = int(os.getenv("WEB_THREADS", 4))
+# Seconds an idle client connection is kept open
+WEB_KEEPALIVE = int(os.getenv("WEB_KEEPALIVE", 5))
+# Workers silent for longer than this are killed and replaced
+WEB_TIMEOUT = int(os.getenv("WEB_TIMEOUT", 30))
+# Client connections a worker holds at once, busy or waiting for a thread (0: twice WEB_THREADS).
+# The in-flight limit only sees requests already on a thread, so this bounds the queue in front of it
+WEB_CONNECTIONS = int(os.getenv("WEB_CONNECTIONS", 0))
+# Connections the kernel queues for the master's socket before refusing new ones
+WEB_BACKLOG = int(os.getenv("WEB_BACKLOG", 64))
+
+
+def load_data_once() -> None:
+    """Loader process: connect and load with backoff, reloading in the foreground"""
+    flask_app.reset_elasticsearch()
+    StartupPipeline(
+        HealthState(),
+        lambda: flask_app.load_initial_data(background=False),
+        connect=lambda: flask_app.set_elasticsearch(flask_app.connect_elasticsearch()),
+    ).run()
+
+
+def when_ready(server) -> None:
+    # Forked before any worker, from a master that holds no client or threads
+    server.loader = multiprocessing.get_context("fork").Process(target=load_data_once, name="loader", daemon=True)
+    server.loader.start()
+
+
+def post_fork(server, worker) -> None:
+    flask_app.reset_elasticsearch()
+
+
+def post_worker_init(worker) -> None:
+    flask_app.start_background_startup(load=flask_app.wait_for_index)
+
+
+def on_exit(server) -> None:
+    loader = getattr(server, "loader", None)
+    if loader is not None and loader.is_alive():
+        loader.terminate()
+
+
+class PreforkApplication(BaseApplication):
+    """gunicorn application serving the Flask app with the hooks above"""
+
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        return flask_app.app
+
+
+def options(host: str = "0.0.0.0", port: int = 5000, workers: Optional[int] = None,
+            threads: Optional[int] = None) -> dict:
+    threads = threads or WEB_THREADS
+    return {
+        "bind": f"{host}:{port}",
+        "workers": workers or WEB_WORKERS,
+        "worker_class": "gthread",
+        "threads": threads,
+        "worker_connections": WEB_CONNECTIONS or 2 * threads,
+        "backlog": WEB_BACKLOG,
+        "keepalive": WEB_KEEPALIVE,
+        "timeout": WEB_TIMEOUT,
+        # Import the app once in the master; workers share its pages copy-on-write
+        "preload_app": True,
+        "when_ready": when_ready,
+        "post_fork": post_fork,
+        "post_worker_init": post_worker_init,
+        "on_exit": on_exit,
+    }
+
+
+def run(host: str = "0.0.0.0", port: int = 5000, workers: Optional[int] = None, threads: Optional[int] = None):
+    if flask_app.SEARCH_BACKEND == "memory":
+        raise ValueError("SEARCH_BACKEND=memory is not supported in prefork mode: "
+                         "writes would only reach the worker that handled them")
+    PreforkApplication(options(host, port, workers, threads)).run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=WEB_WORKERS)
+    parser.add_argument("--threads", type=int, default=WEB_THREADS)
+    args = parser.parse_args()
+    run(args.host, args.port, args.workers, args.threads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Search profiling for admins and the slow-query log.
+
+``/search?profile=true`` runs the generated request through the
+Elasticsearch Profile API and returns per-clause timings next to the
+results; it needs the ``X-Admin-Token`` header to match ``ADMIN_TOKEN``.
+Searches slower than ``SLOW_QUERY_THRESHOLD_MS`` are logged with their
+normalized shape, sampled at ``SLOW_QUERY_SAMPLE_RATE``.
+"""
+import hashlib
+import hmac
+import json
+import logging
+import os
+import random
+from typing import List, Optional
+
+import metrics
+from models import FlexibleSearchParams
+
+logger = logging.getLogger("slow_query")
+
+# Shared secret for admin-only request options; unset disables them
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+# Handler time above which a search is logged (negative disables the log)
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 500))
+# Share of slow searches that are actually logged
+SLOW_QUERY_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_SAMPLE_RATE", 1.0))
+# Clauses listed under "slowest" in a profile
+PROFILE_TOP_CLAUSES = 10
+
+
+def is_admin(token: Optional[str]) -> bool:
+    return bool(ADMIN_TOKEN) and token is not None and hmac.compare_digest(token, ADMIN_TOKEN)
+
+
+def profile_requested(args) -> bool:
+    return args.get("profile", "").lower() == "true"
+
+
+def query_shape(params: FlexibleSearchParams) -> dict:
+    """What determines the generated request, without the search terms themselves"""
+    shape = {
+        "mode": params.mode.value,
+        "terms": len(params.q.split()),
+        "include": sorted(params.include or []),
+        "exclude": sorted(params.exclude or []),
+        "sort": f"{params.sort_by.value}:{params.sort_order.value}",
+        "year_range": params.year_from is not None or params.year_to is not None,
+        "size": params.size,
+        "paging": "cursor" if params.cursor is not None else "offset",
+        "fields": bool(params.fields),
+    }
+    shape["id"] = hashlib.sha1(json.dumps(shape, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    return shape
+
+
+class SlowQueryLog:
+    """Logs searches whose handler time exceeds ``threshold_ms``, sampled at ``sample_rate``"""
+
+    def __init__(self, threshold_ms: float = SLOW_QUERY_THRESHOLD_MS,
+                 sample_rate: float = SLOW_QUERY_SAMPLE_RATE):
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+
+    def is_slow(self, elapsed_ms: float) -> bool:
+        return self.threshold_ms >= 0 and elapsed_ms > self.threshold_ms
+
+    def observe(self, params: FlexibleSearchParams, results: dict, elapsed_ms: float) -> bool:
+        """Log the search if it was slow and sampled; returns whether it was logged"""
+        if not self.is_slow(elapsed_ms):
+            return False
+        metrics.SLOW_QUERIES.inc()
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return False
+        logger.warning(json.dumps({
+            "shape": query_shape(params),
+            "took_ms": results.get("took"),
+            "elapsed_ms": round(elapsed_ms, 1),
+            "hits": results["hits"]["total"]["value"],
+            "timed_out": bool(results.get("timed_out")),
+        }))
+        return True
+
+
+def _clause(node: dict) -> dict:
+    return {
+        "type": node["type"],
+        "description": node["description"],
+        "time_ms": node["time_in_nanos"] / 1e6,
+        "children": [_clause(child) for child in node.get("children", [])],
+    }
+
+
+def _flatten(clauses: List[dict], shard: str):
+    for clause in clauses:
+        yield {"shard": shard, "type": clause["type"], "description": clause["description"],
+               "time_ms": clause["time_ms"]}
+        yield from _flatten(clause["children"], shard)
+
+
+def summarize_profile(profile: dict) -> dict:
+    """Per-shard clause timing trees from a Profile API response, plus the slowest clauses overall.
+
+    A clause's time includes its children's.
+    """
+    shards = []
+    for shard in profile.get("shards", []):
+        for search in shard.get("searches", []):
+            query = [_clause(node) for node in search.get("query", [])]
+            shards.append({
+                "id": shard["id"],
+                "query_ms": sum(clause["time_ms"] for clause in query),
+                "rewrite_ms": search.get("rewrite_time", 0) / 1e6,
+                "collector_ms": sum(c["time_in_nanos"] for c in search.get("collector", [])) / 1e6,
+                "query": query,
+            })
+    clauses = [clause for shard in shards for clause in _flatten(shard["query"], shard["id"])]
+    return {
+        "shards": shards,
+        "slowest": sorted(clauses, key=lambda clause: clause["time_ms"], reverse=True)[:PROFILE_TOP_CLAUSES],
+    }
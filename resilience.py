@@ -0,0 +1,204 @@
+"""Request deadlines, in-flight request limiting and an Elasticsearch circuit breaker.
+
+Together they keep a slow or failing cluster from tying up every worker:
+searches carry a time budget down to Elasticsearch, requests beyond the
+in-flight limit are shed with a 503, and after repeated failures calls fail
+fast until the cluster has had time to recover.
+"""
+import os
+import threading
+import time
+from typing import Type
+
+from elasticsearch import AsyncTransport, Transport
+from elasticsearch.exceptions import ConnectionError, TransportError
+
+# Time budget of a search request, in seconds
+REQUEST_DEADLINE = float(os.getenv("REQUEST_DEADLINE", 3))
+# Share of the remaining budget Elasticsearch may spend searching before returning partial results;
+# the rest is left for the round trip and serializing the response
+ES_TIMEOUT_SHARE = 0.8
+# Concurrent requests handled before new ones are shed with 503 (0 disables the limit)
+MAX_IN_FLIGHT_REQUESTS = int(os.getenv("MAX_IN_FLIGHT_REQUESTS", 64))
+SHED_RETRY_AFTER = int(os.getenv("SHED_RETRY_AFTER", 1))
+# Consecutive Elasticsearch failures that open the circuit, and how long it stays open
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", 5))
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", 10))
+
+
+class DeadlineExceeded(Exception):
+    """The request's time budget ran out before the work finished"""
+
+
+class ServiceUnavailable(Exception):
+    """Elasticsearch cannot serve the request; worth retrying after ``retry_after`` seconds"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(ServiceUnavailable):
+    """Elasticsearch calls are being failed fast after repeated errors"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Elasticsearch circuit open, retry in {retry_after:.1f}s", retry_after)
+
+
+class Deadline:
+    """Absolute point in time by which a request must be answered"""
+
+    def __init__(self, budget: float = REQUEST_DEADLINE):
+        self.budget = budget
+        self.expires_at = time.monotonic() + budget
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def check(self) -> float:
+        """Remaining seconds; raises ``DeadlineExceeded`` once the budget is spent"""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"Request exceeded its {self.budget:.3g}s budget")
+        return remaining
+
+    def es_timeout(self) -> str:
+        """Search-level ``timeout``: a fixed share of the budget, leaving time for the round trip.
+
+        Fixed rather than derived from the remaining time so identical
+        searches send identical bodies; the client-side timeout still stops
+        at the deadline.
+        """
+        self.check()
+        return f"{max(1, int(self.budget * ES_TIMEOUT_SHARE * 1000))}ms"
+
+
+class ConcurrencyLimiter:
+    """Non-blocking cap on requests in flight"""
+
+    def __init__(self, limit: int = MAX_IN_FLIGHT_REQUESTS):
+        self.limit = limit
+        self.in_flight = 0
+        self.shed = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self.limit and self.in_flight >= self.limit:
+                self.shed += 1
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+
+class CircuitBreaker:
+    """Closed -> open after ``failure_threshold`` consecutive failures; after
+    ``reset_timeout`` seconds one trial call is let through (half-open) and
+    its outcome closes or reopens the circuit."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout: float = BREAKER_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        """Raise ``CircuitOpenError`` unless a call may go through now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            waited = time.monotonic() - self.opened_at
+            if self.state == self.OPEN and waited >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            raise CircuitOpenError(max(0.0, self.reset_timeout - waited))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def raise_if_open(self) -> None:
+        """Like ``before_call`` without claiming the half-open trial call"""
+        retry_after = self.retry_after()
+        if self.state == self.OPEN and retry_after > 0:
+            raise CircuitOpenError(retry_after)
+
+    def retry_after(self) -> float:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+
+def is_cluster_failure(error: Exception) -> bool:
+    """Connection errors, timeouts and 5xx answers count against the breaker; 4xx do not"""
+    if isinstance(error, ConnectionError):
+        return True
+    status = getattr(error, "status_code", None)
+    return isinstance(error, TransportError) and isinstance(status, int) and status >= 500
+
+
+def guarded_transport(base: Type[Transport], breaker: CircuitBreaker) -> Type[Transport]:
+    """Subclass of the transport ``base`` that routes every request through ``breaker``"""
+
+    class GuardedTransport(base):
+        def perform_request(self, method, url, headers=None, params=None, body=None):
+            breaker.before_call()
+            try:
+                result = super().perform_request(method, url, headers=headers, params=params, body=body)
+            except Exception as e:
+                if is_cluster_failure(e):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                raise
+            breaker.record_success()
+            return result
+
+    GuardedTransport.__name__ = f"Guarded{base.__name__}"
+    return GuardedTransport
+
+
+def guarded_async_transport(base: Type[AsyncTransport], breaker: CircuitBreaker) -> Type[AsyncTransport]:
+    """Async counterpart of ``guarded_transport``"""
+
+    class GuardedAsyncTransport(base):
+        async def perform_request(self, method, url, headers=None, params=None, body=None):
+            breaker.before_call()
+            try:
+                result = await super().perform_request(method, url, headers=headers, params=params, body=body)
+            except Exception as e:
+                if is_cluster_failure(e):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                raise
+            breaker.record_success()
+            return result
+
+    GuardedAsyncTransport.__name__ = f"Guarded{base.__name__}"
+    return GuardedAsyncTransport
@@ -0,0 +1,79 @@
+import json
+from typing import Any, List, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+# Prize and Laureate fields, in the order the models declare them
+PRIZE_FIELDS = ("year", "category", "laureates")
+LAUREATE_FIELDS = ("id", "firstname", "surname", "motivation", "share")
+LAUREATE_REQUIRED = ("id", "firstname")
+
+# Everything a client can ask for with ``fields=``
+PROJECTION_FIELDS = {"year", "category", "laureates"} | {f"laureates.{f}" for f in LAUREATE_FIELDS}
+
+# _source includes that cover a full Prize
+PRIZE_SOURCE_INCLUDES = ["year", "category"] + [f"laureates.{f}" for f in LAUREATE_FIELDS]
+
+
+def encode_json(data: Any) -> bytes:
+    """Serialize to compact JSON bytes with sorted keys, using orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def _optional_str(value) -> bool:
+    return value is None or isinstance(value, str)
+
+
+def normalize_prize(source: dict) -> Optional[dict]:
+    """Build ``Prize(**source).dict()`` without pydantic for well-formed documents.
+
+    Returns None when the document is not obviously valid, so the caller can
+    fall back to full model validation.
+    """
+    year, category, laureates = source.get("year"), source.get("category"), source.get("laureates")
+    if not isinstance(year, str) or not isinstance(category, str) or not isinstance(laureates, list):
+        return None
+    normalized = []
+    for laureate in laureates:
+        if not isinstance(laureate, dict):
+            return None
+        item = {field: laureate.get(field) for field in LAUREATE_FIELDS}
+        if not all(isinstance(item[field], str) for field in LAUREATE_REQUIRED):
+            return None
+        if not all(_optional_str(value) for value in item.values()):
+            return None
+        normalized.append(item)
+    return {"year": year, "category": category, "laureates": normalized}
+
+
+def source_includes(fields: Optional[List[str]]) -> List[str]:
+    """_source includes for a projection (a full Prize by default)"""
+    if not fields:
+        return PRIZE_SOURCE_INCLUDES
+    includes = []
+    for field in fields:
+        if field == "laureates":
+            includes.extend(f"laureates.{f}" for f in LAUREATE_FIELDS)
+        else:
+            includes.append(field)
+    return sorted(set(includes))
+
+
+def project_prize(source: dict, fields: List[str]) -> dict:
+    """Keep only the requested fields of a prize document"""
+    projected = {field: source.get(field) for field in ("year", "category") if field in fields}
+    if "laureates" in fields:
+        laureate_fields = LAUREATE_FIELDS
+    else:
+        laureate_fields = [f.split(".", 1)[1] for f in fields if f.startswith("laureates.")]
+    if laureate_fields:
+        projected["laureates"] = [
+            {field: laureate.get(field) for field in laureate_fields}
+            for laureate in source.get("laureates") or []
+        ]
+    return projected
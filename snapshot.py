@@ -0,0 +1,248 @@
+"""Compressed local snapshots of the prize dataset for fast, offline cold starts.
+
+A snapshot is written while the dataset is streamed from its source and
+replayed instead of the source while it is fresh, or when the source is
+unreachable. Layout:
+
+    magic (8 bytes) | header (HEADER_SIZE bytes of space-padded JSON) | zlib payload
+
+The payload is one prize per line as compact UTF-8 JSON (which never
+contains a raw newline), so it can be decoded incrementally, a whole chunk of
+lines per ``json.loads`` call. The header records the format version,
+source, creation time, record count, payload size and SHA-256 of the
+payload; anything that does not match is reported as a ``SnapshotError``.
+
+    python snapshot.py info nobel_prizes.snap
+    python snapshot.py create --source https://api.nobelprize.org/v1/prize.json nobel_prizes.snap
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+import zlib
+from itertools import chain
+from typing import Iterator, Optional
+
+import requests
+
+from ingest import NOBEL_API_URL, iter_json_array, iter_source_chunks
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"NOBELSNP"
+FORMAT_VERSION = 1
+HEADER_SIZE = 4096
+PAYLOAD_OFFSET = len(MAGIC) + HEADER_SIZE
+READ_CHUNK_SIZE = 256 * 1024
+COMPRESSION_LEVEL = 6
+
+# Empty disables snapshots
+SNAPSHOT_PATH = os.getenv("NOBEL_SNAPSHOT_PATH", "")
+# Snapshots older than this are refreshed from the source when it is reachable
+SNAPSHOT_MAX_AGE = int(os.getenv("NOBEL_SNAPSHOT_MAX_AGE", 24 * 3600))
+
+
+class SnapshotError(Exception):
+    """A snapshot is truncated, corrupt or written in an unsupported format"""
+
+
+class SnapshotWriter:
+    """Write prizes to a snapshot; the file only replaces ``path`` once ``commit`` succeeds"""
+
+    def __init__(self, path: str, source: str):
+        self.path = path
+        self.source = source
+        self.count = 0
+        self._tmp_path = f"{path}.{os.getpid()}.tmp"
+        self._file = open(self._tmp_path, "wb")
+        self._file.write(MAGIC + b" " * HEADER_SIZE)
+        self._compressor = zlib.compressobj(COMPRESSION_LEVEL)
+        self._hash = hashlib.sha256()
+        self._payload_bytes = 0
+
+    def _emit(self, data: bytes) -> None:
+        if data:
+            self._file.write(data)
+            self._hash.update(data)
+            self._payload_bytes += len(data)
+
+    def write(self, prize: dict) -> None:
+        record = json.dumps(prize, separators=(",", ":")).encode("utf-8")
+        self._emit(self._compressor.compress(record + b"\n"))
+        self.count += 1
+
+    def commit(self) -> dict:
+        self._emit(self._compressor.flush())
+        header = {
+            "format": FORMAT_VERSION,
+            "source": self.source,
+            "created_at": time.time(),
+            "count": self.count,
+            "payload_bytes": self._payload_bytes,
+            "sha256": self._hash.hexdigest(),
+        }
+        encoded = json.dumps(header).encode("utf-8")
+        if len(encoded) > HEADER_SIZE:
+            self.abort()
+            raise SnapshotError(f"Snapshot header exceeds {HEADER_SIZE} bytes")
+        self._file.seek(len(MAGIC))
+        self._file.write(encoded)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+        return header
+
+    def abort(self) -> None:
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+        return False
+
+
+def read_header(path: str) -> dict:
+    """The snapshot header, after checking the magic bytes and format version"""
+    with open(path, "rb") as f:
+        preamble = f.read(PAYLOAD_OFFSET)
+    if len(preamble) < PAYLOAD_OFFSET or not preamble.startswith(MAGIC):
+        raise SnapshotError(f"{path} is not a snapshot")
+    try:
+        header = json.loads(preamble[len(MAGIC):])
+    except ValueError as e:
+        raise SnapshotError(f"Unreadable snapshot header: {e}")
+    if header.get("format") != FORMAT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot format {header.get('format')} (expected {FORMAT_VERSION})")
+    return header
+
+
+def verify(path: str) -> dict:
+    """Check the payload size and checksum against the header; returns the header"""
+    header = read_header(path)
+    size = os.path.getsize(path) - PAYLOAD_OFFSET
+    if size != header["payload_bytes"]:
+        raise SnapshotError(f"Snapshot payload is {size} bytes, expected {header['payload_bytes']}")
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        f.seek(PAYLOAD_OFFSET)
+        for chunk in iter(lambda: f.read(READ_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    if digest.hexdigest() != header["sha256"]:
+        raise SnapshotError("Snapshot checksum mismatch")
+    return header
+
+
+def iter_snapshot(path: str, check: bool = True) -> Iterator[dict]:
+    """Yield the prizes of a snapshot, decompressing incrementally.
+
+    With ``check``, the whole payload is verified before the first prize is
+    yielded, so a corrupt snapshot is never partially loaded.
+    """
+    header = verify(path) if check else read_header(path)
+    decompressor = zlib.decompressobj()
+    buffer = b""
+    count = 0
+    try:
+        with open(path, "rb") as f:
+            f.seek(PAYLOAD_OFFSET)
+            for chunk in iter(lambda: f.read(READ_CHUNK_SIZE), b""):
+                buffer += decompressor.decompress(chunk)
+                cut = buffer.rfind(b"\n")
+                if cut < 0:
+                    continue
+                # One parse per chunk is markedly faster than one per prize
+                prizes = json.loads(b"[" + buffer[:cut].replace(b"\n", b",") + b"]")
+                buffer = buffer[cut + 1:]
+                count += len(prizes)
+                yield from prizes
+    except (zlib.error, ValueError) as e:
+        raise SnapshotError(f"Corrupt snapshot payload: {e}")
+    if buffer or not decompressor.eof or count != header["count"]:
+        raise SnapshotError(f"Snapshot is truncated: {count} of {header['count']} prizes")
+
+
+def iter_prizes(source: str, snapshot_path: Optional[str] = None,
+                max_age: Optional[float] = None) -> Iterator[dict]:
+    """Prizes from a fresh snapshot of ``source``, else from ``source`` itself.
+
+    Streaming from the source writes a new snapshot as a side effect; it
+    only replaces the old one once every prize has been read. If the source
+    cannot be reached, a stale (but intact) snapshot of it is used instead.
+    """
+    snapshot_path = SNAPSHOT_PATH if snapshot_path is None else snapshot_path
+    max_age = SNAPSHOT_MAX_AGE if max_age is None else max_age
+    if not snapshot_path:
+        yield from iter_json_array(iter_source_chunks(source), key="prizes")
+        return
+
+    header = None
+    try:
+        header = verify(snapshot_path)
+        if header["source"] != source:
+            header = None
+    except FileNotFoundError:
+        pass
+    except SnapshotError as e:
+        logger.warning(f"Ignoring snapshot {snapshot_path}: {e}")
+
+    if header is not None and time.time() - header["created_at"] <= max_age:
+        logger.info(f"Loading {header['count']} prizes from snapshot {snapshot_path}")
+        yield from iter_snapshot(snapshot_path, check=False)
+        return
+
+    chunks = iter_source_chunks(source)
+    try:
+        first = next(chunks, "")
+    except (requests.RequestException, OSError) as e:
+        if header is None:
+            raise
+        age = time.time() - header["created_at"]
+        logger.warning(f"{source} is unavailable ({e}), loading a {age / 3600:.1f}h old snapshot instead")
+        yield from iter_snapshot(snapshot_path, check=False)
+        return
+
+    with SnapshotWriter(snapshot_path, source) as writer:
+        for prize in iter_json_array(chain([first], chunks), key="prizes"):
+            writer.write(prize)
+            yield prize
+    logger.info(f"Wrote snapshot of {writer.count} prizes to {snapshot_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    info = commands.add_parser("info", help="Verify a snapshot and print its header")
+    info.add_argument("path")
+    create = commands.add_parser("create", help="Write a snapshot of a dataset")
+    create.add_argument("path")
+    create.add_argument("--source", default=os.getenv("NOBEL_DATA_SOURCE", NOBEL_API_URL))
+    args = parser.parse_args()
+
+    try:
+        if args.command == "info":
+            header = verify(args.path)
+        else:
+            with SnapshotWriter(args.path, args.source) as writer:
+                for prize in iter_json_array(iter_source_chunks(args.source), key="prizes"):
+                    writer.write(prize)
+            header = read_header(args.path)
+    except SnapshotError as e:
+        print(f"error: {e}", file=sys.stderr)
+        sys.exit(1)
+    json.dump(header, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
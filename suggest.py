@@ -0,0 +1,154 @@
+import re
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Tuple
+
+# Completion fields added to every indexed prize (excluded from _source)
+NAME_SUGGEST_FIELD = "name_suggest"
+CATEGORY_SUGGEST_FIELD = "category_suggest"
+SUGGEST_FIELDS = (NAME_SUGGEST_FIELD, CATEGORY_SUGGEST_FIELD)
+
+SUGGEST_MAPPING = {
+    field: {"type": "completion", "analyzer": "simple", "max_input_length": 100}
+    for field in SUGGEST_FIELDS
+}
+
+# Suggestions asked from Elasticsearch per requested one, to leave room for
+# options that resolve to the same display name
+OVERFETCH = 2
+
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_prefix(prefix: str) -> str:
+    return _SPACES.sub(" ", prefix.strip().lower())
+
+
+def laureate_name(laureate: dict) -> str:
+    return " ".join(part for part in (laureate.get("firstname"), laureate.get("surname")) if part)
+
+
+def name_inputs(prize: dict) -> List[Tuple[str, str]]:
+    """``(input, display name)`` pairs: each laureate's full name and, on its own, surname"""
+    inputs = []
+    for laureate in prize.get("laureates") or []:
+        name = laureate_name(laureate)
+        if not name:
+            continue
+        inputs.append((name, name))
+        surname = laureate.get("surname")
+        if surname and surname != name:
+            inputs.append((surname, name))
+    return inputs
+
+
+def with_suggest_inputs(prize: dict) -> dict:
+    """Copy of a prize document with its completion suggester inputs filled in"""
+    doc = dict(prize)
+    doc[NAME_SUGGEST_FIELD] = sorted({text for text, _ in name_inputs(prize)})
+    doc[CATEGORY_SUGGEST_FIELD] = [prize["category"]] if prize.get("category") else []
+    return doc
+
+
+def build_suggest_query(prefix: str, size: int) -> dict:
+    """Completion suggester request for names and categories starting with ``prefix``"""
+    def completion(field: str, count: int) -> dict:
+        return {"prefix": prefix, "completion": {"field": field, "size": count, "skip_duplicates": True}}
+
+    return {
+        "_source": ["laureates.firstname", "laureates.surname"],
+        "suggest": {
+            "names": completion(NAME_SUGGEST_FIELD, size * OVERFETCH),
+            "categories": completion(CATEGORY_SUGGEST_FIELD, size),
+        }
+    }
+
+
+def _display_name(option: dict) -> str:
+    """Resolve a matched surname input back to the laureate's full name"""
+    text = option["text"]
+    for laureate in (option.get("_source") or {}).get("laureates") or []:
+        if text.lower() in (laureate_name(laureate).lower(), (laureate.get("surname") or "").lower()):
+            return laureate_name(laureate)
+    return text
+
+
+def parse_suggest_response(response: dict, size: int) -> Dict[str, List[str]]:
+    """Names and categories from a completion suggester response, deduplicated in rank order"""
+    suggest = response.get("suggest") or {}
+    result = {}
+    for key, display in (("names", _display_name), ("categories", lambda option: option["text"])):
+        values: List[str] = []
+        for entry in suggest.get(key) or []:
+            for option in entry.get("options") or []:
+                value = display(option)
+                if value not in values:
+                    values.append(value)
+        result[key] = values[:size]
+    return result
+
+
+class PrefixIndex:
+    """Sorted input strings for prefix lookups; each input maps to display values and their document counts"""
+
+    def __init__(self):
+        self._keys: List[str] = []
+        self._displays: Dict[str, Dict[str, int]] = {}
+        self._docs: Dict[str, List[Tuple[str, str]]] = {}
+
+    def add(self, doc_id: str, inputs: Iterable[Tuple[str, str]]) -> None:
+        self.remove(doc_id)
+        entries = [(normalize_prefix(text), display) for text, display in inputs]
+        self._docs[doc_id] = entries
+        for key, display in entries:
+            displays = self._displays.get(key)
+            if displays is None:
+                displays = self._displays[key] = {}
+                insort(self._keys, key)
+            displays[display] = displays.get(display, 0) + 1
+
+    def remove(self, doc_id: str) -> None:
+        for key, display in self._docs.pop(doc_id, ()):
+            displays = self._displays[key]
+            displays[display] -= 1
+            if not displays[display]:
+                del displays[display]
+            if not displays:
+                del self._displays[key]
+                del self._keys[bisect_left(self._keys, key)]
+
+    def complete(self, prefix: str, size: int) -> List[str]:
+        """Display values of inputs starting with ``prefix``, most frequent first"""
+        counts: Dict[str, int] = {}
+        for i in range(bisect_left(self._keys, prefix), len(self._keys)):
+            key = self._keys[i]
+            if not key.startswith(prefix):
+                break
+            for display, count in self._displays[key].items():
+                counts[display] = max(counts.get(display, 0), count)
+        return sorted(counts, key=lambda display: (-counts[display], display))[:size]
+
+
+class SuggestIndex:
+    """In-process counterpart of the completion suggester fields"""
+
+    def __init__(self):
+        self.names = PrefixIndex()
+        self.categories = PrefixIndex()
+        self._lock = threading.RLock()
+
+    def add(self, doc_id: str, prize: dict) -> None:
+        with self._lock:
+            self.names.add(doc_id, name_inputs(prize))
+            category = prize.get("category")
+            self.categories.add(doc_id, [(category, category)] if category else [])
+
+    def remove(self, doc_id: str) -> None:
+        with self._lock:
+            self.names.remove(doc_id)
+            self.categories.remove(doc_id)
+
+    def suggest(self, prefix: str, size: int) -> Dict[str, List[str]]:
+        prefix = normalize_prefix(prefix)
+        with self._lock:
+            return {"names": self.names.complete(prefix, size), "categories": self.categories.complete(prefix, size)}
@@ -0,0 +1,240 @@
+"""Incremental sync of the prize indices with the upstream dataset.
+
+Fetches the dataset only when it changed since the last run (ETag /
+Last-Modified, or modification time for local files), compares per-prize
+content hashes with those recorded in a local state file, and sends bulk
+requests containing only new, changed and deleted prizes (and their laureate
+documents). Safe to run periodically, e.g. from cron:
+
+    python sync.py --source https://api.nobelprize.org/v1/prize.json --state /var/lib/nobel/sync.json
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Iterator, Optional, Tuple
+
+import requests
+from elasticsearch import Elasticsearch
+
+import app as flask_app
+from ingest import (
+    BULK_MAX_BYTES, BULK_MAX_DOCS, BULK_MAX_RETRIES, NOBEL_API_URL, bulk_payload, iter_bulk_batches,
+    iter_json_array, iter_response_chunks, iter_source_chunks, laureate_documents, prize_id, send_bulk_batch
+)
+from models import IngestFailure, SyncedDocument, SyncState, SyncSummary
+from suggest import with_suggest_inputs
+
+logger = logging.getLogger(__name__)
+
+SYNC_STATE_FILE = os.getenv("SYNC_STATE_FILE", "nobel_sync_state.json")
+FETCH_TIMEOUT = float(os.getenv("SYNC_FETCH_TIMEOUT", 30))
+
+
+def content_hash(prize: dict) -> str:
+    """Stable hash of a prize as published upstream"""
+    return hashlib.sha1(json.dumps(prize, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def load_state(path: str) -> SyncState:
+    if not os.path.exists(path):
+        return SyncState()
+    with open(path, "r", encoding="utf-8") as f:
+        return SyncState.model_validate_json(f.read())
+
+
+def save_state(state: SyncState, path: str) -> None:
+    """Write the state file atomically, so an interrupted run never leaves it half-written"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(state.model_dump_json())
+    os.replace(tmp_path, path)
+
+
+def fetch_if_changed(source: str, state: Optional[SyncState] = None) -> Tuple[Optional[Iterator[str]], dict]:
+    """Open the dataset unless it is unchanged since ``state`` was recorded.
+
+    Returns ``(chunks, validators)``; ``chunks`` is None when the source is
+    not modified. ``validators`` are the ETag/Last-Modified to record once the
+    sync succeeds.
+    """
+    known = state if state is not None and state.source == source else SyncState()
+    if source.startswith(("http://", "https://")):
+        headers = {}
+        if known.etag:
+            headers["If-None-Match"] = known.etag
+        if known.last_modified:
+            headers["If-Modified-Since"] = known.last_modified
+        response = requests.get(source, stream=True, headers=headers, timeout=FETCH_TIMEOUT)
+        if response.status_code == 304:
+            response.close()
+            return None, {}
+        response.raise_for_status()
+        validators = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+        return iter_response_chunks(response), validators
+
+    stat = os.stat(source)
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    if etag == known.etag:
+        return None, {}
+    return iter_source_chunks(source), {"etag": etag, "last_modified": None}
+
+
+def ensure_indices(es: Elasticsearch) -> bool:
+    """Create and alias empty index generations when none exist yet; returns True if it did"""
+    if flask_app.get_alias_indices(es):
+        return False
+    index = flask_app.create_index(es)
+    laureate_index = flask_app.create_index(es, alias=flask_app.LAUREATE_ALIAS, body=flask_app.LAUREATE_INDEX_BODY)
+    flask_app.swap_alias(es, index, laureate_index)
+    return True
+
+
+def _succeeded(status: Optional[int], result: dict) -> bool:
+    # Deleting a document that is already gone is fine
+    return status is not None and (status < 300 or (status == 404 and result.get("result") == "not_found"))
+
+
+def sync(es: Elasticsearch = None, source: Optional[str] = None, state_path: str = SYNC_STATE_FILE,
+         force: bool = False, max_bytes: int = BULK_MAX_BYTES, max_docs: int = BULK_MAX_DOCS,
+         max_retries: int = BULK_MAX_RETRIES, backoff: float = 0.5) -> SyncSummary:
+    """Apply upstream changes since the last sync to the live indices.
+
+    With ``force``, the dataset is fetched even if its validators are
+    unchanged (content hashes still decide what is written). Prizes whose
+    writes fail keep their previous state, so the next run retries them.
+    """
+    if es is None:
+        es = flask_app.get_elasticsearch()
+    if source is None:
+        source = os.getenv("NOBEL_DATA_SOURCE", NOBEL_API_URL)
+
+    started = time.perf_counter()
+    summary = SyncSummary()
+    state = load_state(state_path)
+    if ensure_indices(es):
+        logger.info("No index found, syncing every prize into a new generation")
+        state = SyncState()
+
+    chunks, validators = fetch_if_changed(source, None if force else state)
+    if chunks is None:
+        logger.info(f"{source} not modified since the last sync")
+        summary.not_modified = True
+        summary.elapsed_seconds = time.perf_counter() - started
+        return summary
+
+    # New state per written prize (None for deletions), applied once its writes succeed
+    pending = {}
+    kinds = {}
+
+    def payloads():
+        seen = set()
+        for prize in iter_json_array(chunks, key="prizes"):
+            try:
+                doc_id = prize_id(prize)
+            except (KeyError, TypeError) as e:
+                summary.failures.append(IngestFailure(id=None, status=None, error=f"Invalid prize: {e}"))
+                continue
+            seen.add(doc_id)
+            digest = content_hash(prize)
+            previous = state.documents.get(doc_id)
+            if previous is not None and previous.hash == digest:
+                summary.unchanged += 1
+                continue
+
+            laureates = laureate_documents(doc_id, prize)
+            pending[doc_id] = SyncedDocument(hash=digest, laureates=[laureate_id for laureate_id, _ in laureates])
+            kinds[doc_id] = "added" if previous is None else "updated"
+            yield doc_id, bulk_payload("index", flask_app.INDEX_ALIAS, doc_id, with_suggest_inputs(prize))
+            for laureate_id, doc in laureates:
+                yield doc_id, bulk_payload("index", flask_app.LAUREATE_ALIAS, laureate_id, doc)
+            for laureate_id in sorted(set(previous.laureates if previous else []) - set(pending[doc_id].laureates)):
+                yield doc_id, bulk_payload("delete", flask_app.LAUREATE_ALIAS, laureate_id)
+
+        # Only reached once the whole dataset parsed, so a truncated download never deletes anything
+        removed = sorted(set(state.documents) - seen)
+        if removed and not seen:
+            raise ValueError(f"{source} contains no prizes; refusing to delete {len(removed)} documents")
+        for doc_id in removed:
+            pending[doc_id] = None
+            kinds[doc_id] = "deleted"
+            yield doc_id, bulk_payload("delete", flask_app.INDEX_ALIAS, doc_id)
+            for laureate_id in state.documents[doc_id].laureates:
+                yield doc_id, bulk_payload("delete", flask_app.LAUREATE_ALIAS, laureate_id)
+
+    failed_ids = set()
+    for batch in iter_bulk_batches(payloads(), max_bytes, max_docs):
+        summary.batches += 1
+        outcomes, _ = send_bulk_batch(es, batch, max_retries, backoff)
+        for doc_id, status, result in outcomes:
+            if _succeeded(status, result):
+                continue
+            if doc_id not in failed_ids:
+                error = result.get("error")
+                summary.failures.append(IngestFailure(
+                    id=doc_id, status=status, error=error if isinstance(error, str) else json.dumps(error)
+                ))
+            failed_ids.add(doc_id)
+
+    for doc_id, kind in kinds.items():
+        if doc_id in failed_ids:
+            continue
+        setattr(summary, kind, getattr(summary, kind) + 1)
+        if pending[doc_id] is None:
+            state.documents.pop(doc_id, None)
+        else:
+            state.documents[doc_id] = pending[doc_id]
+
+    summary.failed = len(summary.failures)
+    # Keep the old validators after failures so the next run fetches the dataset again
+    if not summary.failed:
+        state.source = source
+        state.etag = validators.get("etag")
+        state.last_modified = validators.get("last_modified")
+    save_state(state, state_path)
+
+    if kinds:
+        es.indices.refresh(index=f"{flask_app.INDEX_ALIAS},{flask_app.LAUREATE_ALIAS}")
+        flask_app.search_cache.clear()
+        flask_app.document_cache.clear()
+    summary.elapsed_seconds = time.perf_counter() - started
+    logger.info(
+        f"Sync completed: {summary.added} added, {summary.updated} updated, {summary.deleted} deleted, "
+        f"{summary.unchanged} unchanged, {summary.failed} failed in {summary.elapsed_seconds:.2f}s"
+    )
+    return summary
+
+
+def sync_in_background(es: Elasticsearch = None, source: Optional[str] = None) -> threading.Thread:
+    """Run ``sync`` on a daemon thread so the server starts serving right away"""
+    def run():
+        try:
+            sync(es, source=source)
+        except Exception as e:
+            logger.error(f"Background sync failed: {str(e)}")
+
+    thread = threading.Thread(target=run, name="sync", daemon=True)
+    thread.start()
+    return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", default=os.getenv("NOBEL_DATA_SOURCE", NOBEL_API_URL),
+                        help="Dataset URL or local JSON file")
+    parser.add_argument("--state", default=SYNC_STATE_FILE, help="State file with validators and content hashes")
+    parser.add_argument("--force", action="store_true", help="Fetch even if the dataset looks unchanged")
+    args = parser.parse_args()
+
+    summary = sync(source=args.source, state_path=args.state, force=args.force)
+    json.dump(summary.dict(), sys.stdout, indent=2)
+    print()
+    sys.exit(1 if summary.failed else 0)
+
+
+if __name__ == "__main__":
+    main()
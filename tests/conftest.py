@@ -11,6 +11,13 @@ def app():
     })
     return test_app
 
+@pytest.fixture(autouse=True)
+def clear_search_cache():
+    """Start every test with empty search and document caches."""
+    flask_app.search_cache.clear()
+    flask_app.document_cache.clear()
+    yield
+
 @pytest.fixture
 def client(app):
     """Create a test client for the app."""
@@ -0,0 +1,192 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+import async_app
+from health import HealthState
+from resilience import CircuitOpenError, ConcurrencyLimiter
+
+
+@pytest.fixture
+def async_es(mock_es):
+    """Async Elasticsearch client returning the same canned responses as mock_es."""
+    es = MagicMock()
+    es.search = AsyncMock(return_value=mock_es.search.return_value)
+    es.index = AsyncMock(return_value={'_id': '1'})
+    es.exists = AsyncMock(return_value=True)
+    es.info = AsyncMock(return_value={})
+    es.open_point_in_time = AsyncMock(return_value={"id": "pit-1"})
+    es.close_point_in_time = AsyncMock(return_value={})
+    es.bulk = AsyncMock(return_value={"errors": False, "items": []})
+    es.delete_by_query = AsyncMock(return_value={})
+    return es
+
+
+def run(es, scenario):
+    """Run ``scenario(client)`` against the async app."""
+    async def main():
+        async with TestClient(TestServer(async_app.create_app(es))) as client:
+            return await scenario(client)
+    return asyncio.run(main())
+
+
+def test_health_check(async_es):
+    async def scenario(client):
+        response = await client.get('/health')
+        assert response.status == 200
+        assert await response.text() == 'OK'
+    run(async_es, scenario)
+
+
+def test_health_check_unhealthy(async_es):
+    async_es.info.side_effect = Exception("Connection failed")
+
+    async def scenario(client):
+        response = await client.get('/health')
+        assert response.status == 500
+        assert "error" in await response.json()
+    run(async_es, scenario)
+
+
+def test_readiness_probes(async_es, monkeypatch):
+    """Probes answer from the shared cached state without calling Elasticsearch."""
+    state = HealthState()
+    monkeypatch.setattr("app.health_state", state)
+
+    async def scenario(client):
+        assert (await client.get('/livez')).status == 200
+        assert (await client.get('/readyz')).status == 503
+        state.record_check(True)
+        state.mark_loaded()
+        response = await client.get('/readyz')
+        assert response.status == 200
+        assert (await response.json())["phase"] == "ready"
+    run(async_es, scenario)
+    async_es.info.assert_not_called()
+
+
+def test_saturated_server_sheds_requests(async_es, monkeypatch):
+    limiter = ConcurrencyLimiter(limit=1)
+    limiter.try_acquire()
+    monkeypatch.setattr("app.request_limiter", limiter)
+
+    async def scenario(client):
+        response = await client.get('/search?q=Einstein')
+        assert response.status == 503
+        assert response.headers["Retry-After"] == "1"
+        assert (await client.get('/livez')).status == 200
+    run(async_es, scenario)
+    async_es.search.assert_not_called()
+
+
+def test_search_matches_sync_app(async_es, client, mock_es):
+    """The async app returns byte-for-byte the same search response."""
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        expected = client.get('/search?q=Einstein&include=laureates.surname&size=5').data
+    async_app.search_cache.clear()
+
+    async def scenario(client):
+        response = await client.get('/search?q=Einstein&include=laureates.surname&size=5')
+        assert response.status == 200
+        assert await response.read() == expected
+        assert async_es.search.call_args.kwargs["body"] == mock_es.search.call_args.kwargs["body"]
+    run(async_es, scenario)
+
+
+def test_search_validation(async_es):
+    async def scenario(client):
+        assert (await client.get('/search?q=Einstein&page=0')).status == 400
+        assert (await client.get('/search?q=Einstein&size=0')).status == 400
+        assert (await client.get('/search')).status == 400
+    run(async_es, scenario)
+
+
+def test_cursor_search_closes_point_in_time(async_es):
+    async def scenario(client):
+        data = await (await client.get('/search?q=Einstein&cursor=*')).json()
+        assert data["next_cursor"] is None
+        async_es.close_point_in_time.assert_awaited_once_with(body={"id": "pit-1"})
+    run(async_es, scenario)
+
+
+def test_add_and_update_prize(async_es, sample_prize):
+    async def scenario(client):
+        response = await client.post('/prize', json=sample_prize)
+        assert response.status == 201
+        assert (await response.json())["id"] == "1921_physics"
+        assert async_es.index.call_args.kwargs["op_type"] == "create"
+        response = await client.put('/prize/1921/physics', json=sample_prize)
+        assert response.status == 200
+        assert (await response.json())["message"] == "Prize updated successfully"
+
+        async_es.exists.return_value = False
+        response = await client.put('/prize/1921/physics', json=sample_prize)
+        assert response.status == 404
+
+        response = await client.post('/prize', json={"year": "invalid", "category": "physics"})
+        assert response.status == 400
+    run(async_es, scenario)
+
+
+def test_writes_fail_fast_while_circuit_is_open(async_es, sample_prize):
+    async_es.index.side_effect = CircuitOpenError(4.2)
+    async_es.exists.side_effect = CircuitOpenError(4.2)
+
+    async def scenario(client):
+        for response in (await client.post('/prize', json=sample_prize),
+                         await client.put('/prize/1921/physics', json=sample_prize)):
+            assert response.status == 503
+            assert response.headers["Retry-After"] == "5"
+    run(async_es, scenario)
+
+
+def test_metrics_endpoint(async_es):
+    async def scenario(client):
+        await client.get('/search?q=Einstein')
+        response = await client.get('/metrics')
+        assert response.status == 200
+        text = await response.text()
+        assert 'http_request_duration_seconds_count{route="/search",method="GET"' in text
+        assert 'search_stage_duration_seconds_count{stage="serialize"}' in text
+    run(async_es, scenario)
+
+
+def test_suggest(async_es):
+    async_es.search.return_value = {"suggest": {
+        "names": [{"options": [{"text": "Albert Einstein", "_source": {}}]}],
+        "categories": [{"options": []}]
+    }}
+
+    async def scenario(client):
+        response = await client.get('/suggest?prefix=alb')
+        assert response.status == 200
+        assert (await response.json())["names"] == ["Albert Einstein"]
+    run(async_es, scenario)
+
+
+def test_profile_requires_admin(async_es, monkeypatch):
+    monkeypatch.setattr("profiling.ADMIN_TOKEN", "secret")
+    async_es.search.return_value = {**async_es.search.return_value, "profile": {"shards": []}}
+
+    async def scenario(client):
+        denied = await client.get('/search?q=Einstein&profile=true')
+        assert denied.status == 403
+        response = await client.get('/search?q=Einstein&profile=true', headers={"X-Admin-Token": "secret"})
+        assert response.status == 200
+        assert (await response.json())["profile"] == {"shards": [], "slowest": []}
+        assert async_es.search.call_args.kwargs["body"]["profile"] is True
+    run(async_es, scenario)
+
+
+def test_get_prize_is_cached(async_es, sample_prize):
+    async_es.get = AsyncMock(return_value={"_id": "1921_physics", "found": True, "_source": sample_prize})
+
+    async def scenario(client):
+        first = await client.get('/prize/1921/physics')
+        second = await client.get('/prize/1921/physics')
+        assert (first.headers["X-Cache"], second.headers["X-Cache"]) == ("MISS", "HIT")
+        assert (await second.json())["year"] == sample_prize["year"]
+    run(async_es, scenario)
+    async_es.get.assert_called_once()
@@ -0,0 +1,70 @@
+from unittest.mock import patch
+
+
+def test_batch_search_uses_one_msearch(client, mock_es):
+    """All queries go to Elasticsearch in a single msearch call, answered in order."""
+    hit_response = mock_es.search.return_value
+    mock_es.msearch.return_value = {"responses": [
+        hit_response,
+        {"error": {"type": "search_phase_execution_exception"}, "status": 503},
+    ]}
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        response = client.post('/search/_batch', json={"queries": [
+            {"q": "Einstein"},
+            {"q": "Bohr", "include": ["laureates.surname"], "size": 5},
+            {"q": "physics", "page": 0},
+        ]})
+
+    assert response.status_code == 200
+    data = response.get_json()["responses"]
+    assert len(data) == 3
+    assert data[0]["total"] == 1
+    assert data[0]["results"][0]["year"] == "1921"
+    assert data[1]["status"] == 503
+    assert data[2]["status"] == 400
+    mock_es.search.assert_not_called()
+    mock_es.msearch.assert_called_once()
+
+    body = mock_es.msearch.call_args.kwargs["body"]
+    assert body[0] == {"index": "nobel_prizes"}
+    assert body[3]["size"] == 5
+
+
+def test_batch_search_shares_search_cache(client, mock_es):
+    """Cached searches are answered without being sent to msearch."""
+    mock_es.msearch.return_value = {"responses": [mock_es.search.return_value]}
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        single = client.get('/search?q=Einstein')
+        response = client.post('/search/_batch', json={"queries": [{"q": "Einstein"}, {"q": "Curie"}]})
+
+    data = response.get_json()["responses"]
+    assert data[0] == single.get_json()
+    assert len(mock_es.msearch.call_args.kwargs["body"]) == 2
+
+
+def test_batch_search_validation(client, mock_es):
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        assert client.post('/search/_batch', json={"queries": []}).status_code == 400
+        assert client.post('/search/_batch', json={}).status_code == 400
+        response = client.post('/search/_batch', json={"queries": [{"q": "x", "cursor": "*"}]})
+        assert response.get_json()["responses"][0]["status"] == 400
+
+
+def test_batch_search_null_sort_uses_defaults(client, mock_es):
+    mock_es.msearch.return_value = {"responses": [mock_es.search.return_value] * 2}
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        response = client.post('/search/_batch', json={"queries": [
+            {"q": "Einstein", "sort_by": None},
+            {"q": "Curie", "sort_order": None},
+        ]})
+
+    assert response.status_code == 200
+    assert [item["total"] for item in response.get_json()["responses"]] == [1, 1]
+
+
+def test_batch_search_rejects_non_object_body(client, mock_es):
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        response = client.post('/search/_batch', json=[{"q": "x"}])
+
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Invalid batch request"
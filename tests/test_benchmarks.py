@@ -0,0 +1,54 @@
+from elasticsearch import Elasticsearch
+
+from benchmarks.fake_es import FakeElasticsearch, synthetic_prizes
+from benchmarks.report import compare, percentile, summarize
+from benchmarks.scale_dataset import scaled_prizes, write_dataset
+from ingest import bulk_ingest, iter_json_array, iter_source_chunks, prize_id
+
+
+def test_fake_elasticsearch_serves_the_client():
+    """The real client can search and bulk load against the fake cluster."""
+    with FakeElasticsearch(synthetic_prizes(50)) as fake:
+        es = Elasticsearch(fake.url)
+        results = es.search(index="nobel_prizes", body={"size": 5, "from": 10})
+        assert results["hits"]["total"]["value"] == 50
+        assert [hit["_id"] for hit in results["hits"]["hits"]] == ["10", "11", "12", "13", "14"]
+
+        summary = bulk_ingest(es, synthetic_prizes(120), index="nobel_prizes", max_docs=50)
+        assert summary.indexed == 120
+        assert summary.batches == 3
+
+
+def test_synthetic_prizes_are_deterministic():
+    assert synthetic_prizes(20, seed=3) == synthetic_prizes(20, seed=3)
+
+
+def test_scaled_prizes_keep_ids_unique(tmp_path, sample_prizes):
+    """Past the years that fit, copies move to suffixed categories instead of overwriting prizes."""
+    prizes = list(scaled_prizes(sample_prizes, 150))
+    ids = {prize_id(prize) for prize in prizes}
+    laureate_ids = {l["id"] for prize in prizes for l in prize["laureates"]}
+
+    assert prizes[:2] == sample_prizes
+    assert len(ids) == len(prizes) == 300
+    assert len(laureate_ids) == 300
+    assert all(1000 <= int(prize["year"]) <= 9999 for prize in prizes)
+
+    path = str(tmp_path / "scaled.json")
+    assert write_dataset(iter(prizes), path) == 300
+    assert list(iter_json_array(iter_source_chunks(path))) == prizes
+
+
+def test_summarize_percentiles():
+    stats = summarize([i / 1000 for i in range(1, 101)], elapsed=2.0)
+    assert stats["throughput_per_s"] == 50
+    assert (stats["p50_ms"], stats["p95_ms"], stats["p99_ms"]) == (50, 95, 99)
+    assert percentile([], 50) == 0.0
+
+
+def test_compare_flags_slower_runs():
+    """Higher latency and lower throughput both count as negative change."""
+    base = {"load": {"search": {"p50_ms": 10.0, "throughput_per_s": 100.0}}}
+    head = {"load": {"search": {"p50_ms": 12.0, "throughput_per_s": 80.0}}}
+    changes = {row["metric"]: round(row["change"], 2) for row in compare(base, head)}
+    assert changes == {"p50_ms": -0.2, "throughput_per_s": -0.2}
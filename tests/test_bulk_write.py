@@ -0,0 +1,105 @@
+import json
+from unittest.mock import patch
+
+
+def _ndjson(*records):
+    return "\n".join(r if isinstance(r, str) else json.dumps(r) for r in records) + "\n"
+
+
+def _bulk_indices(body):
+    lines = body.decode("utf-8").splitlines()
+    return {next(iter(json.loads(line).values()))["_index"] for line in lines[::2]}
+
+
+def _echo_bulk(statuses):
+    """Bulk side effect answering each item with the next status."""
+    statuses = iter(statuses)
+
+    def bulk(body, refresh=False):
+        lines = body.decode("utf-8").splitlines()
+        if _bulk_indices(body) == {"nobel_laureates"}:
+            return {"errors": False, "items": [{"index": {"status": 201}} for _ in lines[::2]]}
+        items = []
+        for action_line in lines[::2]:
+            op, meta = next(iter(json.loads(action_line).items()))
+            status = next(statuses)
+            result = {"_id": meta["_id"], "status": status}
+            if status < 300:
+                result["result"] = "created" if status == 201 else "updated"
+            else:
+                result["error"] = {"type": "version_conflict_engine_exception"}
+            items.append({op: result})
+        return {"items": items}
+    return bulk
+
+
+def test_bulk_write_reports_every_record(client, mock_es, sample_prizes):
+    """Valid records are written in one bulk call, invalid ones are reported by line."""
+    mock_es.bulk.side_effect = _echo_bulk([201, 200])
+    body = _ndjson(sample_prizes[0], "{not json", {"year": "19x", "category": "physics", "laureates": []},
+                   sample_prizes[1])
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        response = client.post('/prizes/_bulk?refresh=true', data=body, content_type="application/x-ndjson")
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["total"] == 4
+    assert data["succeeded"] == 2
+    assert [item["line"] for item in data["results"]] == [1, 2, 3, 4]
+    assert data["results"][0]["id"] == "1921_physics"
+    assert data["results"][0]["result"] == "created"
+    assert data["results"][1]["status"] == 400
+    assert data["results"][2]["status"] == 400
+    assert data["results"][3]["result"] == "updated"
+    # One bulk call for the prizes, then one mirroring the written ones into the laureate index
+    indices = [_bulk_indices(call.kwargs["body"]) for call in mock_es.bulk.call_args_list]
+    assert indices == [{"nobel_prizes"}, {"nobel_laureates"}]
+    mock_es.exists.assert_not_called()
+    mock_es.indices.refresh.assert_called_once_with(index="nobel_prizes")
+
+
+def test_bulk_create_folds_existence_check_into_write(client, mock_es, sample_prize):
+    """op_type=create sends create actions and reports conflicts per record."""
+    mock_es.bulk.side_effect = _echo_bulk([409])
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        response = client.post('/prizes/_bulk?op_type=create', data=_ndjson(sample_prize))
+
+    item = response.get_json()["results"][0]
+    assert item["status"] == 409
+    assert "version_conflict" in item["error"]
+    action = json.loads(mock_es.bulk.call_args.kwargs["body"].decode("utf-8").splitlines()[0])
+    assert action == {"create": {"_index": "nobel_prizes", "_id": "1921_physics"}}
+
+
+def test_bulk_update_uses_partial_doc(client, mock_es, sample_prize):
+    mock_es.bulk.side_effect = _echo_bulk([200])
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        client.post('/prizes/_bulk?op_type=update&refresh=wait_for', data=_ndjson(sample_prize))
+
+    prize_call = mock_es.bulk.call_args_list[0]
+    lines = prize_call.kwargs["body"].decode("utf-8").splitlines()
+    assert "update" in json.loads(lines[0])
+    assert json.loads(lines[1])["doc"]["year"] == "1921"
+    assert prize_call.kwargs["refresh"] == "wait_for"
+
+
+def test_bulk_write_validation(client, mock_es):
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        assert client.post('/prizes/_bulk?op_type=delete', data="").status_code == 400
+        assert client.post('/prizes/_bulk?refresh=sometimes', data="").status_code == 400
+
+
+def test_bulk_write_syncs_laureate_index(client, mock_es, sample_prizes):
+    """Written prizes reach laureate-mode search; rejected ones leave their laureates alone."""
+    mock_es.bulk.side_effect = _echo_bulk([201, 409])
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        client.post('/prizes/_bulk?op_type=create', data=_ndjson(*sample_prizes))
+        search = client.get('/search?q=Einstein&mode=laureate')
+
+    assert search.status_code == 200
+    assert mock_es.search.call_args.kwargs["index"] == "nobel_laureates"
+    delete = mock_es.delete_by_query.call_args.kwargs
+    assert delete["index"] == "nobel_laureates"
+    assert delete["body"] == {"query": {"terms": {"prize_id": ["1921_physics"]}}}
+    laureate_bulk = mock_es.bulk.call_args_list[1].kwargs["body"].decode("utf-8").splitlines()
+    assert [json.loads(line)["index"]["_id"] for line in laureate_bulk[::2]] == ["1921_physics_12"]
@@ -0,0 +1,61 @@
+import time
+from unittest.mock import patch
+
+from cache import LRUCache
+
+
+def test_lru_evicts_by_bytes():
+    """The least recently used entry is evicted once the byte limit is hit."""
+    cache = LRUCache(max_entries=10, max_bytes=10, ttl=60)
+    cache.put("a", b"12345")
+    cache.put("b", b"12345")
+    cache.get("a")
+    cache.put("c", b"12345")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"12345"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl():
+    """Expired entries count as misses."""
+    cache = LRUCache(ttl=0.01)
+    cache.put("a", b"x")
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert cache.misses == 1
+
+
+def test_put_after_clear_is_dropped():
+    """Results computed before an invalidation are not stored."""
+    cache = LRUCache()
+    generation = cache.generation
+    cache.clear()
+    assert not cache.put("a", b"x", generation=generation)
+    assert cache.get("a") is None
+
+
+def test_repeated_search_is_served_from_cache(client, mock_es):
+    """Equivalent searches hit Elasticsearch once."""
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        before = client.get('/cache/stats').get_json()
+        first = client.get('/search?q=Einstein')
+        second = client.get('/search?q=%20einstein%20')
+        assert first.headers["X-Cache"] == "MISS"
+        assert second.headers["X-Cache"] == "HIT"
+        assert first.data == second.data
+        assert mock_es.search.call_count == 1
+
+        stats = client.get('/cache/stats').get_json()
+        assert stats["hits"] - before["hits"] == 1
+        assert stats["misses"] - before["misses"] == 1
+
+
+def test_write_invalidates_search_cache(client, mock_es, sample_prize):
+    """Adding or updating a prize drops cached searches."""
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        client.get('/search?q=Einstein')
+        client.post('/prize', json=sample_prize)
+        client.get('/search?q=Einstein')
+        client.put('/prize/1921/physics', json=sample_prize)
+        client.get('/search?q=Einstein')
+        assert mock_es.search.call_count == 3
@@ -0,0 +1,71 @@
+from unittest.mock import patch
+
+from memory_search import MemorySearchIndex
+from models import SearchCursor
+
+
+def _prizes(count):
+    for i in range(count):
+        year = str(1901 + i)
+        yield f"{year}_physics", {
+            "year": year,
+            "category": "physics",
+            "laureates": [{"id": str(i), "firstname": "Ann", "surname": f"Smith{i}"}]
+        }
+
+
+def test_cursor_walks_every_result_once(client):
+    """Following next_cursor returns each hit exactly once, in the same order as paging."""
+    index = MemorySearchIndex(_prizes(25))
+    with patch('app.SEARCH_BACKEND', 'memory'), patch('app.memory_index', index):
+        seen = []
+        cursor = "*"
+        while cursor:
+            data = client.get(f'/search?q=physics&size=10&sort_by=year&sort_order=asc&cursor={cursor}').get_json()
+            seen.extend(prize["year"] for prize in data["results"])
+            cursor = data["next_cursor"]
+
+        paged = []
+        for page in (1, 2, 3):
+            data = client.get(f'/search?q=physics&size=10&sort_by=year&sort_order=asc&page={page}').get_json()
+            assert data["next_cursor"] is None
+            paged.extend(prize["year"] for prize in data["results"])
+
+    assert seen == paged
+    assert len(set(seen)) == 25
+
+
+def test_cursor_is_pinned_to_point_in_time(client, mock_es):
+    """The first cursor page opens a point-in-time and the cursor carries search_after."""
+    mock_es.open_point_in_time.return_value = {"id": "pit-1"}
+    hit = mock_es.search.return_value["hits"]["hits"][0]
+    hit["sort"] = [1.0, 7]
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        data = client.get('/search?q=Einstein&size=1&cursor=*').get_json()
+        body = mock_es.search.call_args.kwargs["body"]
+        assert body["pit"]["id"] == "pit-1"
+        assert "from" not in body
+
+        cursor = SearchCursor.decode(data["next_cursor"])
+        assert cursor.search_after == [1.0, 7]
+        assert cursor.pit_id == "pit-1"
+
+        client.get(f'/search?q=Einstein&size=1&cursor={data["next_cursor"]}')
+        body = mock_es.search.call_args.kwargs["body"]
+        assert body["search_after"] == [1.0, 7]
+        mock_es.open_point_in_time.assert_called_once()
+
+
+def test_last_cursor_page_closes_point_in_time(client, mock_es):
+    mock_es.open_point_in_time.return_value = {"id": "pit-1"}
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        data = client.get('/search?q=Einstein&size=10&cursor=*').get_json()
+        assert data["next_cursor"] is None
+        mock_es.close_point_in_time.assert_called_once_with(body={"id": "pit-1"})
+
+
+def test_cursor_from_another_search_is_rejected(client, mock_es):
+    cursor = SearchCursor(search_after=[1.0], shape="not-this-search").encode()
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        assert client.get(f'/search?q=Einstein&cursor={cursor}').status_code == 400
+        assert client.get('/search?q=Einstein&cursor=garbage').status_code == 400
@@ -0,0 +1,114 @@
+import copy
+import json
+from unittest.mock import patch
+
+import pytest
+from elasticsearch.exceptions import ConflictError, NotFoundError
+
+import app as flask_app
+
+
+@pytest.fixture
+def doc_es(mock_es, sample_prizes):
+    docs = {f"{p['year']}_{p['category']}": p for p in sample_prizes}
+
+    def get(index, id, **kwargs):
+        if id not in docs:
+            raise NotFoundError(404, "not_found", {"found": False})
+        return {"_id": id, "found": True, "_source": copy.deepcopy(docs[id])}
+
+    def mget(index, body, **kwargs):
+        return {"docs": [
+            {"_id": id, "found": True, "_source": copy.deepcopy(docs[id])} if id in docs else {"_id": id, "found": False}
+            for id in body["ids"]
+        ]}
+
+    mock_es.get.side_effect = get
+    mock_es.mget.side_effect = mget
+    return mock_es
+
+
+def test_get_prize_is_read_through(client, doc_es):
+    with patch('app.get_elasticsearch', return_value=doc_es):
+        first = client.get('/prize/1921/physics')
+        second = client.get('/prize/1921/physics')
+
+    assert first.status_code == 200
+    assert (first.headers["X-Cache"], second.headers["X-Cache"]) == ("MISS", "HIT")
+    assert second.get_json()["laureates"][0]["surname"] == "Einstein"
+    assert first.data == second.data
+    doc_es.get.assert_called_once()
+
+
+def test_get_missing_prize(client, doc_es):
+    with patch('app.get_elasticsearch', return_value=doc_es):
+        response = client.get('/prize/1800/physics')
+
+    assert response.status_code == 404
+    assert flask_app.document_cache.stats()["entries"] == 0
+
+
+def test_update_skips_exists_and_invalidates(client, doc_es, test_prize):
+    """A cached prize is known to exist; after the update the next read goes back to Elasticsearch."""
+    with patch('app.get_elasticsearch', return_value=doc_es):
+        client.get('/prize/1921/physics')
+        response = client.put('/prize/1921/physics', json=test_prize)
+        assert response.status_code == 200
+        assert client.get('/prize/1921/physics').headers["X-Cache"] == "MISS"
+
+    doc_es.exists.assert_not_called()
+    assert doc_es.get.call_count == 2
+
+
+def test_read_racing_a_write_is_not_cached(client, doc_es):
+    get = doc_es.get.side_effect
+
+    def get_then_write(**kwargs):
+        result = get(**kwargs)
+        flask_app.document_cache.invalidate(kwargs["id"])
+        return result
+
+    doc_es.get.side_effect = get_then_write
+    with patch('app.get_elasticsearch', return_value=doc_es):
+        assert client.get('/prize/1921/physics').status_code == 200
+
+    assert flask_app.document_cache.stats()["entries"] == 0
+
+
+def test_mget_fetches_only_uncached_ids(client, doc_es):
+    with patch('app.get_elasticsearch', return_value=doc_es):
+        client.get('/prize/1921/physics')
+        response = client.post('/prizes/_mget', json={"ids": ["1922_chemistry", "1921_physics", "1800_peace"]})
+
+    assert response.status_code == 200
+    docs = json.loads(response.data)["docs"]
+    assert [(doc["id"], doc["found"]) for doc in docs] == [
+        ("1922_chemistry", True), ("1921_physics", True), ("1800_peace", False)
+    ]
+    assert docs[1]["prize"]["year"] == "1921"
+    doc_es.mget.assert_called_once()
+    assert doc_es.mget.call_args.kwargs["body"] == {"ids": ["1922_chemistry", "1800_peace"]}
+
+
+def test_mget_validation(client):
+    assert client.post('/prizes/_mget', json={"ids": []}).status_code == 400
+    assert client.post('/prizes/_mget', data="nope").status_code == 400
+    response = client.post('/prizes/_mget', json=["1921_physics"])
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Invalid mget request"
+
+
+def test_added_prize_is_found_by_year_and_category(client, doc_es, sample_prize):
+    """POST /prize creates the <year>_<category> document that GET /prize reads; a second POST conflicts."""
+    with patch('app.get_elasticsearch', return_value=doc_es):
+        client.get('/prize/1921/physics')
+        created = client.post('/prize', json=sample_prize)
+        doc_es.index.side_effect = ConflictError(409, "version_conflict_engine_exception", {})
+        duplicate = client.post('/prize', json=sample_prize)
+
+    assert created.status_code == 201
+    assert created.get_json()["id"] == "1921_physics"
+    index = doc_es.index.call_args.kwargs
+    assert (index["id"], index["op_type"]) == ("1921_physics", "create")
+    assert flask_app.document_cache.get("1921_physics") is None
+    assert duplicate.status_code == 409
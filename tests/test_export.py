@@ -0,0 +1,86 @@
+import gzip
+import json
+from unittest.mock import patch
+
+import pytest
+
+from memory_search import MemorySearchIndex
+
+
+def _hit(year, category="physics"):
+    return {"_id": f"{year}_{category}", "_score": 1.0, "sort": [1.0, year],
+            "_source": {"year": str(year), "category": category, "laureates": []}}
+
+
+def _page(*years):
+    return {"pit_id": "pit-1", "hits": {"total": {"value": 0}, "hits": [_hit(year) for year in years]}}
+
+
+@pytest.fixture
+def paged_es(mock_es, monkeypatch):
+    """Two full pages of two prizes and a last page of one"""
+    monkeypatch.setattr("app.EXPORT_BATCH_SIZE", 2)
+    mock_es.open_point_in_time.return_value = {"id": "pit-1"}
+    mock_es.search.side_effect = [_page(1901, 1902), _page(1903, 1904), _page(1905)]
+    return mock_es
+
+
+def _lines(data):
+    return [json.loads(line) for line in data.decode("utf-8").splitlines()]
+
+
+def test_export_streams_every_page(client, paged_es):
+    with patch('app.get_elasticsearch', return_value=paged_es):
+        response = client.get('/export?q=physics&size=100')
+        prizes = _lines(response.data)
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert [prize["year"] for prize in prizes] == ["1901", "1902", "1903", "1904", "1905"]
+    bodies = [call.kwargs["body"] for call in paged_es.search.call_args_list]
+    assert bodies[0]["size"] == 2
+    assert "from" not in bodies[0]
+    assert bodies[2]["search_after"] == [1.0, 1904]
+    paged_es.close_point_in_time.assert_called_once_with(body={"id": "pit-1"})
+
+
+def test_export_gzip(client, paged_es):
+    with patch('app.get_elasticsearch', return_value=paged_es):
+        response = client.get('/export?q=physics', headers={"Accept-Encoding": "gzip"})
+        data = response.data
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert len(_lines(gzip.decompress(data))) == 5
+
+
+def test_disconnect_closes_point_in_time(client, paged_es):
+    """Closing the response early stops paging and frees the point-in-time."""
+    with patch('app.get_elasticsearch', return_value=paged_es):
+        response = client.get('/export?q=physics', buffered=False)
+        first = next(iter(response.response))
+        response.close()
+
+    assert len(_lines(first)) == 2
+    assert paged_es.search.call_count == 1
+    paged_es.close_point_in_time.assert_called_once()
+
+
+def test_export_unavailable_before_streaming(client, mock_es):
+    mock_es.open_point_in_time.side_effect = Exception("boom")
+
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        response = client.get('/export?q=physics')
+
+    assert response.status_code == 500
+    assert client.get('/export?q=Curie&mode=laureate').status_code == 400
+
+
+def test_export_with_memory_backend(client, sample_prizes, monkeypatch):
+    monkeypatch.setattr("app.EXPORT_BATCH_SIZE", 1)
+    index = MemorySearchIndex((f"{p['year']}_{p['category']}", p) for p in sample_prizes)
+
+    with patch('app.SEARCH_BACKEND', 'memory'), patch('app.memory_index', index):
+        response = client.get('/export?q=1921+1922&include=year&fields=year')
+        prizes = _lines(response.data)
+
+    assert [prize["year"] for prize in prizes] == ["1921", "1922"]
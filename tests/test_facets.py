@@ -0,0 +1,75 @@
+from unittest.mock import patch
+
+import app as flask_app
+from memory_search import MemorySearchIndex
+from models import FacetParams
+
+FACET_RESPONSE = {
+    "took": 2,
+    "hits": {"total": {"value": 2, "relation": "eq"}, "hits": []},
+    "aggregations": {
+        "categories": {"buckets": [
+            {"key": "chemistry", "doc_count": 1, "laureates": {"doc_count": 1}},
+            {"key": "physics", "doc_count": 1, "laureates": {"doc_count": 1}},
+        ]},
+        "decades": {"buckets": [{"key": 1920.0, "doc_count": 2, "laureates": {"doc_count": 2}}]},
+        "laureates": {"doc_count": 2}
+    }
+}
+
+
+def test_facet_query_is_aggregation_only():
+    query = flask_app.build_facet_query(FacetParams(year_from=1950))
+    assert query["size"] == 0
+    assert query["query"] == {"bool": {"filter": [{"range": {"year": {"gte": 1950}}}]}}
+    assert query["aggs"]["categories"]["terms"]["field"] == "category.keyword"
+    assert query["aggs"]["decades"]["histogram"]["interval"] == 10
+
+
+def test_facet_query_reuses_search_filter():
+    """With q, facets count exactly the prizes /search would match."""
+    params = FacetParams(q="Einstein", include=["laureates.surname"])
+    assert flask_app.build_facet_query(params)["query"] == \
+        flask_app.build_search_query(params.search_params())["query"]
+
+
+def test_facets_endpoint_is_cached(client, mock_es):
+    mock_es.search.return_value = FACET_RESPONSE
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        first = client.get('/facets?q=Physics')
+        second = client.get('/facets?q=%20physics')
+
+    assert first.status_code == 200
+    assert first.get_json() == {
+        "total": 2,
+        "laureates": 2,
+        "categories": [{"category": "chemistry", "prizes": 1, "laureates": 1},
+                       {"category": "physics", "prizes": 1, "laureates": 1}],
+        "decades": [{"decade": 1920, "prizes": 2, "laureates": 2}]
+    }
+    assert second.headers["X-Cache"] == "HIT"
+    assert mock_es.search.call_count == 1
+    assert mock_es.search.call_args.kwargs["request_cache"] is True
+
+
+def test_write_invalidates_facets(client, mock_es, sample_prize):
+    mock_es.search.return_value = FACET_RESPONSE
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        client.get('/facets')
+        client.post('/prize', json=sample_prize)
+        assert client.get('/facets').headers["X-Cache"] == "MISS"
+
+
+def test_memory_facets_match_elasticsearch_shape(client, sample_prizes):
+    index = MemorySearchIndex((f"{p['year']}_{p['category']}", p) for p in sample_prizes)
+    with patch('app.SEARCH_BACKEND', 'memory'), patch('app.memory_index', index):
+        all_prizes = client.get('/facets').get_json()
+        searched = client.get('/facets?q=Bohr').get_json()
+
+    assert all_prizes["total"] == 2
+    assert all_prizes["decades"] == [{"decade": 1920, "prizes": 2, "laureates": 2}]
+    assert searched["categories"] == [{"category": "chemistry", "prizes": 1, "laureates": 1}]
+
+
+def test_facets_validation(client):
+    assert client.get('/facets?include=bogus').status_code == 400
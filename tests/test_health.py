@@ -0,0 +1,97 @@
+from itertools import islice, repeat
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import app as flask_app
+from health import HealthState, StartupPipeline, backoff_delays
+
+
+@pytest.fixture
+def health_state(monkeypatch):
+    state = HealthState()
+    monkeypatch.setattr("app.health_state", state)
+    return state
+
+
+def _no_wait():
+    return repeat(0.0)
+
+
+def test_backoff_delays_grow_and_cap():
+    delays = list(islice(backoff_delays(initial=1, maximum=5), 5))
+
+    assert 0.9 <= delays[0] <= 1
+    assert 1.8 <= delays[1] <= 2
+    assert all(4.5 <= delay <= 5 for delay in delays[3:])
+
+
+def test_pipeline_retries_until_ready(health_state):
+    """Connection failures are retried; the state turns ready once the data is loaded."""
+    connect = MagicMock(side_effect=[Exception("refused"), Exception("refused"), None])
+    load = MagicMock()
+
+    StartupPipeline(health_state, load, connect=connect, delays=_no_wait).run()
+
+    assert connect.call_count == 3
+    load.assert_called_once()
+    assert health_state.ready
+    assert health_state.snapshot()["last_error"] == "refused"
+
+
+def test_pipeline_stops_while_backing_off(health_state):
+    pipeline = StartupPipeline(health_state, MagicMock(), connect=MagicMock(side_effect=Exception("refused")))
+    pipeline.stop_event.set()
+
+    pipeline.run()
+
+    assert health_state.phase == "stopped"
+    assert not health_state.ready
+
+
+def test_failed_check_marks_not_ready(health_state):
+    check = MagicMock(side_effect=Exception("timed out"))
+    pipeline = StartupPipeline(health_state, MagicMock(), connect=MagicMock(), check=check)
+
+    pipeline._connect()
+    health_state.mark_loaded()
+    assert health_state.ready
+    pipeline._check()
+
+    assert not health_state.ready
+    assert health_state.snapshot()["elasticsearch"]["ok"] is False
+
+
+def test_probes_never_call_elasticsearch(client, mock_es, health_state):
+    """/livez always answers; /readyz reflects the cached state only."""
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        assert client.get('/livez').status_code == 200
+        response = client.get('/readyz')
+        assert response.status_code == 503
+        assert response.get_json()["phase"] == "starting"
+
+        health_state.record_check(True)
+        health_state.mark_loaded()
+        response = client.get('/readyz')
+        assert response.status_code == 200
+        assert response.get_json()["data_loaded"] is True
+
+    mock_es.info.assert_not_called()
+
+
+def test_memory_backend_ready_without_elasticsearch():
+    state = HealthState(require_elasticsearch=False)
+    StartupPipeline(state, MagicMock(), delays=_no_wait).run()
+
+    assert state.ready
+
+
+def test_load_initial_data_reloads_in_background_when_alias_exists(mock_es, monkeypatch):
+    """An existing generation is served right away while the reload runs."""
+    monkeypatch.setattr(flask_app, "es", mock_es)
+    with patch('app.get_alias_indices', return_value=["nobel_prizes_v1"]), \
+            patch('app.reindex_in_background') as background, patch('app.reindex') as reindex:
+        flask_app.load_initial_data()
+
+    background.assert_called_once_with(mock_es)
+    reindex.assert_not_called()
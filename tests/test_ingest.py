@@ -0,0 +1,123 @@
+import json
+from unittest.mock import MagicMock, call, patch
+
+import pytest
+
+import app as flask_app
+from ingest import (
+    BULK_LOAD_SETTINGS, FETCH_TIMEOUT, bulk_ingest, iter_bulk_batches, iter_json_array, iter_source_chunks,
+    prize_payloads
+)
+
+
+def _chunks(text, size):
+    return (text[i:i + size] for i in range(0, len(text), size))
+
+
+def _ok_bulk(body, refresh=False):
+    lines = body.decode("utf-8").splitlines()
+    return {"items": [{"index": {"status": 201}} for _ in lines[::2]]}
+
+
+def test_iter_json_array_across_small_chunks(sample_prizes):
+    """Prizes are parsed incrementally even when split across chunks."""
+    text = json.dumps({"prizes": sample_prizes})
+    assert list(iter_json_array(_chunks(text, 7))) == sample_prizes
+
+
+def test_iter_json_array_top_level_list(sample_prizes):
+    """A bare JSON array is accepted as input."""
+    assert list(iter_json_array(_chunks(json.dumps(sample_prizes), 3))) == sample_prizes
+
+
+def test_source_download_has_a_timeout():
+    """A stalled source fails the load instead of hanging it."""
+    with patch('ingest.requests.get') as get:
+        get.return_value.iter_content.return_value = [b'{"prizes": []}']
+        list(iter_source_chunks("https://api.nobelprize.org/v1/prize.json"))
+
+    assert get.call_args.kwargs["timeout"] == FETCH_TIMEOUT
+
+
+def test_iter_bulk_batches_respects_byte_limit(sample_prizes):
+    """Batches are split once the serialized payload would exceed the limit."""
+    payloads = prize_payloads(sample_prizes * 3, "nobel_prizes")
+    batches = list(iter_bulk_batches(payloads, max_bytes=400))
+    assert sum(len(b) for b in batches) == 6
+    assert len(batches) > 1
+    for batch in batches:
+        assert len(batch) == 1 or sum(len(p) for _, p in batch) <= 400
+
+
+def test_bulk_ingest_retries_throttled_items(sample_prizes):
+    """Items rejected with 429 are retried, permanent errors are reported."""
+    es = MagicMock()
+    es.bulk.side_effect = [
+        {"items": [
+            {"index": {"status": 429, "error": {"type": "es_rejected_execution_exception"}}},
+            {"index": {"status": 400, "error": {"type": "mapper_parsing_exception"}}},
+        ]},
+        {"items": [{"index": {"status": 201}}]},
+    ]
+    summary = bulk_ingest(es, sample_prizes, "nobel_prizes", workers=1, backoff=0)
+    assert summary.total == 2
+    assert summary.indexed == 1
+    assert summary.retries == 1
+    assert summary.failed == 1
+    assert summary.failures[0].id == "1922_chemistry"
+    assert summary.failures[0].status == 400
+
+
+def test_load_nobel_data_from_file(tmp_path, mock_es, sample_prizes):
+    """Loading from a local file streams every prize and returns a summary."""
+    source = tmp_path / "prize.json"
+    source.write_text(json.dumps({"prizes": sample_prizes * 5}))
+    mock_es.bulk.side_effect = _ok_bulk
+
+    summary = flask_app.load_nobel_data(mock_es, source=str(source), max_docs=4)
+
+    assert summary.total == 10
+    assert summary.indexed == 10
+    assert summary.failed == 0
+    assert summary.batches == 3
+    mock_es.indices.refresh.assert_called_once_with(index="nobel_prizes")
+
+
+@pytest.fixture
+def tuned_es(mock_es):
+    mock_es.indices.get_settings.return_value = {
+        "nobel_prizes_v1": {"settings": {"index.number_of_replicas": "1"}},
+        "nobel_laureates_v1": {"settings": {"index.number_of_replicas": "2", "index.refresh_interval": "5s"}},
+    }
+    return mock_es
+
+
+def test_bulk_load_suspends_and_restores_settings(tmp_path, tuned_es, sample_prizes):
+    """Refreshes and replicas are off during the load, then restored; the indices are force-merged."""
+    source = tmp_path / "prize.json"
+    source.write_text(json.dumps({"prizes": sample_prizes}))
+    tuned_es.bulk.side_effect = _ok_bulk
+
+    flask_app.load_nobel_data(tuned_es, source=str(source), index="nobel_prizes_v1",
+                              laureate_index="nobel_laureates_v1", suspend_refresh=True, merge=True)
+
+    assert tuned_es.indices.put_settings.call_args_list == [
+        call(index="nobel_prizes_v1,nobel_laureates_v1", body={"index": BULK_LOAD_SETTINGS}),
+        call(index="nobel_prizes_v1", body={"index": {"refresh_interval": None, "number_of_replicas": "1"}}),
+        call(index="nobel_laureates_v1", body={"index": {"refresh_interval": "5s", "number_of_replicas": "2"}}),
+    ]
+    assert tuned_es.indices.forcemerge.call_args.kwargs["max_num_segments"] == 1
+
+
+def test_failed_load_restores_settings(tmp_path, tuned_es, sample_prizes):
+    source = tmp_path / "prize.json"
+    source.write_text(json.dumps({"prizes": sample_prizes}))
+    tuned_es.indices.put_settings.side_effect = [None, RuntimeError("still gone"), None]
+
+    with patch('app.bulk_ingest', side_effect=RuntimeError("cluster gone")), \
+            pytest.raises(RuntimeError, match="cluster gone"):
+        flask_app.load_nobel_data(tuned_es, source=str(source), index="nobel_prizes_v1", suspend_refresh=True)
+
+    # Both restores were attempted even though the first failed
+    assert tuned_es.indices.put_settings.call_count == 3
+    tuned_es.indices.forcemerge.assert_not_called()
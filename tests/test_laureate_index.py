@@ -0,0 +1,96 @@
+import json
+from unittest.mock import patch
+
+import app as flask_app
+from ingest import laureate_documents, prize_payloads
+from models import FlexibleSearchParams, IngestSummary, SearchMode
+
+
+def _laureate_hit(prize, laureate_index=0, score=2.0):
+    prize_id = f"{prize['year']}_{prize['category']}"
+    return {
+        "_id": f"{prize_id}_{prize['laureates'][laureate_index]['id']}",
+        "_score": score,
+        "_source": {"prize": prize},
+        "fields": {"prize_id": [prize_id]}
+    }
+
+
+def test_laureate_documents_are_flat(sample_prize):
+    docs = laureate_documents("1921_physics", sample_prize)
+    assert [doc_id for doc_id, _ in docs] == ["1921_physics_12"]
+    doc = docs[0][1]
+    assert doc["prize_id"] == "1921_physics"
+    assert doc["laureates"]["surname"] == "Einstein"
+    assert doc["prize"] == sample_prize
+
+
+def test_prize_payloads_include_laureate_documents(sample_prizes):
+    payloads = list(prize_payloads(sample_prizes, "nobel_prizes_v1", laureate_index="nobel_laureates_v1"))
+    assert [key for key, _ in payloads] == ["1921_physics", "1921_physics_12", "1922_chemistry", "1922_chemistry_13"]
+    action = json.loads(payloads[1][1].decode("utf-8").splitlines()[0])
+    assert action == {"index": {"_index": "nobel_laureates_v1", "_id": "1921_physics_12"}}
+
+
+def test_laureate_query_has_no_nested_clause():
+    """The laureate query matches the same fields without a nested join and groups by prize."""
+    params = FlexibleSearchParams(q="Einstein", mode=SearchMode.LAUREATE, fields=["year"])
+    query = flask_app.build_laureate_search_query(params)
+    should = query["query"]["bool"]["should"]
+    assert not any("nested" in clause for clause in should)
+    laureate_clause = should[-1]["multi_match"]
+    assert "laureates.surname^3" in laureate_clause["fields"]
+    assert query["collapse"] == {"field": "prize_id"}
+    assert query["_source"] == {"includes": ["prize.year"]}
+
+
+def test_laureate_mode_search(client, mock_es, sample_prizes):
+    """Laureate hits come back as prizes, counted by distinct prize."""
+    mock_es.search.return_value = {
+        "took": 1,
+        "hits": {"total": {"value": 3}, "hits": [_laureate_hit(p) for p in sample_prizes]},
+        "aggregations": {"prizes": {"value": 2}}
+    }
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        response = client.get('/search?q=Einstein&mode=laureate')
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["total"] == 2
+    assert [r["year"] for r in data["results"]] == ["1921", "1922"]
+    assert mock_es.search.call_args.kwargs["index"] == "nobel_laureates"
+
+
+def test_laureate_mode_rejects_cursor(client, mock_es):
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        response = client.get('/search?q=Einstein&mode=laureate&cursor=*')
+    assert response.status_code == 400
+
+
+def test_update_prize_replaces_laureate_documents(client, mock_es, sample_prize):
+    mock_es.index.return_value = {"_id": "1921_physics"}
+    mock_es.bulk.return_value = {"errors": False, "items": []}
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        response = client.put('/prize/1921/physics', json=sample_prize)
+
+    assert response.status_code == 200
+    delete = mock_es.delete_by_query.call_args.kwargs
+    assert delete["index"] == "nobel_laureates"
+    assert delete["body"] == {"query": {"terms": {"prize_id": ["1921_physics"]}}}
+    lines = mock_es.bulk.call_args.kwargs["body"].decode("utf-8").splitlines()
+    assert json.loads(lines[0]) == {"index": {"_index": "nobel_laureates", "_id": "1921_physics_12"}}
+
+
+def test_reindex_swaps_both_aliases_together(mock_es):
+    mock_es.indices.exists_alias.return_value = False
+    mock_es.indices.exists.return_value = False
+    mock_es.indices.get.return_value = {}
+    with patch('app.load_nobel_data', return_value=IngestSummary(total=2, indexed=2)) as load:
+        index = flask_app.reindex(mock_es)
+
+    laureate_index = load.call_args.kwargs["laureate_index"]
+    assert laureate_index.startswith("nobel_laureates_v")
+    mock_es.indices.update_aliases.assert_called_once_with(body={"actions": [
+        {"add": {"index": index, "alias": "nobel_prizes"}},
+        {"add": {"index": laureate_index, "alias": "nobel_laureates"}},
+    ]})
@@ -0,0 +1,91 @@
+from unittest.mock import patch
+
+import pytest
+
+from memory_search import BKTree, MemorySearchIndex, edit_distance
+from models import FlexibleSearchParams, SortField, SortOrder
+
+ALL_FIELDS = ["laureates.firstname", "laureates.surname", "laureates.motivation", "category", "year"]
+
+
+@pytest.fixture
+def index(sample_prizes):
+    extra = {
+        "year": "1903",
+        "category": "physics",
+        "laureates": [{
+            "id": "6",
+            "firstname": "Marie",
+            "surname": "Curie",
+            "motivation": "in recognition of the work of Einstein and Bohr",
+            "share": "4"
+        }]
+    }
+    prizes = sample_prizes + [extra]
+    return MemorySearchIndex((f"{p['year']}_{p['category']}", p) for p in prizes)
+
+
+def _ids(response):
+    return [hit["_id"] for hit in response["hits"]["hits"]]
+
+
+def test_edit_distance_counts_transpositions():
+    assert edit_distance("einstein", "einstein") == 0
+    assert edit_distance("einstein", "einstien") == 1
+    assert edit_distance("bohr", "bor") == 1
+    assert edit_distance("curie", "marie") == 2
+
+
+def test_bk_tree_matches_brute_force():
+    words = ["einstein", "eisenstein", "bohr", "born", "curie", "marie", "physics", "physic"]
+    tree = BKTree()
+    for word in words:
+        tree.add(word)
+    for query in ["einstien", "bhor", "phisics"]:
+        expected = {w for w in words if edit_distance(query, w) <= 2}
+        assert {w for w, _ in tree.search(query, 2)} == expected
+
+
+def test_fuzzy_name_match(index):
+    """A misspelled surname still finds the laureate."""
+    response = index.search(FlexibleSearchParams(q="Einstien"), ALL_FIELDS)
+    assert _ids(response)[0] == "1921_physics"
+
+
+def test_name_boost_outranks_motivation(index):
+    """A surname hit (^3) scores above the same word in a motivation (^2)."""
+    response = index.search(FlexibleSearchParams(q="Bohr"), ALL_FIELDS)
+    assert _ids(response) == ["1922_chemistry", "1903_physics"]
+    assert response["hits"]["total"]["value"] == 2
+
+
+def test_include_restricts_fields(index):
+    response = index.search(FlexibleSearchParams(q="Bohr"), ["laureates.surname"])
+    assert _ids(response) == ["1922_chemistry"]
+
+
+def test_sort_by_year_and_paginate(index):
+    params = FlexibleSearchParams(q="physics", sort_by=SortField.YEAR, sort_order=SortOrder.ASC, size=1, page=2)
+    response = index.search(params, ALL_FIELDS)
+    assert response["hits"]["total"]["value"] == 2
+    assert _ids(response) == ["1921_physics"]
+
+
+def test_update_replaces_postings(index, sample_prize):
+    updated = dict(sample_prize, laureates=[dict(sample_prize["laureates"][0], surname="Newton")])
+    index.add("1921_physics", updated)
+    response = index.search(FlexibleSearchParams(q="Newton"), ALL_FIELDS)
+    assert _ids(response) == ["1921_physics"]
+    response = index.search(FlexibleSearchParams(q="Einstein"), ["laureates.surname"])
+    assert _ids(response) == []
+
+
+def test_search_endpoint_with_memory_backend(client, index):
+    """/search is served without touching Elasticsearch."""
+    with patch('app.SEARCH_BACKEND', 'memory'), patch('app.memory_index', index), \
+            patch('app.get_elasticsearch', side_effect=Exception("unreachable")):
+        response = client.get('/search?q=Curie')
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["total"] == 1
+        assert data["results"][0]["year"] == "1903"
@@ -0,0 +1,56 @@
+from unittest.mock import patch
+
+import metrics
+from models import IngestSummary
+
+
+def test_metrics_endpoint_reports_search_stages(client, mock_es):
+    """A search shows up in the request, stage and cache metrics."""
+    mock_es.search.return_value["took"] = 3
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        client.get('/search?q=Einstein')
+        response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain")
+    text = response.get_data(as_text=True)
+    assert 'http_request_duration_seconds_count{route="/search",method="GET",status="200"}' in text
+    for stage in ("validate", "cache", "build_query", "elasticsearch", "network", "serialize"):
+        assert f'search_stage_duration_seconds_count{{stage="{stage}"}}' in text
+    assert 'search_elasticsearch_took_seconds_count' in text
+    assert 'search_cache{stat="misses"}' in text
+
+
+def test_histogram_rendering_is_cumulative():
+    """Bucket counts include every smaller bucket and +Inf equals the count."""
+    histogram = metrics.Histogram("test_seconds", "Test", ("stage",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage="a")
+    histogram.observe(0.5, stage="a")
+    histogram.observe(5, stage="a")
+    lines = histogram.render()
+    assert 'test_seconds_bucket{stage="a",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{stage="a",le="1.0"} 2' in lines
+    assert 'test_seconds_bucket{stage="a",le="+Inf"} 3' in lines
+    assert 'test_seconds_count{stage="a"} 3' in lines
+
+
+def test_es_endpoint():
+    assert metrics.es_endpoint("/nobel_prizes/_search?typed_keys=true") == "_search"
+    assert metrics.es_endpoint("/_bulk") == "_bulk"
+    assert metrics.es_endpoint("/nobel_prizes/_doc/1921_physics") == "_doc"
+    assert metrics.es_endpoint("/nobel_prizes") == "index"
+    assert metrics.es_endpoint("/") == "/"
+
+
+def test_record_ingest():
+    """Bulk load summaries feed the ingest counters and throughput gauge."""
+    before = metrics.INGEST_DOCUMENTS.value(result="indexed")
+    metrics.record_ingest(IngestSummary(indexed=10, failed=1, batches=1, retries=0,
+                                        elapsed_seconds=2.0, docs_per_second=5.0))
+    assert metrics.INGEST_DOCUMENTS.value(result="indexed") - before == 10
+    assert metrics.INGEST_DOCS_PER_SECOND.value() == 5.0
+
+
+def test_metrics_disabled(client):
+    with patch('metrics.ENABLED', False):
+        response = client.get('/metrics')
+    assert response.status_code == 404
@@ -0,0 +1,105 @@
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import app as flask_app
+import prefork
+
+
+@pytest.fixture
+def no_client(monkeypatch):
+    monkeypatch.setattr(flask_app, "es", None)
+
+
+def test_concurrent_first_calls_create_one_client(no_client, mock_es):
+    """Threads racing on the lazy client share the one that wins."""
+    barrier = threading.Barrier(8)
+    clients = []
+
+    def connect():
+        # Give the other threads time to reach the lock
+        time.sleep(0.05)
+        return mock_es
+
+    def call():
+        barrier.wait(timeout=5)
+        clients.append(flask_app.get_elasticsearch())
+
+    with patch('app.wait_for_elasticsearch', side_effect=connect) as wait:
+        threads = [threading.Thread(target=call) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    wait.assert_called_once()
+    assert clients == [mock_es] * 8
+
+
+def test_reset_drops_inherited_client(mock_es, monkeypatch):
+    monkeypatch.setattr(flask_app, "es", mock_es)
+    flask_app._es_lock.acquire()
+
+    flask_app.reset_elasticsearch()
+
+    assert flask_app.es is None
+    assert flask_app._es_lock.acquire(blocking=False)
+    flask_app._es_lock.release()
+
+
+def test_wait_for_index_raises_until_loaded(mock_es, monkeypatch):
+    monkeypatch.setattr(flask_app, "es", mock_es)
+
+    with patch('app.get_alias_indices', return_value=[]):
+        with pytest.raises(RuntimeError):
+            flask_app.wait_for_index()
+    with patch('app.get_alias_indices', return_value=["nobel_prizes_v1"]):
+        flask_app.wait_for_index()
+
+
+def test_foreground_load_reindexes_to_completion(mock_es, monkeypatch):
+    """The loader process exits after loading, so it never reloads on a thread."""
+    monkeypatch.setattr(flask_app, "es", mock_es)
+    with patch('app.get_alias_indices', return_value=["nobel_prizes_v1"]), \
+            patch('app.reindex_in_background') as background, patch('app.reindex') as reindex:
+        flask_app.load_initial_data(background=False)
+
+    reindex.assert_called_once_with(mock_es)
+    background.assert_not_called()
+
+
+def test_options_wire_fork_hooks():
+    options = prefork.options(port=8000, workers=3, threads=2)
+
+    assert options["bind"] == "0.0.0.0:8000"
+    assert options["workers"] == 3
+    assert options["threads"] == 2
+    assert options["worker_class"] == "gthread"
+    assert options["worker_connections"] == 4
+    assert options["backlog"] == prefork.WEB_BACKLOG
+    assert options["post_fork"] is prefork.post_fork
+    assert prefork.PreforkApplication(options).cfg.keepalive == prefork.WEB_KEEPALIVE
+
+
+def test_worker_waits_for_index_loaded_by_master(mock_es, monkeypatch):
+    monkeypatch.setattr(flask_app, "es", mock_es)
+    monkeypatch.setattr(flask_app, "SEARCH_BACKEND", "elasticsearch")
+
+    prefork.post_fork(MagicMock(), MagicMock())
+    assert flask_app.es is None
+    with patch('app.start_background_startup') as startup:
+        prefork.post_worker_init(MagicMock())
+
+    startup.assert_called_once_with(load=flask_app.wait_for_index)
+
+
+def test_memory_backend_is_refused(monkeypatch):
+    monkeypatch.setattr(flask_app, "SEARCH_BACKEND", "memory")
+
+    with patch('prefork.PreforkApplication') as application:
+        with pytest.raises(ValueError):
+            prefork.run(workers=2)
+
+    application.assert_not_called()
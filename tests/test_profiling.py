@@ -0,0 +1,108 @@
+import copy
+import json
+import logging
+from unittest.mock import patch
+
+import pytest
+
+import profiling
+from models import FlexibleSearchParams
+from profiling import SlowQueryLog, query_shape, summarize_profile
+
+PROFILE = {
+    "shards": [{
+        "id": "[node][nobel_prizes_v1][0]",
+        "searches": [{
+            "query": [{
+                "type": "BooleanQuery",
+                "description": "laureates.surname:einstein year:1921",
+                "time_in_nanos": 3_000_000,
+                "children": [
+                    {"type": "TermQuery", "description": "laureates.surname:einstein", "time_in_nanos": 2_500_000},
+                    {"type": "TermQuery", "description": "year:1921", "time_in_nanos": 400_000},
+                ]
+            }],
+            "rewrite_time": 50_000,
+            "collector": [{"name": "SimpleTopScoreDocCollector", "time_in_nanos": 200_000}]
+        }]
+    }]
+}
+
+
+@pytest.fixture
+def admin_token(monkeypatch):
+    monkeypatch.setattr(profiling, "ADMIN_TOKEN", "secret")
+    return "secret"
+
+
+def test_summarize_profile_lists_slowest_clauses():
+    summary = summarize_profile(PROFILE)
+
+    shard = summary["shards"][0]
+    assert shard["query_ms"] == 3.0
+    assert shard["collector_ms"] == 0.2
+    assert shard["query"][0]["children"][0]["time_ms"] == 2.5
+    assert [clause["type"] for clause in summary["slowest"]] == ["BooleanQuery", "TermQuery", "TermQuery"]
+
+
+def test_query_shape_ignores_search_terms():
+    einstein = query_shape(FlexibleSearchParams(q="Albert Einstein", include=["laureates.surname"]))
+    curie = query_shape(FlexibleSearchParams(q="Marie Curie", include=["laureates.surname"]))
+
+    assert einstein == curie
+    assert einstein["terms"] == 2
+    assert "Einstein" not in json.dumps(einstein)
+
+
+def test_slow_query_log_threshold_and_sampling(mock_es, caplog):
+    params = FlexibleSearchParams(q="Einstein")
+    results = {**mock_es.search.return_value, "took": 420}
+
+    with caplog.at_level(logging.WARNING, logger="slow_query"):
+        assert not SlowQueryLog(threshold_ms=100).observe(params, results, 50)
+        assert SlowQueryLog(threshold_ms=100).observe(params, results, 450)
+        assert not SlowQueryLog(threshold_ms=100, sample_rate=0).observe(params, results, 450)
+        assert not SlowQueryLog(threshold_ms=-1).observe(params, results, 10_000)
+
+    [record] = caplog.records
+    entry = json.loads(record.getMessage())
+    assert entry["took_ms"] == 420
+    assert entry["hits"] == 1
+    assert entry["elapsed_ms"] == 450
+
+
+def test_search_logs_slow_queries(client, mock_es, monkeypatch):
+    monkeypatch.setattr("app.slow_query_log", SlowQueryLog(threshold_ms=0))
+
+    with patch('app.get_elasticsearch', return_value=mock_es), \
+            patch('profiling.logger.warning') as warning:
+        client.get('/search?q=Einstein')
+        client.get('/search?q=Einstein')
+
+    # The cached second response never reached the search path
+    warning.assert_called_once()
+
+
+def test_profile_requires_admin(client, mock_es, admin_token):
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        assert client.get('/search?q=Einstein&profile=true').status_code == 403
+        response = client.get('/search?q=Einstein&profile=true', headers={"X-Admin-Token": "wrong"})
+
+    assert response.status_code == 403
+    mock_es.search.assert_not_called()
+
+
+def test_profile_returns_clause_timings(client, mock_es, admin_token):
+    mock_es.search.return_value = {**copy.deepcopy(mock_es.search.return_value), "profile": PROFILE}
+
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        first = client.get('/search?q=Einstein&profile=true', headers={"X-Admin-Token": admin_token})
+        second = client.get('/search?q=Einstein&profile=true', headers={"X-Admin-Token": admin_token})
+
+    assert first.status_code == 200
+    assert mock_es.search.call_args.kwargs["body"]["profile"] is True
+    data = first.get_json()
+    assert data["total"] == 1
+    assert data["profile"]["slowest"][0]["type"] == "BooleanQuery"
+    assert "X-Cache" not in second.headers
+    assert mock_es.search.call_count == 2
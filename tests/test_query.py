@@ -0,0 +1,77 @@
+from unittest.mock import patch
+
+import pytest
+from pydantic import ValidationError
+from werkzeug.datastructures import MultiDict
+
+import app as flask_app
+from memory_search import MemorySearchIndex
+from models import FlexibleSearchParams, SortField
+
+
+def _clauses(query):
+    return query["query"]["bool"]["should"]
+
+
+def test_category_sort_uses_keyword_subfield():
+    query = flask_app.build_search_query(FlexibleSearchParams(q="physics", sort_by=SortField.CATEGORY))
+    assert query["sort"][0] == {"category.keyword": {"order": "desc"}}
+
+
+def test_year_is_matched_exactly():
+    """Numbers in the query become a terms clause instead of a fuzzy match."""
+    query = flask_app.build_search_query(FlexibleSearchParams(q="Einstein 1921"))
+    should = _clauses(query)
+    assert {"terms": {"year": [1921], "boost": 1}} in should
+    assert all("year" not in clause.get("multi_match", {}).get("fields", []) for clause in should)
+
+
+def test_laureate_boosts_are_applied_in_nested_clause():
+    query = flask_app.build_search_query(FlexibleSearchParams(q="Einstein"))
+    nested = [c for c in _clauses(query) if "nested" in c][0]
+    assert nested["nested"]["query"]["multi_match"]["fields"] == [
+        "laureates.firstname^3", "laureates.surname^3", "laureates.motivation^2"
+    ]
+
+
+def test_year_range_filter(client, mock_es):
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        response = client.get('/search?q=physics&year_from=1900&year_to=1950')
+        assert response.status_code == 200
+        query = mock_es.search.call_args.kwargs["body"]["query"]["bool"]
+        assert query["filter"] == [{"range": {"year": {"gte": 1900, "lte": 1950}}}]
+        assert query["minimum_should_match"] == 1
+
+        assert client.get('/search?q=physics&year_from=nineteen').status_code == 400
+
+
+def test_memory_backend_year_semantics(sample_prizes):
+    index = MemorySearchIndex((f"{p['year']}_{p['category']}", p) for p in sample_prizes)
+    fields = list(flask_app.SEARCH_FIELDS)
+    hits = index.search(FlexibleSearchParams(q="1921"), fields)["hits"]["hits"]
+    assert [hit["_id"] for hit in hits] == ["1921_physics"]
+
+    hits = index.search(FlexibleSearchParams(q="Bohr Einstein", year_from=1922), fields)["hits"]["hits"]
+    assert [hit["_id"] for hit in hits] == ["1922_chemistry"]
+
+
+def test_same_shape_shares_one_template():
+    """Only the clauses carrying the search terms are built per request."""
+    einstein = flask_app.build_search_query(FlexibleSearchParams(q="Einstein", sort_by=SortField.YEAR))
+    curie = flask_app.build_search_query(FlexibleSearchParams(q="Curie", page=3, sort_by=SortField.YEAR))
+
+    assert curie["sort"] is einstein["sort"]
+    assert _clauses(curie)[0]["multi_match"]["fields"] is _clauses(einstein)[0]["multi_match"]["fields"]
+    assert _clauses(curie)[0]["multi_match"]["query"] == "Curie"
+    assert _clauses(einstein)[0]["multi_match"]["query"] == "Einstein"
+    assert (curie["from"], einstein["from"]) == (20, 0)
+
+
+def test_search_params_are_memoized():
+    args = MultiDict([("q", "Einstein"), ("include", "laureates.surname")])
+
+    assert flask_app.search_params_from_args(args) is flask_app.search_params_from_args(MultiDict(args))
+    with pytest.raises(ValidationError):
+        flask_app.search_params_from_args(MultiDict([("q", "Einstein"), ("include", "nonsense")]))
+    cursor = MultiDict([("q", "Einstein"), ("cursor", "*")])
+    assert flask_app.search_params_from_args(cursor) is not flask_app.search_params_from_args(cursor)
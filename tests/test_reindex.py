@@ -0,0 +1,91 @@
+from unittest.mock import patch
+
+import pytest
+
+import app as flask_app
+from models import IngestSummary
+
+
+def test_create_index_is_versioned(mock_es):
+    """New generations get a versioned name and never drop the live index."""
+    index = flask_app.create_index(mock_es)
+    assert index.startswith("nobel_prizes_v")
+    mock_es.indices.create.assert_called_once()
+    assert mock_es.indices.create.call_args.kwargs["index"] == index
+    mock_es.indices.delete.assert_not_called()
+
+
+def test_create_index_shard_settings(mock_es):
+    flask_app.create_index(mock_es, shards=3, replicas=0)
+
+    body = mock_es.indices.create.call_args.kwargs["body"]
+    assert body["settings"] == {"number_of_shards": 3, "number_of_replicas": 0}
+    assert body["mappings"] == flask_app.INDEX_BODY["mappings"]
+
+
+def test_swap_alias_is_atomic(mock_es):
+    """The old generation is removed and the new one added in a single call."""
+    mock_es.indices.exists_alias.return_value = True
+    mock_es.indices.get_alias.return_value = {"nobel_prizes_v1": {"aliases": {"nobel_prizes": {}}}}
+
+    flask_app.swap_alias(mock_es, "nobel_prizes_v2")
+
+    mock_es.indices.update_aliases.assert_called_once_with(body={"actions": [
+        {"remove": {"index": "nobel_prizes_v1", "alias": "nobel_prizes"}},
+        {"add": {"index": "nobel_prizes_v2", "alias": "nobel_prizes"}},
+    ]})
+
+
+def test_swap_alias_replaces_legacy_index(mock_es):
+    """A concrete index named like the alias is removed in the same update."""
+    mock_es.indices.exists_alias.return_value = False
+    mock_es.indices.exists.return_value = True
+
+    flask_app.swap_alias(mock_es, "nobel_prizes_v2")
+
+    actions = mock_es.indices.update_aliases.call_args.kwargs["body"]["actions"]
+    assert {"remove_index": {"index": "nobel_prizes"}} in actions
+
+
+def test_cleanup_old_indices_keeps_live_and_previous(mock_es):
+    """Only generations older than the retained ones are deleted."""
+    mock_es.indices.exists_alias.return_value = True
+    mock_es.indices.get_alias.return_value = {"nobel_prizes_v4": {}}
+    mock_es.indices.get.return_value = {f"nobel_prizes_v{i}": {} for i in range(1, 5)}
+
+    stale = flask_app.cleanup_old_indices(mock_es, keep=1)
+
+    assert stale == ["nobel_prizes_v2", "nobel_prizes_v1"]
+    assert mock_es.indices.delete.call_count == 2
+
+
+def test_reindex_failure_keeps_alias(mock_es):
+    """A failed load deletes the half-built generation and leaves the alias alone."""
+    with patch('app.load_nobel_data', side_effect=Exception("upstream down")):
+        with pytest.raises(Exception):
+            flask_app.reindex(mock_es)
+
+    mock_es.indices.update_aliases.assert_not_called()
+    deleted = mock_es.indices.delete.call_args.kwargs["index"]
+    assert deleted.startswith("nobel_prizes_v")
+
+
+@pytest.mark.parametrize("summary", [
+    IngestSummary(total=2, indexed=0, failed=2),
+    IngestSummary(total=0),
+    IngestSummary(total=4, indexed=3, failed=1),
+])
+def test_incomplete_load_keeps_alias(mock_es, summary):
+    """A load that indexed nothing, or lost documents, is never swapped in."""
+    with patch('app.load_nobel_data', return_value=summary):
+        with pytest.raises(RuntimeError):
+            flask_app.reindex(mock_es)
+
+    mock_es.indices.update_aliases.assert_not_called()
+    assert mock_es.indices.delete.call_count == 2
+
+
+def test_check_load_allows_configured_failure_ratio():
+    flask_app.check_load(IngestSummary(total=4, indexed=3, failed=1), max_failed_ratio=0.25)
+    with pytest.raises(RuntimeError):
+        flask_app.check_load(IngestSummary(total=4, indexed=2, failed=2), max_failed_ratio=0.25)
@@ -0,0 +1,176 @@
+import copy
+import json
+from unittest.mock import patch
+
+import pytest
+from elasticsearch.exceptions import ConnectionError, ConnectionTimeout, NotFoundError
+
+import app as flask_app
+from resilience import (
+    CircuitBreaker, CircuitOpenError, ConcurrencyLimiter, Deadline, DeadlineExceeded, guarded_transport
+)
+
+
+class _FlakyTransport:
+    """Transport stand-in raising the queued errors, then succeeding"""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+
+    def perform_request(self, method, url, headers=None, params=None, body=None):
+        if self.errors:
+            raise self.errors.pop(0)
+        return {"ok": True}
+
+
+def test_deadline_expires():
+    deadline = Deadline(0)
+
+    with pytest.raises(DeadlineExceeded):
+        deadline.check()
+    assert Deadline(2.5).es_timeout() == "2000ms"
+
+
+def test_limiter_sheds_beyond_limit():
+    limiter = ConcurrencyLimiter(limit=1)
+
+    assert limiter.try_acquire()
+    assert not limiter.try_acquire()
+    limiter.release()
+    assert limiter.try_acquire()
+    assert limiter.shed == 1
+
+
+def test_breaker_opens_then_half_opens():
+    """Consecutive failures open the circuit; one trial call is let through after the timeout."""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+
+    with pytest.raises(CircuitOpenError) as error:
+        breaker.before_call()
+    assert 0 < error.value.retry_after <= 60
+
+    breaker.reset_timeout = 0
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_guarded_transport_counts_cluster_failures_only():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    transport = guarded_transport(_FlakyTransport, breaker)([
+        NotFoundError(404, "index_not_found_exception"),
+        ConnectionError("N/A", "refused", OSError("refused")),
+        ConnectionTimeout("TIMEOUT", "read timed out", TimeoutError("read timed out")),
+    ])
+
+    for _ in range(3):
+        with pytest.raises(Exception):
+            transport.perform_request("GET", "/_search")
+
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        transport.perform_request("GET", "/_search")
+
+
+def test_search_carries_deadline(client, mock_es):
+    """The time budget reaches Elasticsearch as search and client timeouts."""
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        response = client.get('/search?q=Einstein')
+
+    assert response.status_code == 200
+    kwargs = mock_es.search.call_args.kwargs
+    assert kwargs["body"]["timeout"].endswith("ms")
+    assert 0 < kwargs["request_timeout"] <= 3
+
+
+def test_partial_results_are_flagged_and_not_cached(client, mock_es):
+    mock_es.search.return_value = {**copy.deepcopy(mock_es.search.return_value), "timed_out": True}
+
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        first = client.get('/search?q=Einstein')
+        second = client.get('/search?q=Einstein')
+
+    assert first.status_code == 200
+    assert first.headers["X-Partial-Results"] == "true"
+    assert second.headers.get("X-Cache") != "HIT"
+    assert mock_es.search.call_count == 2
+
+
+def test_timeout_returns_504(client, mock_es):
+    mock_es.search.side_effect = ConnectionTimeout("TIMEOUT", "read timed out", TimeoutError("read timed out"))
+
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        response = client.get('/search?q=Einstein')
+
+    assert response.status_code == 504
+    assert response.get_json()["error"] == "Request timed out"
+
+
+def test_open_circuit_returns_503(client):
+    with patch('app.get_elasticsearch', side_effect=CircuitOpenError(4.2)):
+        response = client.get('/facets')
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+
+
+def test_writes_fail_fast_while_circuit_is_open(client, mock_es, sample_prize):
+    mock_es.index.side_effect = CircuitOpenError(4.2)
+    mock_es.exists.side_effect = CircuitOpenError(4.2)
+    mock_es.bulk.side_effect = CircuitOpenError(4.2)
+
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        responses = [
+            client.post('/prize', json=sample_prize),
+            client.put('/prize/1921/physics', json=sample_prize),
+            client.post('/prizes/_bulk', data=json.dumps(sample_prize), content_type="application/x-ndjson"),
+        ]
+
+    for response in responses:
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "5"
+
+
+def test_request_makes_one_bounded_connection_attempt(client, monkeypatch):
+    """Without a client a request tries to connect once within its budget, then fails with 503."""
+    monkeypatch.setattr("app.es", None)
+    refused = ConnectionError("N/A", "connection refused", OSError("refused"))
+
+    with patch('app.connect_elasticsearch', side_effect=refused) as connect, \
+            patch('app.wait_for_elasticsearch') as wait:
+        response = client.get('/search?q=Einstein')
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    connect.assert_called_once()
+    assert 0 < connect.call_args.kwargs["request_timeout"] <= flask_app.REQUEST_DEADLINE
+    wait.assert_not_called()
+
+
+def test_request_stops_waiting_for_connection_at_deadline(client, monkeypatch):
+    monkeypatch.setattr("app.es", None)
+    monkeypatch.setattr("app.REQUEST_DEADLINE", 0.05)
+
+    with flask_app._es_lock:
+        response = client.get('/search?q=Einstein')
+
+    assert response.status_code == 504
+def test_saturated_server_sheds_requests(client, mock_es, monkeypatch):
+    """Beyond the in-flight limit requests get 503 with Retry-After; probes still answer."""
+    limiter = ConcurrencyLimiter(limit=1)
+    monkeypatch.setattr("app.request_limiter", limiter)
+
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        assert client.get('/search?q=Einstein').status_code == 200
+        assert limiter.in_flight == 0
+
+        limiter.try_acquire()
+        response = client.get('/search?q=Einstein')
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+        assert client.get('/livez').status_code == 200
@@ -0,0 +1,71 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from models import FlexibleSearchParams, Prize, SearchResult
+import app as flask_app
+from serialization import normalize_prize, project_prize
+
+
+@pytest.mark.parametrize("source", [
+    {"year": "1921", "category": "physics", "laureates": [{"id": "12", "firstname": "Albert"}]},
+    {"year": "1921", "category": "physics", "overallMotivation": "x",
+     "laureates": [{"id": "12", "firstname": "Albert", "surname": "Einstein", "share": "1", "extra": 1}]},
+    {"year": "1921", "category": "physics", "laureates": []},
+])
+def test_normalize_prize_matches_model(source):
+    """The fast path produces exactly what the Prize model would."""
+    assert normalize_prize(source) == Prize(**source).dict()
+
+
+@pytest.mark.parametrize("source", [
+    {"year": 1921, "category": "physics", "laureates": []},
+    {"year": "1921", "category": "physics"},
+    {"year": "1921", "category": "physics", "laureates": [{"firstname": "Albert"}]},
+])
+def test_normalize_prize_defers_unusual_documents(source):
+    assert normalize_prize(source) is None
+
+
+def test_search_response_shape_unchanged(mock_es):
+    """The response parses into the same SearchResult as before."""
+    results = mock_es.search.return_value
+    params = FlexibleSearchParams(q="Einstein")
+    body = json.loads(flask_app.search_result_body(params, results))
+    expected = SearchResult(
+        total=1, page=1, size=10,
+        results=[Prize(**hit["_source"]) for hit in results["hits"]["hits"]]
+    ).dict()
+    assert body == {**expected, "next_cursor": None}
+
+
+def test_invalid_hits_are_skipped(mock_es):
+    results = mock_es.search.return_value
+    results["hits"]["hits"].append({"_id": "2", "_score": 0.5, "_source": {"year": "1922"}})
+    body = json.loads(flask_app.search_result_body(FlexibleSearchParams(q="x"), results))
+    assert len(body["results"]) == 1
+
+
+def test_fields_projection(client, mock_es):
+    """fields= narrows both the _source fetched and the response."""
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        response = client.get('/search?q=Einstein&fields=year&fields=laureates.surname')
+        assert response.status_code == 200
+        assert response.get_json()["results"] == [{"year": "1921", "laureates": [{"surname": "Einstein"}]}]
+        query = mock_es.search.call_args.kwargs["body"]
+        assert query["_source"] == {"includes": ["laureates.surname", "year"]}
+
+        assert client.get('/search?q=Einstein&fields=laureates.nobel').status_code == 400
+
+
+def test_default_source_filter(client, mock_es):
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        client.get('/search?q=Einstein')
+        includes = mock_es.search.call_args.kwargs["body"]["_source"]["includes"]
+        assert "year" in includes and "laureates.motivation" in includes
+
+
+def test_project_whole_laureates(sample_prize):
+    projected = project_prize(sample_prize, ["laureates"])
+    assert projected == {"laureates": [Prize(**sample_prize).dict()["laureates"][0]]}
@@ -0,0 +1,104 @@
+import json
+import os
+
+import pytest
+import requests
+
+import snapshot
+from snapshot import SnapshotError, SnapshotWriter, iter_prizes, iter_snapshot, read_header, verify
+
+
+def _write(path, prizes, source="prize.json"):
+    with SnapshotWriter(str(path), source) as writer:
+        for prize in prizes:
+            writer.write(prize)
+    return str(path)
+
+
+def test_roundtrip(tmp_path, sample_prizes):
+    """Prizes come back unchanged and the header describes them."""
+    path = _write(tmp_path / "prizes.snap", sample_prizes * 50)
+
+    assert list(iter_snapshot(path)) == sample_prizes * 50
+    header = verify(path)
+    assert header["count"] == 100
+    assert header["format"] == snapshot.FORMAT_VERSION
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_corrupt_payload_is_detected(tmp_path, sample_prizes):
+    """A flipped payload byte fails the checksum before any prize is yielded."""
+    path = _write(tmp_path / "prizes.snap", sample_prizes)
+    with open(path, "r+b") as f:
+        f.seek(snapshot.PAYLOAD_OFFSET + 5)
+        byte = f.read(1)
+        f.seek(-1, os.SEEK_CUR)
+        f.write(bytes([byte[0] ^ 0xFF]))
+
+    with pytest.raises(SnapshotError, match="checksum"):
+        next(iter_snapshot(path))
+
+
+def test_truncated_snapshot_is_detected(tmp_path, sample_prizes):
+    path = _write(tmp_path / "prizes.snap", sample_prizes)
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 3)
+
+    with pytest.raises(SnapshotError, match="payload"):
+        verify(path)
+
+
+def test_unsupported_format_is_rejected(tmp_path, sample_prizes, monkeypatch):
+    path = _write(tmp_path / "prizes.snap", sample_prizes)
+    monkeypatch.setattr(snapshot, "FORMAT_VERSION", snapshot.FORMAT_VERSION + 1)
+
+    with pytest.raises(SnapshotError, match="format"):
+        read_header(path)
+
+
+def test_iter_prizes_writes_then_reuses_snapshot(tmp_path, sample_prizes):
+    """The first load snapshots the source; later loads read the snapshot instead."""
+    source = tmp_path / "prize.json"
+    source.write_text(json.dumps({"prizes": sample_prizes}))
+    path = str(tmp_path / "prizes.snap")
+
+    assert list(iter_prizes(str(source), snapshot_path=path)) == sample_prizes
+    assert verify(path)["source"] == str(source)
+
+    source.unlink()
+    assert list(iter_prizes(str(source), snapshot_path=path)) == sample_prizes
+
+
+def test_partial_read_keeps_previous_snapshot(tmp_path, sample_prizes):
+    """A load that stops early never replaces the snapshot."""
+    source = tmp_path / "prize.json"
+    source.write_text(json.dumps({"prizes": sample_prizes}))
+    path = str(tmp_path / "prizes.snap")
+
+    prizes = iter_prizes(str(source), snapshot_path=path)
+    next(prizes)
+    prizes.close()
+
+    assert not os.path.exists(path)
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_stale_snapshot_is_refreshed(tmp_path, sample_prizes):
+    source = tmp_path / "prize.json"
+    source.write_text(json.dumps({"prizes": sample_prizes[:1]}))
+    path = _write(tmp_path / "prizes.snap", sample_prizes, source=str(source))
+
+    assert list(iter_prizes(str(source), snapshot_path=path, max_age=-1)) == sample_prizes[:1]
+    assert verify(path)["count"] == 1
+
+
+def test_stale_snapshot_used_when_source_unreachable(tmp_path, sample_prizes, monkeypatch):
+    """An intact but stale snapshot still serves a cold start while the API is down."""
+    source = "https://api.nobelprize.org/v1/prize.json"
+    path = _write(tmp_path / "prizes.snap", sample_prizes, source=source)
+
+    def unreachable(*args, **kwargs):
+        raise requests.ConnectionError("network down")
+
+    monkeypatch.setattr("ingest.requests.get", unreachable)
+    assert list(iter_prizes(source, snapshot_path=path, max_age=-1)) == sample_prizes
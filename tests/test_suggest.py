@@ -0,0 +1,74 @@
+from unittest.mock import patch
+
+from memory_search import MemorySearchIndex
+from suggest import SuggestIndex, build_suggest_query, parse_suggest_response, with_suggest_inputs
+
+
+def test_suggest_inputs_cover_full_names_and_surnames(sample_prize):
+    doc = with_suggest_inputs(sample_prize)
+    assert doc["name_suggest"] == ["Albert Einstein", "Einstein"]
+    assert doc["category_suggest"] == ["physics"]
+    assert "name_suggest" not in sample_prize
+
+
+def test_memory_suggestions(sample_prizes):
+    """Prefixes match first names, surnames and categories, case-insensitively."""
+    index = SuggestIndex()
+    for prize in sample_prizes:
+        index.add(f"{prize['year']}_{prize['category']}", prize)
+    assert index.suggest("EIN", 5) == {"names": ["Albert Einstein"], "categories": []}
+    assert index.suggest("albert  e", 5)["names"] == ["Albert Einstein"]
+    assert index.suggest("ch", 5) == {"names": [], "categories": ["chemistry"]}
+
+    index.remove("1921_physics")
+    assert index.suggest("ein", 5)["names"] == []
+
+
+def test_parse_suggest_response_resolves_surnames():
+    response = {"suggest": {
+        "names": [{"options": [
+            {"text": "Curie", "_source": {"laureates": [{"firstname": "Pierre", "surname": "Curie"}]}},
+            {"text": "Curie", "_source": {"laureates": [{"firstname": "Pierre", "surname": "Curie"}]}},
+            {"text": "Marie Curie", "_source": {"laureates": [{"firstname": "Marie", "surname": "Curie"}]}},
+        ]}],
+        "categories": [{"options": [{"text": "chemistry"}]}]
+    }}
+    assert parse_suggest_response(response, 5) == {
+        "names": ["Pierre Curie", "Marie Curie"], "categories": ["chemistry"]
+    }
+
+
+def test_suggest_endpoint(client, mock_es):
+    mock_es.search.return_value = {"suggest": {
+        "names": [{"options": [{"text": "Einstein", "_source": {
+            "laureates": [{"firstname": "Albert", "surname": "Einstein"}]
+        }}]}],
+        "categories": [{"options": []}]
+    }}
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        response = client.get('/suggest?prefix=ein&size=3')
+        again = client.get('/suggest?prefix=Ein&size=3')
+    assert response.status_code == 200
+    assert response.get_json() == {"prefix": "ein", "names": ["Albert Einstein"], "categories": []}
+    assert mock_es.search.call_args.kwargs["body"] == build_suggest_query("ein", 3)
+    assert again.headers["X-Cache"] == "HIT"
+
+
+def test_suggest_endpoint_memory_backend(client, sample_prizes):
+    index = MemorySearchIndex((f"{p['year']}_{p['category']}", p) for p in sample_prizes)
+    with patch('app.SEARCH_BACKEND', 'memory'), patch('app.memory_index', index):
+        response = client.get('/suggest?prefix=bo')
+        cached = client.get('/suggest?prefix=BO')
+    assert response.get_json()["names"] == ["Niels Bohr"]
+    assert cached.headers["X-Cache"] == "HIT"
+
+
+def test_suggest_requires_prefix(client):
+    assert client.get('/suggest').status_code == 400
+    assert client.get('/suggest?prefix=%20').status_code == 400
+
+
+def test_writes_index_suggest_inputs(client, mock_es, sample_prize):
+    with patch('app.get_elasticsearch', return_value=mock_es):
+        client.post('/prize', json=sample_prize)
+    assert mock_es.index.call_args.kwargs["body"]["name_suggest"] == ["Albert Einstein", "Einstein"]
@@ -0,0 +1,173 @@
+import copy
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import sync
+
+
+class DatasetServer:
+    """Local stand-in for the Nobel API honouring If-None-Match"""
+
+    def __init__(self, prizes):
+        self.prizes = prizes
+        self.version = 1
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                etag = f'"v{server.version}"'
+                server.requests.append(dict(self.headers))
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                data = json.dumps({"prizes": server.prizes}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/prize.json"
+
+    def publish(self, prizes):
+        self.prizes = prizes
+        self.version += 1
+
+
+@pytest.fixture
+def dataset(sample_prizes):
+    server = DatasetServer(copy.deepcopy(sample_prizes))
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
+
+
+@pytest.fixture
+def bulk_es(mock_es):
+    """mock_es recording bulk actions and answering them, failing ids in ``mock_es.failing``"""
+    mock_es.actions = []
+    mock_es.failing = set()
+
+    def bulk(body, refresh=False):
+        lines = [json.loads(line) for line in body.decode("utf-8").splitlines()]
+        items = []
+        i = 0
+        while i < len(lines):
+            op, meta = next(iter(lines[i].items()))
+            i += 1 if op == "delete" else 2
+            mock_es.actions.append((op, meta["_index"], meta["_id"]))
+            if meta["_id"] in mock_es.failing:
+                result = {"_id": meta["_id"], "status": 400, "error": {"type": "mapper_parsing_exception"}}
+            else:
+                result = {"_id": meta["_id"], "status": 200, "result": "deleted" if op == "delete" else "updated"}
+            items.append({op: result})
+        return {"errors": any("error" in next(iter(item.values())) for item in items), "items": items}
+
+    mock_es.bulk.side_effect = bulk
+    mock_es.indices.get_alias.return_value = {"nobel_prizes_v1": {}}
+    return mock_es
+
+
+def test_first_sync_indexes_everything(bulk_es, dataset, tmp_path):
+    """Without state every prize and laureate is written and the ETag recorded."""
+    state_path = str(tmp_path / "state.json")
+    summary = sync.sync(bulk_es, source=dataset.url, state_path=state_path)
+
+    assert (summary.added, summary.updated, summary.deleted, summary.failed) == (2, 0, 0, 0)
+    assert ("index", "nobel_prizes", "1921_physics") in bulk_es.actions
+    assert ("index", "nobel_laureates", "1921_physics_12") in bulk_es.actions
+    state = sync.load_state(state_path)
+    assert state.etag == '"v1"'
+    assert state.documents["1922_chemistry"].laureates == ["1922_chemistry_13"]
+
+
+def test_unmodified_source_skips_elasticsearch(bulk_es, dataset, tmp_path):
+    """A 304 answer to the conditional request ends the sync early."""
+    state_path = str(tmp_path / "state.json")
+    sync.sync(bulk_es, source=dataset.url, state_path=state_path)
+    bulk_es.bulk.reset_mock()
+
+    summary = sync.sync(bulk_es, source=dataset.url, state_path=state_path)
+
+    assert summary.not_modified
+    assert dataset.requests[-1]["If-None-Match"] == '"v1"'
+    bulk_es.bulk.assert_not_called()
+
+
+def test_only_changes_are_sent(bulk_es, dataset, tmp_path, sample_prizes):
+    """Changed prizes are reindexed, missing ones deleted and unchanged ones skipped."""
+    state_path = str(tmp_path / "state.json")
+    sync.sync(bulk_es, source=dataset.url, state_path=state_path)
+    bulk_es.actions.clear()
+
+    physics = copy.deepcopy(sample_prizes[0])
+    physics["laureates"][0]["motivation"] = "for the photoelectric effect"
+    dataset.publish([physics, {"year": "1923", "category": "physics", "laureates": []}])
+    summary = sync.sync(bulk_es, source=dataset.url, state_path=state_path)
+
+    assert (summary.added, summary.updated, summary.deleted, summary.unchanged) == (1, 1, 1, 0)
+    assert bulk_es.actions == [
+        ("index", "nobel_prizes", "1921_physics"),
+        ("index", "nobel_laureates", "1921_physics_12"),
+        ("index", "nobel_prizes", "1923_physics"),
+        ("delete", "nobel_prizes", "1922_chemistry"),
+        ("delete", "nobel_laureates", "1922_chemistry_13"),
+    ]
+    assert set(sync.load_state(state_path).documents) == {"1921_physics", "1923_physics"}
+
+
+def test_failed_prizes_are_retried(bulk_es, dataset, tmp_path):
+    """A prize that failed to index stays out of the state and the ETag is not stored."""
+    state_path = str(tmp_path / "state.json")
+    bulk_es.failing.add("1922_chemistry")
+
+    summary = sync.sync(bulk_es, source=dataset.url, state_path=state_path)
+
+    assert summary.failed == 1
+    assert summary.failures[0].id == "1922_chemistry"
+    state = sync.load_state(state_path)
+    assert state.etag is None
+    assert set(state.documents) == {"1921_physics"}
+
+    bulk_es.failing.clear()
+    bulk_es.actions.clear()
+    summary = sync.sync(bulk_es, source=dataset.url, state_path=state_path)
+    assert (summary.added, summary.unchanged) == (1, 1)
+    assert ("index", "nobel_prizes", "1922_chemistry") in bulk_es.actions
+
+
+def test_empty_dataset_never_deletes_everything(bulk_es, dataset, tmp_path):
+    """An empty upstream answer is treated as an error rather than a mass delete."""
+    state_path = str(tmp_path / "state.json")
+    sync.sync(bulk_es, source=dataset.url, state_path=state_path)
+    bulk_es.actions.clear()
+
+    dataset.publish([])
+    with pytest.raises(ValueError):
+        sync.sync(bulk_es, source=dataset.url, state_path=state_path)
+    assert not any(op == "delete" for op, _, _ in bulk_es.actions)
+
+
+def test_local_file_change_detection(bulk_es, sample_prizes, tmp_path):
+    """Local sources are skipped while their modification time and size are unchanged."""
+    source = tmp_path / "prize.json"
+    source.write_text(json.dumps({"prizes": sample_prizes}))
+    state_path = str(tmp_path / "state.json")
+
+    assert sync.sync(bulk_es, source=str(source), state_path=state_path).added == 2
+    assert sync.sync(bulk_es, source=str(source), state_path=state_path).not_modified